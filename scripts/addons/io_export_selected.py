@@ -41,9 +41,21 @@ from mathutils import Vector, Matrix, Quaternion, Euler
 from collections import namedtuple
 
 import os
+import sys
 import json
 import re
+import array
 import hashlib
+import time
+import shutil
+import tempfile
+import subprocess
+import itertools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 def bpy_path_normslash(path):
     return path.replace(os.path.sep, "/")
@@ -123,6 +135,23 @@ def obj_parents(obj):
         yield obj.parent
         obj = obj.parent
 
+def obj_key(obj):
+    # Linked objects can have the same names as the local ones
+    return (obj.name, (obj.library.filepath if obj.library else None))
+
+def obj_from_key(key):
+    name, lib = key # JSON turns tuples into lists
+    obj = bpy.data.objects.get(name)
+    if obj and ((obj.library.filepath if obj.library else None) != lib):
+        # (name, library) keys aren't supported by older versions
+        obj = next((obj for obj in bpy.data.objects if (obj.name == name) and
+            ((obj.library.filepath if obj.library else None) == lib)), None)
+    if obj is None: raise KeyError("Object {!r} (library {!r}) not found".format(name, lib))
+    return obj
+
+def sorted_obj_keys(objs):
+    return sorted((obj_key(obj) for obj in objs), key=(lambda key: (key[0], key[1] or "")))
+
 def belongs_to_group(obj, group, consider_dupli=False):
     if not obj: return None
     # Object is either IN some group or INSTANTIATES that group, never both
@@ -198,6 +227,36 @@ def instantiate_duplis(obj, scene=None, settings='VIEWPORT', depth=-1):
     for dst_obj, src_obj, matrix in dst_info:
         instantiate_duplis(dst_obj, scene, settings, depth)
 
+def scene_context(scene, context=None):
+    """
+    Context override for running operators and exporters in the given scene.
+    Assigning screen.scene only takes effect when the event loop gets to it,
+    so a scene that isn't the screen's must be passed to operators explicitly.
+    """
+    if not context: context = bpy.context
+    
+    # Object.select only syncs the base in the context's scene
+    for base in scene.object_bases:
+        if base.select != base.object.select: base.select = base.object.select
+    
+    visible_bases = [base for base in scene.object_bases
+        if (not base.object.hide) and layers_intersect(base, scene)]
+    selected_bases = [base for base in visible_bases if base.select]
+    editable_bases = [base for base in visible_bases if not base.object.library]
+    selected_editable_bases = [base for base in editable_bases if base.select]
+    
+    active_object = scene.objects.active
+    active_base = scene.object_bases.active
+    
+    override = context.copy()
+    override.update(scene=scene, object=active_object, active_object=active_object, active_base=active_base,
+        edit_object=None, visible_bases=visible_bases, visible_objects=[base.object for base in visible_bases],
+        selected_bases=selected_bases, selected_objects=[base.object for base in selected_bases],
+        editable_bases=editable_bases, editable_objects=[base.object for base in editable_bases],
+        selected_editable_bases=selected_editable_bases,
+        selected_editable_objects=[base.object for base in selected_editable_bases])
+    return override
+
 class PrimitiveLock(object):
     "Primary use of such lock is to prevent infinite recursion"
     def __init__(self):
@@ -254,6 +313,106 @@ def fletcher(data, n): # n should be 16, 32 or 64
         sum2 = (sum2 + sum1) % mod
     return sum1 + (sum2 * (mod+1))
 
+class Fletcher:
+    """
+    Streaming version of fletcher(): the digest is the same as fletcher(data, n)
+    of all the data passed to update() so far. Blocks are processed in large
+    chunks (numpy or C-level reductions over memoryviews), since for k blocks
+    sum1 grows by their sum and sum2 by k*sum1 + the sum of their prefix sums.
+    """
+    chunk_blocks = 1 << 15 # small enough for the uint64 weighted sums not to overflow
+    _weights = None
+    
+    def __init__(self, n=32, data=None):
+        self.nbytes = min(max(n // 16, 1), 4)
+        self.mod = 2 ** (8 * self.nbytes) - 1
+        self.sum1 = 0
+        self.sum2 = 0
+        self.tail = b"" # incomplete block
+        if data is not None: self.update(data)
+    
+    def update(self, data):
+        data = memoryview(data).cast('B')
+        nbytes = self.nbytes
+        
+        if self.tail:
+            i = nbytes - len(self.tail)
+            self.tail += data[:i].tobytes()
+            data = data[i:]
+            if len(self.tail) < nbytes: return
+            self._add_blocks(memoryview(self.tail))
+            self.tail = b""
+        
+        size = len(data) - (len(data) % nbytes)
+        chunk_size = self.chunk_blocks * nbytes
+        for i in range(0, size, chunk_size):
+            self._add_blocks(data[i:min(i + chunk_size, size)])
+        
+        if size < len(data): self.tail = data[size:].tobytes()
+    
+    def _add_blocks(self, data):
+        nbytes = self.nbytes
+        count = len(data) // nbytes
+        # For k blocks b[i], the sum of prefix sums is sum((k - i) * b[i])
+        if numpy:
+            if nbytes == 3:
+                planes = numpy.frombuffer(data, dtype=numpy.uint8).reshape(-1, 3).astype(numpy.uint64)
+                blocks = planes[:,0] | (planes[:,1] << 8) | (planes[:,2] << 16)
+            else:
+                blocks = numpy.frombuffer(data, dtype="<u{}".format(nbytes)).astype(numpy.uint64)
+            weights = Fletcher._weights
+            if (weights is None) or (len(weights) < count):
+                weights = numpy.arange(max(count, self.chunk_blocks), 0, -1, dtype=numpy.uint64)
+                Fletcher._weights = weights
+            sum_blocks = int(blocks.sum())
+            sum_prefixes = int(numpy.dot(blocks, weights[len(weights)-count:]))
+        elif (nbytes != 3) and (sys.byteorder == 'little'):
+            blocks = data.cast("BH?I"[nbytes-1])
+            sum_blocks = sum(blocks)
+            sum_prefixes = sum(itertools.accumulate(blocks))
+        else:
+            # Block values are linear in their bytes, so each byte position
+            # can be reduced separately and scaled afterwards
+            sum_blocks = 0
+            sum_prefixes = 0
+            for p in range(nbytes):
+                plane = data[p::nbytes]
+                sum_blocks += sum(plane) << (8 * p)
+                sum_prefixes += sum(itertools.accumulate(plane)) << (8 * p)
+        
+        self.sum2 = (self.sum2 + count * self.sum1 + sum_prefixes) % self.mod
+        self.sum1 = (self.sum1 + sum_blocks) % self.mod
+    
+    def digest(self):
+        sum1, sum2 = self.sum1, self.sum2
+        if self.tail:
+            sum1 = (sum1 + int.from_bytes(self.tail, 'little')) % self.mod
+            sum2 = (sum2 + sum1) % self.mod
+        return sum1 + (sum2 * (self.mod+1))
+    
+    def hexdigest(self):
+        return "{:x}".format(self.digest())
+
+def benchmark_fletcher(size=16*1024*1024, ns=(16, 32, 64), update_size=1024*1024):
+    """Print the throughput (MB/s) of fletcher() and Fletcher on random data"""
+    data = os.urandom(size)
+    view = memoryview(data)
+    mb = size / (1024.0 * 1024.0)
+    for n in ns:
+        time_start = time.perf_counter()
+        reference = fletcher(data, n)
+        time_reference = time.perf_counter() - time_start
+        
+        time_start = time.perf_counter()
+        hasher = Fletcher(n)
+        for i in range(0, size, update_size):
+            hasher.update(view[i:i+update_size])
+        result = hasher.digest()
+        time_streaming = time.perf_counter() - time_start
+        
+        print("n={}: fletcher {:.1f} MB/s, Fletcher {:.1f} MB/s{}".format(n,
+            mb / time_reference, mb / time_streaming, ("" if result == reference else " (MISMATCH)")))
+
 def hashnames():
     hashnames_codes = [chr(o) for o in range(ord("0"), ord("9")+1)]
     hashnames_codes += [chr(o) for o in range(ord("A"), ord("Z")+1)]
@@ -620,6 +779,9 @@ class ExportSelected_Base(ExportHelper):
         
         self.preset_name = bpy_path_splitext(self.preset_select)[0]
         
+        ExportSelected_Base.load_settings(self, json_data)
+    
+    def load_settings(self, json_data):
         def value_convert(value):
             if isinstance(value, list):
                 if not value: return set()
@@ -627,7 +789,7 @@ class ExportSelected_Base(ExportHelper):
                 return set(value) if isinstance(first_item, str) else tuple(value)
             return value
         
-        exporter_data = json_data.pop("exporter_props", {})
+        exporter_data = json_data.get("exporter_props", {})
         
         for key, value in ExportSelected_Base.main_kwargs(self, True).items():
             if key not in json_data: continue
@@ -639,19 +801,7 @@ class ExportSelected_Base(ExportHelper):
             if key not in exporter_data: continue
             setattr(self.exporter_props, key, value_convert(exporter_data[key]))
     
-    def update_preset_name(self, context):
-        clean_name = clean_filename(self.preset_name)
-        if self.preset_name != clean_name: self.preset_name = clean_name
-    
-    def save_preset(self, context):
-        if not self.preset_save: return
-        if not self.preset_name: return
-        
-        preset_dir = bpy_path_join(operator_presets_dir, ExportSelected.bl_idname, "")
-        if not os.path.exists(preset_dir): os.makedirs(preset_dir)
-        
-        preset_path = bpy_path_join(preset_dir, self.preset_name+".json")
-        
+    def save_settings(self):
         exclude_keys = {"filepath", "filename_ext", "filter_glob", "check_existing"}
         
         def value_convert(value):
@@ -668,6 +818,23 @@ class ExportSelected_Base(ExportHelper):
             if key in exclude_keys: continue
             json_data[key] = value_convert(value)
         
+        return json_data
+    
+    def update_preset_name(self, context):
+        clean_name = clean_filename(self.preset_name)
+        if self.preset_name != clean_name: self.preset_name = clean_name
+    
+    def save_preset(self, context):
+        if not self.preset_save: return
+        if not self.preset_name: return
+        
+        preset_dir = bpy_path_join(operator_presets_dir, ExportSelected.bl_idname, "")
+        if not os.path.exists(preset_dir): os.makedirs(preset_dir)
+        
+        preset_path = bpy_path_join(preset_dir, self.preset_name+".json")
+        
+        json_data = ExportSelected_Base.save_settings(self)
+        
         with open(preset_path, "w") as f:
             f.write(json.dumps(json_data, sort_keys=True, indent=4))
     
@@ -726,6 +893,10 @@ class ExportSelected_Base(ExportHelper):
         ('INDIVIDUAL_ORIGINS', "Individual", "Center each exported object", 'ROTATECOLLECTION', 5),
     ])
     
+    use_temp_scene = bpy.props.BoolProperty(name="Temp scene", description="Export each bundle from a temporary scene with copies of its objects (instead of clearing the whole file and undoing the changes)", default=False)
+    use_manifest = bpy.props.BoolProperty(name="Incremental", description="Skip bundles that haven't changed since the previous export (content hashes are stored in a manifest file in the output directory)", default=False)
+    parallel_bundles = bpy.props.IntProperty(name="Parallel", description="Number of background Blender processes exporting bundles in parallel (0: export in this process)", default=0, min=0, soft_max=16)
+    
     preserve_dupli_hierarchy = bpy.props.BoolProperty(name="Preserve dupli hierarchy", description="Preserve dupli hierarchy", default=True)
     use_convert_dupli = bpy.props.BoolProperty(name="Dupli->real", description="Make duplicates real", default=False)
     use_convert_mesh = bpy.props.BoolProperty(name="To meshes", description="Convert to mesh(es)", default=False)
@@ -872,6 +1043,12 @@ class ExportSelected_Base(ExportHelper):
         row.prop(self, "use_convert_dupli", toggle=True)
         row.prop(self, "use_convert_mesh", toggle=True)
         
+        row = layout.row(True)
+        row.prop(self, "use_temp_scene", toggle=True)
+        row.prop(self, "use_manifest", toggle=True)
+        if self.bundle_mode != 'NONE':
+            row.prop(self, "parallel_bundles")
+        
         box = layout.box()
         box.enabled = False
         
@@ -881,6 +1058,400 @@ class ExportSelected_Base(ExportHelper):
         if self.preset_save: self.preset_save = False
         if self.preset_delete: self.preset_delete = False
 
+#============================================================================#
+
+# Incremental export: a manifest file in the output directory maps each
+# exported file name to a hash of everything that affects its contents
+# (settings, object names, transforms, poses, animation, custom properties,
+# data, shape keys, vertex weights, modifiers and the objects they use,
+# materials, node trees and images).
+# Bundles with an unchanged hash are skipped if their file still exists.
+
+export_manifest_name = ".export_selected.json"
+
+def rna_signature(struct, ignore=(), collections=True, visited=None):
+    """
+    Values of the properties of a bpy struct, including the nested (non-ID)
+    structs and, optionally, collections. IDs are represented by names.
+    """
+    if visited is None: visited = set()
+    # Nested structs can share the owner's pointer (e.g. material.raytrace_mirror)
+    visited.add((struct.bl_rna.identifier, struct.as_pointer()))
+    
+    def struct_value(value):
+        if value is None: return None
+        if isinstance(value, bpy.types.ID): return value.name
+        if (value.bl_rna.identifier, value.as_pointer()) in visited: return value.bl_rna.identifier
+        return rna_signature(value, ignore, collections, visited)
+    
+    values = []
+    for prop in struct.bl_rna.properties:
+        key = prop.identifier
+        if (key == "rna_type") or (key in ignore): continue
+        if (prop.type == 'COLLECTION') and not collections: continue
+        try:
+            value = getattr(struct, key, None)
+        except Exception: # some properties are only accessible in certain states
+            continue
+        if prop.type == 'COLLECTION':
+            value = [struct_value(item) for item in value]
+        elif prop.type == 'POINTER':
+            value = struct_value(value)
+        elif isinstance(value, set):
+            value = sorted(value) # enum flags
+        elif (not isinstance(value, str)) and hasattr(value, "__iter__"):
+            value = tuple(value) # arrays, vectors, matrices
+        values.append((key, value))
+    return repr(values)
+
+def id_properties_signature(struct):
+    """Custom (ID) properties of a bpy struct"""
+    def convert(value):
+        if hasattr(value, "to_dict"): return value.to_dict()
+        if hasattr(value, "to_list"): return value.to_list()
+        return value
+    try:
+        keys = sorted(struct.keys())
+    except TypeError: # struct does not support custom properties
+        return ""
+    return repr([(key, convert(struct[key])) for key in keys])
+
+def hash_fcurves(hasher, fcurves):
+    for fcurve in fcurves:
+        hasher.update(rna_signature(fcurve, ignore=fcurve_bulk_properties).encode())
+        points = fcurve.keyframe_points
+        hash_foreach(hasher, points, "co", 2)
+        hash_foreach(hasher, points, "handle_left", 2)
+        hash_foreach(hasher, points, "handle_right", 2)
+        hasher.update(repr([(point.interpolation, getattr(point, "easing", None),
+            point.handle_left_type, point.handle_right_type) for point in points]).encode())
+
+# Keyframes are hashed in bulk; the rest only affect the UI
+fcurve_bulk_properties = {"keyframe_points", "sampled_points", "select", "hide", "lock"}
+
+def hash_animation(hasher, id_data, visited):
+    anim_data = getattr(id_data, "animation_data", None)
+    if not anim_data:
+        hasher.update(b"\0")
+        return
+    hasher.update(rna_signature(anim_data, ignore=fcurve_bulk_properties).encode())
+    actions = [anim_data.action]
+    actions.extend(strip.action for track in anim_data.nla_tracks for strip in track.strips)
+    for action in actions:
+        if (not action) or (action in visited): continue
+        visited.add(action)
+        hasher.update(action.name.encode())
+        hash_fcurves(hasher, action.fcurves)
+    hash_fcurves(hasher, anim_data.drivers)
+
+def hash_id(hasher, id_data, visited):
+    """Custom properties and animation of an ID"""
+    hasher.update(id_properties_signature(id_data).encode())
+    hash_animation(hasher, id_data, visited)
+
+def hash_foreach(hasher, items, attr, size, typecode='f'):
+    buf = array.array(typecode, [0]) * (len(items) * size)
+    if buf: items.foreach_get(attr, buf)
+    hasher.update(buf)
+
+def hash_matrix(hasher, matrix):
+    hasher.update(repr(tuple(tuple(row) for row in matrix)).encode())
+
+def mesh_ui_properties(mesh):
+    # Selection counts and viewport display options
+    ignore = {"total_vert_sel", "total_edge_sel", "total_face_sel", "is_editmode"}
+    ignore.update(prop.identifier for prop in mesh.bl_rna.properties if prop.identifier.startswith("show_"))
+    return ignore
+
+def hash_data(hasher, data, visited):
+    hasher.update(data.name.encode())
+    hash_id(hasher, data, visited)
+    if isinstance(data, bpy.types.Mesh):
+        hasher.update(rna_signature(data, ignore=mesh_ui_properties(data), collections=False).encode())
+        hash_foreach(hasher, data.vertices, "co", 3)
+        hash_foreach(hasher, data.edges, "vertices", 2, 'i')
+        hash_foreach(hasher, data.edges, "use_seam", 1, 'b')
+        hash_foreach(hasher, data.edges, "use_edge_sharp", 1, 'b')
+        hash_foreach(hasher, data.loops, "vertex_index", 1, 'i')
+        hash_foreach(hasher, data.polygons, "loop_total", 1, 'i')
+        hash_foreach(hasher, data.polygons, "material_index", 1, 'i')
+        hash_foreach(hasher, data.polygons, "use_smooth", 1, 'b')
+        for layer in data.uv_layers:
+            hasher.update(layer.name.encode())
+            hash_foreach(hasher, layer.data, "uv", 2)
+        for layer in data.vertex_colors:
+            hasher.update(layer.name.encode())
+            hash_foreach(hasher, layer.data, "color", 3)
+        if data.shape_keys:
+            shape_keys = data.shape_keys
+            hash_id(hasher, shape_keys, visited) # e.g. animated key values
+            hasher.update(rna_signature(shape_keys, collections=False).encode())
+            for key_block in shape_keys.key_blocks:
+                # name, value, mute, relative_key, slider_min/max, vertex_group, etc.
+                hasher.update(rna_signature(key_block, collections=False).encode())
+                hash_foreach(hasher, key_block.data, "co", 3)
+    elif isinstance(data, bpy.types.Curve):
+        hasher.update(rna_signature(data, ignore=("splines",)).encode())
+        for spline in data.splines:
+            hasher.update(rna_signature(spline, collections=False).encode())
+            hash_foreach(hasher, spline.points, "co", 4)
+            hash_foreach(hasher, spline.points, "radius", 1)
+            hash_foreach(hasher, spline.points, "tilt", 1)
+            hash_foreach(hasher, spline.points, "weight", 1)
+            hash_foreach(hasher, spline.bezier_points, "co", 3)
+            hash_foreach(hasher, spline.bezier_points, "handle_left", 3)
+            hash_foreach(hasher, spline.bezier_points, "handle_right", 3)
+            hash_foreach(hasher, spline.bezier_points, "radius", 1)
+            hash_foreach(hasher, spline.bezier_points, "tilt", 1)
+        for ref_obj in (data.bevel_object, data.taper_object):
+            if ref_obj: hash_object(hasher, ref_obj, visited)
+    elif isinstance(data, bpy.types.Armature):
+        hash_foreach(hasher, data.bones, "head_local", 3)
+        hash_foreach(hasher, data.bones, "tail_local", 3)
+        hasher.update(repr([(bone.name, bone.parent and bone.parent.name) for bone in data.bones]).encode())
+    elif isinstance(data, bpy.types.Lattice):
+        hasher.update(rna_signature(data, collections=False).encode())
+        hash_foreach(hasher, data.points, "co_deform", 3)
+    else:
+        hasher.update(rna_signature(data).encode())
+    
+    for material in getattr(data, "materials", ()):
+        hash_material(hasher, material, visited)
+
+def hash_vertex_weights(hasher, mesh):
+    groups = array.array('i')
+    weights = array.array('f')
+    for vertex in mesh.vertices:
+        for group_element in vertex.groups:
+            groups.append(group_element.group)
+            weights.append(group_element.weight)
+        groups.append(-1)
+    hasher.update(groups)
+    hasher.update(weights)
+
+def hash_image(hasher, image):
+    if not image:
+        hasher.update(b"\0")
+        return
+    # pixels are only hashed if they were modified in Blender; bindcode is GL state
+    hasher.update(rna_signature(image, ignore=("pixels", "bindcode", "packed_file")).encode())
+    hasher.update(id_properties_signature(image).encode())
+    if image.packed_file:
+        data = image.packed_file.data
+        hasher.update(data if isinstance(data, bytes) else data.encode("utf-8", "surrogateescape"))
+    if image.is_dirty:
+        hasher.update(array.array('f', image.pixels[:]))
+    elif image.source in ('FILE', 'SEQUENCE', 'MOVIE') and not image.packed_file:
+        # The file can be changed outside of Blender
+        try:
+            path = bpy.path.abspath(image.filepath, library=image.library)
+            hasher.update(repr(os.path.getmtime(path)).encode())
+        except (OSError, TypeError):
+            pass
+
+def hash_texture(hasher, texture):
+    if not texture:
+        hasher.update(b"\0")
+        return
+    hasher.update(rna_signature(texture).encode())
+    hasher.update(id_properties_signature(texture).encode())
+    if isinstance(texture, bpy.types.ImageTexture): hash_image(hasher, texture.image)
+
+# Node properties that only affect the node editor
+node_ui_properties = {"location", "width", "width_hidden", "height", "dimensions", "select",
+    "hide", "show_options", "show_preview", "show_texture", "show_expanded", "use_custom_color",
+    "color", "label"}
+
+def hash_node_tree(hasher, node_tree, visited):
+    if not node_tree:
+        hasher.update(b"\0")
+        return
+    hasher.update(node_tree.name.encode())
+    if node_tree in visited: return
+    visited.add(node_tree)
+    hash_id(hasher, node_tree, visited)
+    
+    for node in sorted(node_tree.nodes, key=(lambda node: node.name)):
+        hasher.update(node.bl_idname.encode())
+        hasher.update(rna_signature(node, ignore=node_ui_properties).encode())
+        for socket in node.inputs:
+            value = getattr(socket, "default_value", None)
+            if (not isinstance(value, str)) and hasattr(value, "__iter__"): value = tuple(value)
+            hasher.update(repr((socket.identifier, value)).encode())
+        if isinstance(getattr(node, "image", None), bpy.types.Image): hash_image(hasher, node.image)
+        if isinstance(getattr(node, "texture", None), bpy.types.Texture): hash_texture(hasher, node.texture)
+        if isinstance(getattr(node, "node_tree", None), bpy.types.NodeTree): hash_node_tree(hasher, node.node_tree, visited)
+    
+    links = sorted((link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+        for link in node_tree.links)
+    hasher.update(repr(links).encode())
+
+def hash_material(hasher, material, visited):
+    if not material:
+        hasher.update(b"\0")
+        return
+    hasher.update(rna_signature(material).encode())
+    hash_id(hasher, material, visited)
+    for slot in getattr(material, "texture_slots", ()):
+        if slot:
+            hasher.update(rna_signature(slot).encode())
+            hash_texture(hasher, slot.texture)
+    if material.use_nodes: hash_node_tree(hasher, material.node_tree, visited)
+
+def hash_object(hasher, obj, visited):
+    if obj in visited: return
+    visited.add(obj)
+    
+    hasher.update(obj.name.encode())
+    hasher.update(obj.type.encode())
+    hash_matrix(hasher, obj.matrix_world)
+    hasher.update(repr((obj.parent and obj.parent.name, obj.parent_type, obj.parent_bone)).encode())
+    hash_id(hasher, obj, visited)
+    
+    if obj.data: hash_data(hasher, obj.data, visited)
+    
+    if obj.pose:
+        for pose_bone in obj.pose.bones:
+            hash_matrix(hasher, pose_bone.matrix)
+    
+    if obj.vertex_groups:
+        # Weights are used by armature and other modifiers
+        hasher.update(repr([vertex_group.name for vertex_group in obj.vertex_groups]).encode())
+        if obj.type == 'MESH': hash_vertex_weights(hasher, obj.data)
+    
+    for slot in obj.material_slots:
+        hasher.update(slot.link.encode())
+        if slot.link == 'OBJECT': hash_material(hasher, slot.material, visited)
+    
+    for md in obj.modifiers:
+        hasher.update(rna_signature(md).encode())
+        # Operands (boolean, lattice, curve, shrinkwrap target, armature, etc.)
+        for prop in md.bl_rna.properties:
+            if prop.type != 'POINTER': continue
+            value = getattr(md, prop.identifier, None)
+            if isinstance(value, bpy.types.Object):
+                hash_object(hasher, value, visited)
+            elif isinstance(value, bpy.types.Texture):
+                hash_texture(hasher, value)
+    
+    hasher.update(obj.dupli_type.encode())
+    if (obj.dupli_type == 'GROUP') and obj.dupli_group:
+        for dupli_obj in sorted(obj.dupli_group.objects, key=(lambda obj: obj.name)):
+            hash_object(hasher, dupli_obj, visited)
+
+class ExportManifest:
+    """Per-file content hashes of the previously exported bundles"""
+    
+    def __init__(self, dirpath):
+        self.path = os.path.join(dirpath, export_manifest_name)
+        self.entries = {}
+        try:
+            with open(self.path, "r") as f:
+                self.entries = json.loads(f.read())
+        except (IOError, ValueError):
+            pass
+    
+    def is_up_to_date(self, filepath, content_hash):
+        entry = self.entries.get(bpy_path_basename(filepath))
+        if not entry: return False
+        return (entry.get("hash") == content_hash) and os.path.isfile(filepath)
+    
+    def update(self, filepath, content_hash, elapsed):
+        self.entries[bpy_path_basename(filepath)] = {"hash":content_hash, "time":elapsed}
+    
+    def save(self):
+        dirpath = os.path.dirname(self.path)
+        if not os.path.exists(dirpath): os.makedirs(dirpath)
+        with open(self.path, "w") as f:
+            f.write(json.dumps(self.entries, sort_keys=True, indent=4))
+
+#============================================================================#
+
+# Parallel export: the current file is saved to a temporary directory,
+# and each worker (a background Blender process) exports a part of the
+# bundles. For each bundle, the worker re-opens the file and invokes
+# the operator in the "bundle job" mode (no undo is necessary).
+
+def launch_export_worker(script_path, job_path, executable=None):
+    """Start a worker process; can be replaced (e.g. to test with a stub executable)"""
+    args = [executable or bpy.app.binary_path, "--background", "--python", script_path, "--", job_path]
+    return subprocess.Popen(args)
+
+export_worker_launcher = launch_export_worker
+
+export_worker_script = """
+import sys
+import addon_utils
+addon_utils.enable({module!r}, default_set=False)
+import {module}
+{module}.run_export_worker(sys.argv[sys.argv.index("--") + 1])
+"""
+
+def run_export_worker(job_path):
+    with open(job_path, "r") as f:
+        job = json.loads(f.read())
+    
+    results = []
+    for i, (filepath, obj_keys) in enumerate(job["bundles"]):
+        result = {"filepath":filepath, "time":0.0, "error":None}
+        results.append(result)
+        try:
+            bpy.ops.wm.open_mainfile(filepath=job["blend"])
+            time_start = time.perf_counter()
+            bpy.ops.export_scene.selected(use_file_browser=False, bundle_job=job_path, bundle_index=i)
+            result["time"] = time.perf_counter() - time_start
+        except Exception as exc:
+            result["error"] = "{}: {}".format(type(exc).__name__, exc)
+    
+    with open(job["results"], "w") as f:
+        f.write(json.dumps(results))
+
+def benchmark_export(use_temp_scene, object_count=1000, bundle_count=20, exporter="export_scene.obj"):
+    """
+    Build a synthetic scene (object_count subdivided cubes), export bundle_count
+    of them individually and print the wall time and the peak memory of the process.
+    Peak memory can't be reset, so each mode should be measured in a fresh Blender
+    session (from its Python console; the undo mode needs a window).
+    """
+    import bmesh
+    try:
+        import resource
+    except ImportError:
+        resource = None # not available on Windows
+    
+    scene = bpy.context.scene
+    
+    for i in range(object_count):
+        bm = bmesh.new()
+        bmesh.ops.create_cube(bm, size=1.0)
+        mesh = bpy.data.meshes.new("BenchmarkMesh")
+        bm.to_mesh(mesh)
+        bm.free()
+        obj = bpy.data.objects.new("Benchmark{}".format(i), mesh)
+        obj.location = ((i % 32) * 2.0, (i // 32) * 2.0, 0.0)
+        obj.modifiers.new("Subsurf", 'SUBSURF').levels = 2
+        scene.objects.link(obj)
+    
+    for obj in scene.objects:
+        obj.select = obj.name.startswith("Benchmark") and (int(obj.name[len("Benchmark"):]) < bundle_count)
+    
+    scene.update()
+    
+    tmp_dir = tempfile.mkdtemp(prefix="export_selected_benchmark_")
+    try:
+        time_start = time.perf_counter()
+        bpy.ops.export_scene.selected(use_file_browser=False, exporter_str=exporter,
+            filepath=bpy_path_join(tmp_dir, "bundle"), bundle_mode='INDIVIDUAL',
+            include_hierarchy='SELECTED', use_temp_scene=use_temp_scene)
+        elapsed = time.perf_counter() - time_start
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    peak_memory = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None)
+    print("{}: {} bundles of {} objects in {:.3f} s, peak memory {} KB".format(
+        ("temp scene" if use_temp_scene else "undo"), bundle_count, object_count, elapsed, peak_memory))
+    return elapsed, peak_memory
+
 class ExportSelected(bpy.types.Operator, ExportSelected_Base):
     '''Export selected objects to a chosen format'''
     bl_idname = "export_scene.selected"
@@ -889,6 +1460,10 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
     
     use_file_browser = bpy.props.BoolProperty(name="Use file browser", description="Use file browser", default=True)
     
+    # Used by the worker processes of parallel export
+    bundle_job = bpy.props.StringProperty(default="", options={'HIDDEN', 'SKIP_SAVE'})
+    bundle_index = bpy.props.IntProperty(default=-1, options={'HIDDEN', 'SKIP_SAVE'})
+    
     def center_objects(self, scene, objs):
         if self.centering_mode == 'WORLD': return
         if not objs: return
@@ -941,7 +1516,7 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
             for obj in scene.objects:
                 obj.hide_select = False
                 obj.select = obj in objs
-            bpy.ops.object.duplicates_make_real(use_base_parent=False, use_hierarchy=False)
+            bpy.ops.object.duplicates_make_real(scene_context(scene), use_base_parent=False, use_hierarchy=False)
         else:
             for obj in objs:
                 instantiate_duplis(obj, scene)
@@ -950,22 +1525,35 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
             if obj in del_objs: continue
             if self.can_include(obj, scene): objs.add(obj)
     
-    def convert_mesh(self, scene, objs):
+    def convert_mesh(self, scene, objs, copy_data=False):
         specifics = exporter_specifics.get(self.exporter, {})
         use_convert_mesh = self.use_convert_mesh or (not specifics.get("nonmesh", True))
         
         if not use_convert_mesh: return
         if not objs: return
         
+        if copy_data:
+            # object.convert() applies modifiers in-place, which would affect
+            # other users of the mesh (e.g. the originals of copied objects)
+            for obj in objs:
+                if obj.type != 'MESH': continue
+                if obj.modifiers:
+                    obj.data = obj.to_mesh(scene, True, 'PREVIEW')
+                    obj.modifiers.clear()
+            objs_to_convert = {obj for obj in objs if obj.type != 'MESH'}
+            if not objs_to_convert: return
+        else:
+            objs_to_convert = objs
+        
         for obj in scene.objects:
             obj.hide_select = False
-            obj.select = obj in objs
+            obj.select = obj in objs_to_convert
         
         # For some reason object.convert() REQUIRES an active object to be present
-        if scene.objects.active not in objs: scene.objects.active = next(iter(objs))
+        if scene.objects.active not in objs_to_convert: scene.objects.active = next(iter(objs_to_convert))
         
         prev_objs = set(scene.objects)
-        bpy.ops.object.convert(target='MESH')
+        bpy.ops.object.convert(scene_context(scene), target='MESH')
         new_objs = set(scene.objects) - prev_objs
         
         for obj in new_objs:
@@ -986,6 +1574,7 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
             if (not instancing) and (data.users - int(data.use_fake_user) > 1):
                 data = data.copy()
                 obj.data = data
+            if data.library: continue # linked datablocks can't be renamed
             name = names.get(data)
             if (name is None) or (len(obj.name) < len(name)):
                 names[data] = obj.name
@@ -1050,9 +1639,114 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
         
         if specifics.get("join", False):
             scene.objects.active = self.find_mesh_obj(objs, scene.objects.active)
-            if scene.objects.active: bpy.ops.object.join()
+            if scene.objects.active: bpy.ops.object.join(scene_context(scene))
+    
+    def copy_to_scene(self, scene, objs):
+        """
+        Link copies of objs to the scene; copies take the names of
+        the originals (exporters use object names), and originals are
+        temporarily renamed (so objs must not be linked from libraries).
+        Returns {original: original_name}.
+        """
+        copies = {}
+        renamed = {}
+        for i, obj in enumerate(objs):
+            name = obj.name
+            obj.name = "ExportSelected.{}".format(i)
+            renamed[obj] = name
+            copy = obj.copy()
+            copy.name = name
+            copy.layers = scene.layers
+            scene.objects.link(copy)
+            copies[obj] = copy
+        
+        for obj, copy in copies.items():
+            copy_parent = copies.get(obj.parent)
+            if copy_parent:
+                copy.parent = copy_parent
+            else:
+                copy.parent = None
+                copy.matrix_world = Matrix(obj.matrix_world)
+        
+        return set(copies.values()), renamed
     
-    def export(self, context):
+    def export_bundle_temp_scene(self, context, filepath, bundle):
+        """
+        Alternative to clear_world() + undo: the bundle is built in a temporary
+        scene from copies of its objects, so time and memory depend on the
+        bundle size rather than on the size of the whole file
+        """
+        specifics = exporter_specifics.get(self.exporter, {})
+        
+        self.filepath = filepath
+        
+        scene = context.scene
+        
+        id_collections = (bpy.data.objects, bpy.data.meshes, bpy.data.curves)
+        prev_ids = [set(ids) for ids in id_collections]
+        
+        # rename_data() renames datablocks shared with the original objects
+        addon_prefs = context.user_preferences.addons[__name__].preferences
+        data_names = {}
+        if addon_prefs.rename_data:
+            data_names = {obj.data: obj.data.name for obj in bpy.data.objects
+                if obj.data and not obj.data.library}
+        
+        with ToggleObjectMode(undo=None):
+            tmp_scene = bpy.data.scenes.new("ExportSelected")
+            renamed = {}
+            try:
+                tmp_scene.layers = [True] * len(tmp_scene.layers)
+                tmp_scene.frame_current = scene.frame_current
+                tmp_scene.world = scene.world
+                tmp_scene.render.fps = scene.render.fps
+                tmp_scene.unit_settings.system = scene.unit_settings.system
+                tmp_scene.unit_settings.scale_length = scene.unit_settings.scale_length
+                tmp_scene.cursor_location = scene.cursor_location
+                
+                objs, renamed = self.copy_to_scene(tmp_scene, bundle)
+                if scene.objects.active in renamed:
+                    tmp_scene.objects.active = tmp_scene.objects.get(renamed[scene.objects.active])
+                
+                tmp_scene.update()
+                
+                self.center_objects(tmp_scene, objs)
+                self.convert_dupli(tmp_scene, objs)
+                self.convert_mesh(tmp_scene, objs, copy_data=True)
+                self.rename_data(tmp_scene, objs)
+                self.delete_other_objects(tmp_scene, objs)
+                
+                for obj in tmp_scene.objects:
+                    obj.hide_select = False
+                    obj.select = True
+                
+                tmp_scene.update()
+                
+                if specifics.get("join", False):
+                    tmp_scene.objects.active = self.find_mesh_obj(objs, tmp_scene.objects.active)
+                    if tmp_scene.objects.active:
+                        active_obj = tmp_scene.objects.active
+                        active_obj.data = active_obj.data.copy() # join modifies the data in-place
+                        bpy.ops.object.join(scene_context(tmp_scene, context))
+                
+                self.export(context, scene_context(tmp_scene, context))
+            finally:
+                try:
+                    bpy.data.scenes.remove(tmp_scene, do_unlink=True) # Blender 2.78
+                except TypeError:
+                    bpy.data.scenes.remove(tmp_scene) # earlier versions
+                
+                # Copies, converted objects and their data
+                for ids, prev in zip(id_collections, prev_ids):
+                    for id_data in set(ids) - prev:
+                        if id_data.users == 0: ids.remove(id_data)
+                
+                for obj, name in renamed.items():
+                    obj.name = name
+                for data, name in data_names.items():
+                    data.name = name
+    
+    def export(self, context, override=None):
         dirpath = self.abspath(bpy_path_split(self.filepath)[0])
         if not os.path.exists(dirpath): os.makedirs(dirpath)
         
@@ -1062,22 +1756,40 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
         
         if self.exporter != 'BLEND':
             op = get_op(self.exporter)
-            op(**kwargs)
+            if override:
+                op(override, **kwargs)
+            else:
+                op(**kwargs)
             # NOTE: For some reason, Alembic prevents undoing the effects
             # of clear_world(), at least in Blender 2.78a.
             # The user can undo manually, but doing it from script appears impossible.
         else:
             kwargs = {"compress":kwargs["compress"], "relative_remap":kwargs["relative_remap"]}
-            if hasattr(bpy.data.libraries, "write") and addon_prefs.save_blend_as_lib:
+            # In temp scene mode, the whole file can't be saved (it contains everything)
+            if hasattr(bpy.data.libraries, "write") and (addon_prefs.save_blend_as_lib or self.use_temp_scene):
                 # Hopefully this does not save unused libraries:
-                refs = {context.scene} # {a, *b} syntax is only supported in recent Blender versions
-                refs.update(context.scene.objects)
+                scene = (override["scene"] if override else context.scene)
+                refs = {scene} # {a, *b} syntax is only supported in recent Blender versions
+                refs.update(scene.objects)
                 bpy.data.libraries.write(self.filepath, refs, **kwargs)
             else:
                 bpy.ops.wm.save_as_mainfile(filepath=self.filepath, copy=True, **kwargs)
     
-    def export_bundle(self, context, filepath, bundle):
+    def export_bundle(self, context, filepath, bundle, use_undo=True):
         self.filepath = filepath
+        if not use_undo:
+            # The changes are discarded anyway (e.g. the file is re-opened)
+            with ToggleObjectMode(undo=None):
+                self.clear_world(context, bundle)
+                self.export(context)
+            return
+        use_temp_scene = self.use_temp_scene
+        if (self.exporter == 'BLEND') and (not hasattr(bpy.data.libraries, "write")): use_temp_scene = False
+        # Names of linked objects are read-only, so the copies can't take them over
+        if any(obj.library for obj in bundle): use_temp_scene = False
+        if use_temp_scene:
+            self.export_bundle_temp_scene(context, filepath, bundle)
+            return
         with ToggleObjectMode(undo=None):
             edit_preferences = bpy.context.user_preferences.edit
             use_global_undo = edit_preferences.use_global_undo
@@ -1132,12 +1844,12 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
             for obj in objs:
                 for key in keyfunc(obj):
                     clean_keys[key] = clean_filename(key)
-                    bundles_dict.setdefault(key, []).append(obj.name)
+                    bundles_dict.setdefault(key, []).append(obj_key(obj))
             self.resolve_key_conflicts(clean_keys)
             if bpy_path_basename(basepath): basepath += "-"
             for key, bundle in bundles_dict.items():
                 # Due to Undo on export, object references will be invalid
-                bundle = {bpy.data.objects[obj_name] for obj_name in bundle}
+                bundle = {obj_from_key(item) for item in bundle}
                 yield basepath+clean_keys[key]+ext, bundle
     
     @classmethod
@@ -1153,15 +1865,161 @@ class ExportSelected(bpy.types.Operator, ExportSelected_Base):
         else:
             return self.execute(context)
     
+    def execute_bundle_job(self, context):
+        with open(self.bundle_job, "r") as f:
+            job = json.loads(f.read())
+        self.load_settings(job)
+        filepath, obj_keys = job["bundles"][self.bundle_index]
+        bundle = {obj_from_key(key) for key in obj_keys}
+        self.export_bundle(context, filepath, bundle, use_undo=False)
+        return {'FINISHED'}
+    
+    _manifest_settings_ignore = {"use_manifest", "parallel_bundles", "use_temp_scene"}
+    def manifest_settings(self, context):
+        def sort_sets(value):
+            if isinstance(value, dict): return {k:sort_sets(v) for k, v in value.items()}
+            if isinstance(value, list) and value and isinstance(value[0], str): return sorted(value)
+            return value
+        
+        # save_settings() converts sets to lists, which have to be in a stable order
+        settings = sort_sets(self.save_settings())
+        for key in self._manifest_settings_ignore:
+            settings.pop(key, None)
+        scene = context.scene
+        if self.centering_mode == 'CURSOR':
+            settings["cursor_location"] = tuple(scene.cursor_location)
+        elif self.centering_mode == 'ACTIVE_ELEMENT':
+            obj = scene.objects.active
+            settings["active_location"] = (tuple(obj.matrix_world.translation) if obj else None)
+        return json.dumps(settings, sort_keys=True).encode()
+    
+    def bundle_hash(self, settings, bundle):
+        hasher = hashlib.sha1(settings)
+        visited = set()
+        for obj in sorted(bundle, key=(lambda obj: obj.name)):
+            hash_object(hasher, obj, visited)
+        return hasher.hexdigest()
+    
+    def report_results(self, results, skipped, elapsed, worker_count=0):
+        for filepath in skipped:
+            print("unchanged: {}".format(filepath))
+        
+        errors = [result for result in results if result["error"]]
+        for result in results:
+            print("{:.3f} s: {}{}".format(result["time"], result["filepath"],
+                (" ({})".format(result["error"]) if result["error"] else "")))
+        
+        message = "Exported {} bundle(s)".format(len(results) - len(errors))
+        if worker_count: message += " with {} worker(s)".format(worker_count)
+        if skipped: message += ", skipped {} unchanged".format(len(skipped))
+        message += " in {:.1f} s".format(elapsed)
+        if errors:
+            self.report({'WARNING'}, message + ", {} failed (see console)".format(len(errors)))
+        else:
+            self.report({'INFO'}, message)
+    
+    def export_parallel(self, context, objs, manifest=None):
+        addon_prefs = context.user_preferences.addons[__name__].preferences
+        
+        time_start = time.perf_counter()
+        
+        bundles = []
+        hashes = {}
+        skipped = []
+        settings = (self.manifest_settings(context) if manifest else None)
+        for filepath, bundle in self.bundle_objects(objs):
+            if manifest:
+                hashes[filepath] = self.bundle_hash(settings, bundle)
+                if manifest.is_up_to_date(filepath, hashes[filepath]):
+                    skipped.append(filepath)
+                    continue
+            bundles.append((filepath, sorted_obj_keys(bundle)))
+        worker_count = min(self.parallel_bundles, len(bundles))
+        
+        if not bundles:
+            self.report_results([], skipped, time.perf_counter() - time_start)
+            return
+        
+        tmp_dir = tempfile.mkdtemp(prefix="export_selected_")
+        try:
+            blend_path = os.path.join(tmp_dir, "scene.blend")
+            with ToggleObjectMode(undo=None): # make sure edit-mode changes are saved
+                bpy.ops.wm.save_as_mainfile(filepath=blend_path, copy=True)
+            
+            script_path = os.path.join(tmp_dir, "worker.py")
+            with open(script_path, "w") as f:
+                f.write(export_worker_script.format(module=__name__))
+            
+            settings = self.save_settings()
+            
+            workers = []
+            for i in range(worker_count):
+                job = dict(settings)
+                job["blend"] = blend_path
+                job["bundles"] = bundles[i::worker_count]
+                job["results"] = os.path.join(tmp_dir, "results{}.json".format(i))
+                job_path = os.path.join(tmp_dir, "job{}.json".format(i))
+                with open(job_path, "w") as f:
+                    f.write(json.dumps(job))
+                process = export_worker_launcher(script_path, job_path, addon_prefs.worker_executable or None)
+                workers.append((job, process))
+            
+            results = []
+            for job, process in workers:
+                returncode = process.wait()
+                try:
+                    with open(job["results"], "r") as f:
+                        results.extend(json.loads(f.read()))
+                except (IOError, ValueError):
+                    error = "Worker failed (exit code {})".format(returncode)
+                    results.extend({"filepath":filepath, "time":0.0, "error":error} for filepath, obj_keys in job["bundles"])
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        
+        if manifest:
+            for result in results:
+                if result["error"]: continue
+                manifest.update(result["filepath"], hashes[result["filepath"]], result["time"])
+            manifest.save()
+        
+        self.report_results(results, skipped, time.perf_counter() - time_start, worker_count)
+    
     def execute(self, context):
+        if self.bundle_job: return self.execute_bundle_job(context)
         objs = self.gather_objects(context.scene)
         if not objs:
             self.report({'ERROR_INVALID_CONTEXT'}, "No objects to export")
             return {'CANCELLED'}
         self.filepath = self.abspath(self.filepath).replace("/", os.path.sep)
+        
+        manifest = None
+        if self.use_manifest:
+            manifest = ExportManifest(os.path.dirname(self.filepath))
+            # Make sure the mesh being edited has up-to-date data
+            if context.edit_object: context.edit_object.update_from_editmode()
+        
+        if (self.parallel_bundles > 0) and (self.bundle_mode != 'NONE'):
+            self.export_parallel(context, objs, manifest)
+            return {'FINISHED'}
+        
+        time_start = time.perf_counter()
+        settings = (self.manifest_settings(context) if manifest else None)
+        results = []
+        skipped = []
         for filepath, bundle in self.bundle_objects(objs):
+            if manifest:
+                content_hash = self.bundle_hash(settings, bundle)
+                if manifest.is_up_to_date(filepath, content_hash):
+                    skipped.append(filepath)
+                    continue
+            bundle_time_start = time.perf_counter()
             self.export_bundle(context, filepath, bundle)
+            result = {"filepath":filepath, "time":time.perf_counter() - bundle_time_start, "error":None}
+            results.append(result)
+            if manifest: manifest.update(filepath, content_hash, result["time"])
+        if manifest: manifest.save()
         bpy.ops.ed.undo_push(message="Export Selected")
+        self.report_results(results, skipped, time.perf_counter() - time_start)
         return {'FINISHED'}
     
     def draw(self, context):
@@ -1282,12 +2140,15 @@ class ExportSelectedPreferences(bpy.types.AddonPreferences):
         description="The exported .blend will not contain unused libraries, but thumbnails also won't be generated")
     rename_data = bpy.props.BoolProperty(name="Rename datablocks", default=False,
         description="Rename datablocks to match the corresponding objects' names")
+    worker_executable = bpy.props.StringProperty(name="Worker executable", default="", subtype='FILE_PATH',
+        description="Executable for parallel export workers (empty: the running Blender)")
     
     def draw(self, context):
         layout = self.layout
         layout.prop(self, "show_in_shelf")
         layout.prop(self, "save_blend_as_lib")
         layout.prop(self, "rename_data")
+        layout.prop(self, "worker_executable")
 
 storage_name_internal = "<%s-internal-storage>" % "io_export_selected"
 def get_internal_storage():
@@ -18,9 +18,12 @@
 #============================================================================#
 
 import bpy
+import bmesh
 
+import math
 import time
 import json
+import array
 
 from mathutils import Vector
 
@@ -123,6 +126,92 @@ def apply_shapekeys(obj):
         # This seems to be the only way to remove a shape key
         bpy.ops.object.shape_key_remove(all=False)
 
+# Modifiers that can be applied through Object.to_mesh() instead of the
+# modifier_apply operator. The values are the names of object pointers:
+# optional ones make the result depend on other objects' transforms,
+# required ones make the modifier disabled (not applicable) when unset.
+data_apply_optional_objects = {
+    'SUBSURF':(), 'TRIANGULATE':(), 'BEVEL':(), 'SOLIDIFY':(), 'DECIMATE':(),
+    'EDGE_SPLIT':(), 'REMESH':(), 'WIREFRAME':(), 'SMOOTH':(), 'LAPLACIANSMOOTH':(),
+    'MIRROR':("mirror_object",), 'SCREW':("object",),
+    'ARRAY':("offset_object", "start_cap", "end_cap", "curve"),
+}
+data_apply_required_objects = {
+    'BOOLEAN':("object",), 'ARMATURE':("object",), 'LATTICE':("object",),
+    'CURVE':("object",), 'SHRINKWRAP':("target",),
+}
+
+def data_apply_key(obj, idnames, make_single_user):
+    """
+    Returns a key under which objects can share the result of applying
+    their modifiers, or None if the modifiers must be applied via operators
+    """
+    if obj.type != 'MESH': return None # non-mesh data can't be swapped for a mesh
+    mesh = obj.data
+    if mesh.shape_keys: return None # operator refuses to apply on shape keys
+    if (mesh.users > 1) and (not make_single_user): return None # operator refuses to apply
+    # to_mesh() bakes object-linked materials into the (possibly shared) new mesh
+    if any(slot.link == 'OBJECT' for slot in obj.material_slots): return None
+    
+    is_shared = True
+    for md in obj.modifiers:
+        # to_mesh() can only apply the whole stack
+        if (idnames is not None) and (md.type not in idnames): return None
+        if not md.show_viewport: continue # skipped both by to_mesh() and operator
+        required = data_apply_required_objects.get(md.type)
+        if required is not None:
+            if not all(getattr(md, name) for name in required): return None
+            is_shared = False
+        else:
+            optional = data_apply_optional_objects.get(md.type)
+            if optional is None: return None
+            if any(getattr(md, name) for name in optional): is_shared = False
+    
+    if not is_shared: return (obj.as_pointer(),)
+    
+    # Vertex group names are stored in the object, not in the mesh
+    return (mesh.as_pointer(),
+        tuple(vertex_group.name for vertex_group in obj.vertex_groups),
+        tuple(BlRna.signature(md, ignore={"name"}) for md in obj.modifiers))
+
+def data_apply_modifiers(objs, scene, remove_disabled, delete_operands):
+    """Apply all modifiers of objects with the same data_apply_key()"""
+    objects_to_delete = set()
+    
+    mesh = objs[0].data
+    new_mesh = objs[0].to_mesh(scene, True, 'PREVIEW')
+    
+    # to_mesh() creates a new datablock, while the operator modifies the
+    # mesh in place: keep its materials, custom properties and animation
+    for i, material in enumerate(mesh.materials):
+        if i < len(new_mesh.materials): new_mesh.materials[i] = material
+    for key, value in mesh.items():
+        if hasattr(value, "to_dict"): value = value.to_dict()
+        elif hasattr(value, "to_list"): value = value.to_list()
+        new_mesh[key] = value
+    if mesh.animation_data:
+        new_mesh.animation_data_create().action = mesh.animation_data.action
+    
+    for obj in objs:
+        obj.data = new_mesh
+        for md in tuple(obj.modifiers):
+            if md.show_viewport:
+                if delete_operands and (md.type == 'BOOLEAN'):
+                    objects_to_delete.add(md.object)
+                obj.modifiers.remove(md)
+            elif remove_disabled:
+                obj.modifiers.remove(md)
+    
+    # A fake user alone shouldn't keep the old mesh (and its name)
+    if mesh.users == int(mesh.use_fake_user):
+        name = mesh.name
+        new_mesh.use_fake_user = mesh.use_fake_user
+        mesh.use_fake_user = False
+        bpy.data.meshes.remove(mesh)
+        new_mesh.name = name
+    
+    return objects_to_delete
+
 def apply_modifiers(objects, scene, idnames, options=(), apply_as='DATA'):
     active_obj = scene.objects.active
     
@@ -131,18 +220,29 @@ def apply_modifiers(objects, scene, idnames, options=(), apply_as='DATA'):
     remove_disabled = ('REMOVE_DISABLED' in options)
     delete_operands = ('DELETE_OPERANDS' in options)
     apply_shape_keys = ('APPLY_SHAPE_KEYS' in options)
-    visible_only = ('VISIBLE_ONLY' in options)
+    visible_only = ('VISIBLE_ONLY' in options) # to_mesh() skips invisible anyway
     
     objects_to_delete = set()
     
+    # Objects with the same data and modifier stack are evaluated only once
+    data_apply_groups = {}
+    
     for obj in objects:
-        scene.objects.active = obj
-        
         # Users will probably want shape keys to be applied regardless of whether there are modifiers
-        if apply_shape_keys: apply_shapekeys(obj) # also makes single-user
+        if apply_shape_keys and getattr(obj.data, "shape_keys", None):
+            scene.objects.active = obj
+            apply_shapekeys(obj) # also makes single-user
         
         if not obj.modifiers: continue
         
+        if apply_as == 'DATA':
+            key = data_apply_key(obj, idnames, make_single_user)
+            if key is not None:
+                data_apply_groups.setdefault(key, []).append(obj)
+                continue
+        
+        scene.objects.active = obj
+        
         if (obj.type != 'MESH') and covert_to_mesh:
             # "Error: Cannot apply constructive modifiers on curve"
             if obj.data.users > 1: obj.data = obj.data.copy() # don't affect other objects
@@ -179,6 +279,9 @@ def apply_modifiers(objects, scene, idnames, options=(), apply_as='DATA'):
             if successfully_applied and obj_to_delete:
                 objects_to_delete.add(obj_to_delete)
     
+    for objs in data_apply_groups.values():
+        objects_to_delete.update(data_apply_modifiers(objs, scene, remove_disabled, delete_operands))
+    
     if active_obj in objects_to_delete: active_obj = None
     
     for obj in objects_to_delete:
@@ -229,6 +332,209 @@ def iterate_workset(search_in, context=None, obj_types=None, include_duplis=None
                 add_potential_duplis(objs, obj)
         yield from objs
 
+class IdnamesIndex:
+    """
+    Object -> idnames and idname -> objects mapping of a category, kept up to
+    date incrementally. Objects are keyed by pointer (so renaming does not
+    invalidate the index) and are re-scanned individually when reported as
+    updated by scene_update() or when their aggregated attributes change.
+    The whole index is rebuilt only on structural changes (undo, switching
+    scenes, adding/removing objects or datablocks) or when invalidated;
+    the rebuild is done in steps by the category's refresh job.
+    """
+    
+    # Object data which can affect the idnames of its users (e.g. materials)
+    obdata_collections = ("meshes", "curves", "metaballs")
+    # Renaming a datablock sets no is_updated flags, so the index
+    # signature is re-read at least this often (in seconds)
+    revalidate_interval = 1.0
+    
+    def __init__(self, BatchOperations, attrs=()):
+        self.BatchOperations = BatchOperations
+        # Must be consistent with iter_scene_objs_idnames()
+        self.iter_obj_idnames = getattr(BatchOperations, "iter_scene_obj_idnames", BatchOperations.iter_idnames)
+        self.attrs = attrs # boolean object attributes to watch
+        self.invalidate()
+    
+    def invalidate(self):
+        self.signature = None
+        self.rebuilding = False
+        self.index_signature = None
+        self.index_signature_time = 0.0
+        self.objs = {} # pointer -> object
+        self.obj_order = [] # pointers in the order of scene.objects
+        self.obj_data = {} # pointer -> pointer of object data
+        self.obj_idnames = {} # pointer -> frozenset of idnames
+        self.idname_objs = {} # idname -> set of pointers
+        self.attr_values = {}
+        self.dirty_objs = set()
+        # Consumed by the category refresh
+        self.dirty_all = True
+        self.dirty_idnames = set()
+    
+    def get_signature(self, scene):
+        # index_signature is cached, since this is called on each redraw.
+        # New objects are linked at the head of the scene, so the first
+        # object (along with the counts) changes when one object is
+        # deleted and another one is added.
+        scene_objs = scene.objects
+        first_obj = (scene_objs[0].as_pointer() if scene_objs else 0)
+        return (bpy.data.as_pointer(), scene.as_pointer(), len(scene_objs), first_obj,
+            len(bpy.data.objects), self.index_signature)
+    
+    def read_index_signature(self):
+        index_signature = getattr(self.BatchOperations, "index_signature", None)
+        self.index_signature = (index_signature() if index_signature else None)
+        self.index_signature_time = time.clock()
+    
+    @staticmethod
+    def data_pointer(obj):
+        return (obj.data.as_pointer() if obj.data else 0)
+    
+    def read_attrs(self, scene):
+        values = {}
+        for attr in self.attrs:
+            values[attr] = array.array('b', [0]) * len(scene.objects)
+            scene.objects.foreach_get(attr, values[attr])
+        return values
+    
+    def get_objects(self, idname):
+        objs = self.objs
+        return [objs[ptr] for ptr in self.idname_objs.get(idname, ())]
+    
+    def get_idnames(self, obj):
+        return self.obj_idnames.get(obj.as_pointer(), frozenset())
+    
+    def rebuild_steps(self, scene):
+        """Start rebuilding the index; returns a generator that yields after each object/idname"""
+        self.invalidate()
+        self.read_index_signature()
+        self.rebuilding = True # objects edited in the meantime are still collected
+        return self._rebuild_steps(scene, self.get_signature(scene))
+    
+    def _rebuild_steps(self, scene, signature):
+        objs = list(scene.objects)
+        self.obj_order = [obj.as_pointer() for obj in objs]
+        self.objs = dict(zip(self.obj_order, objs))
+        
+        obj_data = self.obj_data
+        for ptr, obj in self.objs.items():
+            obj_data[ptr] = self.data_pointer(obj)
+            yield
+        
+        obj_idnames = {}
+        idname_objs = self.idname_objs
+        for obj, idname in self.BatchOperations.iter_scene_objs_idnames(scene):
+            ptr = obj.as_pointer()
+            obj_idnames.setdefault(ptr, set()).add(idname)
+            idname_objs.setdefault(idname, set()).add(ptr)
+            yield
+        self.obj_idnames = {ptr:frozenset(idnames) for ptr, idnames in obj_idnames.items()}
+        
+        self.attr_values = self.read_attrs(scene)
+        self.rebuilding = False
+        self.signature = signature
+    
+    def scene_update(self, scene):
+        """Called from scene_update_post: collect the edited objects"""
+        if (self.signature is None) and (not self.rebuilding): return
+        
+        data = bpy.data
+        
+        if data.materials.is_updated or data.groups.is_updated:
+            self.read_index_signature()
+        elif time.clock() > self.index_signature_time + self.revalidate_interval:
+            self.read_index_signature()
+        
+        dirty_objs = self.dirty_objs
+        
+        if data.objects.is_updated:
+            # In practice, only the selected/active objects are edited directly
+            context = bpy.context
+            objs = list(getattr(context, "selected_objects", None) or ())
+            if scene.objects.active: objs.append(scene.objects.active)
+            for obj in objs:
+                if obj.is_updated or obj.is_updated_data:
+                    dirty_objs.add(obj.as_pointer())
+        
+        # Edits of the other objects' data/materials/groups (e.g. by scripts)
+        # are picked up via the users of the updated datablocks
+        data_ptrs = set()
+        for coll_name in self.obdata_collections:
+            coll = getattr(data, coll_name)
+            if not coll.is_updated: continue
+            data_ptrs.update(item.as_pointer() for item in coll
+                if item.is_updated or item.is_updated_data)
+        if data_ptrs:
+            dirty_objs.update(ptr for ptr, data_ptr in self.obj_data.items() if data_ptr in data_ptrs)
+        
+        idname_objs = self.idname_objs
+        if data.materials.is_updated:
+            for material in data.materials:
+                if material.is_updated or material.is_updated_data:
+                    dirty_objs.update(idname_objs.get(material.name, ()))
+        if data.groups.is_updated:
+            objs = self.objs
+            for group in data.groups:
+                if group.is_updated or group.is_updated_data:
+                    dirty_objs.update(idname_objs.get(group.name, ()))
+                    dirty_objs.update(ptr for ptr in (obj.as_pointer() for obj in group.objects) if ptr in objs)
+    
+    def update(self, scene):
+        """Process the collected changes; returns False if the index has to be rebuilt"""
+        if self.get_signature(scene) != self.signature:
+            self.invalidate()
+            return False
+        
+        attr_values = self.read_attrs(scene)
+        for attr, values in attr_values.items():
+            prev_values = self.attr_values[attr]
+            if values == prev_values: continue # compared in C
+            # Attribute changes affect the aggregates of all object's idnames
+            for ptr, value, prev_value in zip(self.obj_order, values, prev_values):
+                if value != prev_value: self.dirty_idnames.update(self.obj_idnames.get(ptr, ()))
+        self.attr_values = attr_values
+        
+        if not self.dirty_objs: return True
+        
+        # Objects that were added since the last rebuild are not indexed yet
+        if not self.dirty_objs.issubset(self.objs):
+            self.invalidate()
+            return False
+        
+        for ptr in self.dirty_objs:
+            obj = self.objs[ptr]
+            try:
+                idnames = frozenset(self.iter_obj_idnames(obj))
+                self.obj_data[ptr] = self.data_pointer(obj)
+            except ReferenceError: # removed without changing the object count
+                self.invalidate()
+                return False
+            prev_idnames = self.obj_idnames.get(ptr, frozenset())
+            # Objects are updated all the time (e.g. when moved),
+            # but only the changes of their idnames matter here
+            if idnames == prev_idnames: continue
+            for idname in prev_idnames.difference(idnames):
+                self.idname_objs[idname].discard(ptr)
+            for idname in idnames.difference(prev_idnames):
+                self.idname_objs.setdefault(idname, set()).add(ptr)
+            self.obj_idnames[ptr] = idnames
+            self.dirty_idnames.update(prev_idnames.symmetric_difference(idnames))
+        self.dirty_objs.clear()
+        return True
+
+class RefreshContext:
+    """Snapshot of the context attributes used by the workset iteration
+    (the actual context may be different when a background job runs)"""
+    def __init__(self, context):
+        self.scene = context.scene
+        self.selected_objects = list(context.selected_objects)
+
+@addon.scene_update_post
+def scene_update_post(scene):
+    for category in getattr(addon.Preferences, "categories", ()):
+        category.index.scene_update(scene)
+
 #============================================================================#
 
 @addon.Operator(idname="object.batch_repeat_actions", options={'INTERNAL'}, label="Repeat action(s)", description="Repeat action(s) for selected objects")
@@ -381,6 +687,10 @@ class Operator_batch_streamline_meshes:
     bake_location = False | prop("Bake location", "Apply location")
     bake_rotation = False | prop("Bake rotation", "Apply rotation")
     bake_scale = False | prop("Bake scale", "Apply scale")
+    engine = 'OPERATORS' | prop("How the mesh operations are performed", "Engine", items=[
+        ('OPERATORS', "Operators", "Use edit-mode operators (supports all options)"),
+        ('BMESH', "BMesh", "Use bmesh.ops on each unique mesh, without mode switching (falls back to operators if some of the options are not supported)"),
+    ])
     
     # see also MeshLint, PrintToolbox?
     # TODO (low priority): after operator is performed, show statistics of what modifications were actually done (e.g. removed N vertices, etc., etc.)
@@ -505,6 +815,7 @@ class Operator_batch_streamline_meshes:
             layout.prop(self, "bake_location")
             layout.prop(self, "bake_rotation")
             layout.prop(self, "bake_scale")
+            layout.prop(self, "engine", text="")
         
         with layout.column():
             layout.label("Modifiers")
@@ -783,6 +1094,196 @@ class Operator_batch_streamline_meshes:
             )
             #if select_all: bpy.ops.mesh.select_all(action='SELECT') # no need
     
+    def bmesh_steps(self):
+        """Returns the bmesh.ops equivalent of apply(), or None if some of the options are not supported"""
+        # bmesh.ops expect the C enum values, which are the same as in the operators' rna
+        def enum_value(op, name, identifier):
+            return BlRna(op).properties[name].enum_items[identifier].value
+        
+        steps = []
+        
+        # Symmetry
+        if self.symmetrize:
+            direction = enum_value(bpy.ops.mesh.symmetrize, "direction", self.symmetrize_direction)
+            threshold = self.symmetrize_threshold
+            def symmetrize(bm):
+                geom = bm.verts[:] + bm.edges[:] + bm.faces[:]
+                bmesh.ops.symmetrize(bm, input=geom, direction=direction, dist=threshold)
+            steps.append(("Symmetrize", symmetrize))
+        elif self.symmetry_snap:
+            return None # no bmesh.ops equivalent
+        
+        # Degenerate
+        if self.dissolve_degenerate:
+            threshold = self.dissolve_degenerate_threshold
+            def dissolve_degenerate(bm):
+                bmesh.ops.dissolve_degenerate(bm, dist=threshold, edges=bm.edges[:])
+            steps.append(("Dissolve degenerate", dissolve_degenerate))
+        
+        if self.remove_doubles:
+            threshold = self.remove_doubles_threshold
+            def remove_doubles(bm):
+                bmesh.ops.remove_doubles(bm, verts=bm.verts[:], dist=threshold)
+            steps.append(("Remove doubles", remove_doubles))
+        
+        if self.face_split_by_edges:
+            return None # no bmesh.ops equivalent
+        
+        if self.beautify_fill:
+            angle_limit = self.beautify_fill_angle_limit
+            def beautify_fill(bm):
+                # the operator rotates only the edges within the angle limit
+                edges = [edge for edge in bm.edges if edge.calc_face_angle(math.pi) <= angle_limit]
+                bmesh.ops.beautify_fill(bm, faces=bm.faces[:], edges=edges)
+            steps.append(("Beautify faces", beautify_fill))
+        
+        # Topology
+        if self.fill_holes:
+            sides = self.fill_holes_sides
+            def fill_holes(bm):
+                bmesh.ops.holes_fill(bm, edges=bm.edges[:], sides=sides)
+            steps.append(("Fill holes", fill_holes))
+        
+        if self.intersect:
+            return None # no bmesh.ops equivalent
+        
+        if self.normals:
+            normals_type = self.normals_type
+            def normals(bm):
+                if normals_type in ('OUTSIDE', 'INSIDE'):
+                    bmesh.ops.recalc_face_normals(bm, faces=bm.faces[:])
+                if normals_type in ('INSIDE', 'FLIP'):
+                    bmesh.ops.reverse_faces(bm, faces=bm.faces[:])
+            steps.append(("Recalculate normals", normals))
+        
+        if self.delete_loose:
+            use_verts = self.delete_loose_use_verts
+            use_edges = self.delete_loose_use_edges
+            use_faces = self.delete_loose_use_faces
+            def delete_loose(bm):
+                if use_faces:
+                    faces = [face for face in bm.faces if all(edge.is_boundary for edge in face.edges)]
+                    bmesh.ops.delete(bm, geom=faces, context=5) # 5 = DEL_FACES
+                if use_edges:
+                    edges = [edge for edge in bm.edges if edge.is_wire]
+                    bmesh.ops.delete(bm, geom=edges, context=2) # 2 = DEL_EDGES
+                if use_verts:
+                    verts = [vert for vert in bm.verts if not vert.link_edges]
+                    bmesh.ops.delete(bm, geom=verts, context=1) # 1 = DEL_VERTS
+            steps.append(("Delete loose", delete_loose))
+        
+        # Curvature
+        if self.dissolve_limited:
+            angle_limit = self.dissolve_limited_angle_limit
+            use_dissolve_boundaries = self.dissolve_limited_use_dissolve_boundaries
+            delimit = set(self.dissolve_limited_delimit)
+            delimit_flags = sum(enum_value(bpy.ops.mesh.dissolve_limited, "delimit", identifier)
+                for identifier in delimit)
+            def dissolve_limited(bm):
+                kwargs = dict(angle_limit=angle_limit, use_dissolve_boundaries=use_dissolve_boundaries,
+                    verts=bm.verts[:], edges=bm.edges[:])
+                try:
+                    bmesh.ops.dissolve_limit(bm, delimit=delimit, **kwargs)
+                except TypeError: # older versions expect the flags as int
+                    bmesh.ops.dissolve_limit(bm, delimit=delimit_flags, **kwargs)
+            steps.append(("Dissolve by angle", dissolve_limited))
+        
+        if self.vert_connect_nonplanar:
+            angle_limit = self.vert_connect_nonplanar_angle_limit
+            def vert_connect_nonplanar(bm):
+                bmesh.ops.connect_verts_nonplanar(bm, angle_limit=angle_limit, faces=bm.faces[:])
+            steps.append(("Split non-planar faces", vert_connect_nonplanar))
+        
+        if self.shade:
+            smooth = (self.shade_type == 'SMOOTH')
+            def shade(bm):
+                for face in bm.faces:
+                    face.smooth = smooth
+            steps.append(("Face shade", shade))
+        
+        # Tris, Quads
+        if self.quads_convert_to_tris:
+            quad_method = enum_value(bpy.ops.mesh.quads_convert_to_tris, "quad_method", self.quads_convert_to_tris_quad_method)
+            ngon_method = enum_value(bpy.ops.mesh.quads_convert_to_tris, "ngon_method", self.quads_convert_to_tris_ngon_method)
+            def quads_convert_to_tris(bm):
+                bmesh.ops.triangulate(bm, faces=bm.faces[:], quad_method=quad_method, ngon_method=ngon_method)
+            steps.append(("Triangulate faces", quads_convert_to_tris))
+        
+        if self.tris_convert_to_quads:
+            if hasattr(self, "tris_convert_to_quads_limit"): return None # pre-2.74 options
+            kwargs = dict(
+                cmp_uvs=self.tris_convert_to_quads_uvs,
+                cmp_vcols=self.tris_convert_to_quads_vcols,
+                cmp_sharp=self.tris_convert_to_quads_sharp,
+                cmp_materials=self.tris_convert_to_quads_materials,
+                angle_face_threshold=self.tris_convert_to_quads_face_threshold,
+                angle_shape_threshold=self.tris_convert_to_quads_shape_threshold,
+            )
+            if hasattr(self, "tris_convert_to_quads_seam"):
+                kwargs["cmp_seam"] = self.tris_convert_to_quads_seam
+            def tris_convert_to_quads(bm):
+                bmesh.ops.join_triangles(bm, faces=bm.faces[:], **kwargs)
+            steps.append(("Tris to quads", tris_convert_to_quads))
+        
+        if self.poke:
+            offset = self.poke_offset
+            use_relative_offset = self.poke_use_relative_offset
+            center_mode = enum_value(bpy.ops.mesh.poke, "center_mode", self.poke_center_mode)
+            def poke(bm):
+                bmesh.ops.poke(bm, faces=bm.faces[:], offset=offset,
+                    center_mode=center_mode, use_relative_offset=use_relative_offset)
+            steps.append(("Poke faces", poke))
+        
+        # Sorting
+        if self.sort:
+            # other sort types depend on the view/cursor/object transform
+            if self.sort_type == 'REVERSE':
+                key = (lambda elem: elem.index)
+                reverse = (not self.sort_reverse)
+                sequences = []
+                if self.sort_verts: sequences.append("verts")
+                if self.sort_edges: sequences.append("edges")
+                if self.sort_faces: sequences.append("faces")
+            elif (self.sort_type == 'MATERIAL') and not (self.sort_verts or self.sort_edges):
+                key = (lambda elem: elem.material_index)
+                reverse = self.sort_reverse
+                sequences = (["faces"] if self.sort_faces else [])
+            else:
+                return None
+            def sort(bm):
+                for name in sequences:
+                    seq = getattr(bm, name)
+                    seq.index_update()
+                    seq.sort(key=key, reverse=reverse)
+            steps.append(("Sort", sort))
+        
+        return steps
+    
+    def streamline_bmesh(self, meshes, steps):
+        """Run the steps on each mesh; returns [name, time, verts delta, edges delta, faces delta] per step"""
+        stats = [[name, 0.0, 0, 0, 0] for name, func in steps]
+        
+        for mesh in meshes:
+            bm = bmesh.new()
+            bm.from_mesh(mesh)
+            
+            counts = (len(bm.verts), len(bm.edges), len(bm.faces))
+            for stat, (name, func) in zip(stats, steps):
+                time_start = time.clock()
+                func(bm)
+                stat[1] += time.clock() - time_start
+                new_counts = (len(bm.verts), len(bm.edges), len(bm.faces))
+                for i in range(3):
+                    stat[2+i] += new_counts[i] - counts[i]
+                counts = new_counts
+            
+            bm.normal_update()
+            bm.to_mesh(mesh)
+            bm.free()
+            mesh.update()
+        
+        return stats
+    
     @classmethod
     def poll(cls, context):
         return (context.mode == 'OBJECT') or (context.mode == 'EDIT_MESH')
@@ -821,7 +1322,19 @@ class Operator_batch_streamline_meshes:
                 deleted_objects = apply_modifiers(objects, scene, None, apply_modifiers_options)
                 objects = set(objects).difference(deleted_objects)
             
-            for obj in IndividuallyActiveSelected(objects, make_visble=True):
+            steps = None
+            if self.engine == 'BMESH':
+                steps = self.bmesh_steps()
+                if steps is None:
+                    self.report({'WARNING'}, "Some of the options are not supported by BMesh engine, using operators")
+            
+            use_object_operators = (self.convert_to_mesh or self.clear_animation or
+                self.bake_location or self.bake_rotation or self.bake_scale)
+            
+            # With BMesh engine, objects need to be made active only for object-level operators
+            active_objects = (objects if (steps is None) or use_object_operators else ())
+            
+            for obj in IndividuallyActiveSelected(active_objects, make_visble=True):
                 if obj.type not in BlEnums.object_types_geometry: continue
                 
                 if obj.type != 'MESH':
@@ -835,6 +1348,8 @@ class Operator_batch_streamline_meshes:
                 
                 if obj.type != 'MESH': continue
                 
+                if steps is not None: continue # meshes are processed below
+                
                 # can fail if object not currently visible in the scene!
                 bpy.ops.object.mode_set(mode='EDIT')
                 
@@ -843,6 +1358,22 @@ class Operator_batch_streamline_meshes:
                 self.apply(context)
                 
                 bpy.ops.object.mode_set(mode='OBJECT')
+            
+            if steps is not None:
+                # Objects may share meshes, each mesh is processed only once
+                meshes = {obj.data for obj in objects if (obj.type == 'MESH') and (not obj.data.library)}
+                
+                time_start = time.clock()
+                stats = self.streamline_bmesh(meshes, steps)
+                elapsed = time.clock() - time_start
+                
+                for name, step_time, verts_delta, edges_delta, faces_delta in stats:
+                    print("{}: {:.3f} s, verts {:+}, edges {:+}, faces {:+}".format(
+                        name, step_time, verts_delta, edges_delta, faces_delta))
+                
+                self.report({'INFO'}, "Streamlined {} mesh(es) in {:.3f} s: verts {:+}, edges {:+}, faces {:+}".format(
+                    len(meshes), elapsed, sum(stat[2] for stat in stats),
+                    sum(stat[3] for stat in stats), sum(stat[4] for stat in stats)))
         
         return {'FINISHED'}
 
@@ -1330,6 +1861,7 @@ def make_category(globalvars, idname_attr="name", **kwargs):
         idname_attr = None
         aggr_infos = {}
         aggr_infos_objs = {}
+        obj_infos = {} # cached object aggregates (idname -> AggregateInfo)
         
         def __init__(self, idname, name):
             self.idname = idname
@@ -1362,23 +1894,65 @@ def make_category(globalvars, idname_attr="name", **kwargs):
             item[name+":same"] = aggr.same
         
         @classmethod
-        def collect_info(cls, items, count_users=False):
+        def collect_info(cls, items, count_users=False, index=None):
             infos = {}
-            
+            if index is not None: cls.invalidate_obj_infos(index)
+            for step in cls.collect_info_steps(infos, items, count_users, index): pass
+            return infos
+        
+        @classmethod
+        def invalidate_obj_infos(cls, index):
+            """Discard the object aggregates affected by the changes in the index"""
+            obj_infos = cls.obj_infos
+            if index.dirty_all:
+                obj_infos.clear()
+            else:
+                for idname in index.dirty_idnames:
+                    obj_infos.pop(idname, None)
+            index.dirty_all = False
+            index.dirty_idnames.clear()
+        
+        @classmethod
+        def collect_info_steps(cls, infos, items, count_users=False, index=None):
+            """Fill infos, yielding after each item/object (see CategoryPG.refresh_steps())"""
             for item in items:
                 cls.extract_info(infos, item, "", count_users=count_users)
                 cls.extract_info(infos, item, count_users=count_users)
+                yield
             
-            for obj, idname in BatchOperations.iter_scene_objs_idnames(bpy.context.scene):
-                if idname not in infos: continue # ignore object not in Filter
-                cls.extract_info_obj(infos, obj, "")
-                cls.extract_info_obj(infos, obj, idname)
+            if index is None:
+                for obj, idname in BatchOperations.iter_scene_objs_idnames(bpy.context.scene):
+                    if idname not in infos: continue # ignore object not in Filter
+                    cls.extract_info_obj(infos, obj, "")
+                    cls.extract_info_obj(infos, obj, idname)
+                    yield
+                return
             
-            return infos
+            # Only the aggregates of the idnames affected by the changes
+            # since the previous refresh (see invalidate_obj_infos()) are recomputed
+            obj_infos = cls.obj_infos
+            info_all = infos.get("")
+            for idname, info in infos.items():
+                if not idname: continue # ignore object not in Filter
+                obj_info = obj_infos.get(idname)
+                if obj_info is None:
+                    obj_info = cls(idname, "")
+                    obj_info.objs = index.get_objects(idname)
+                    for obj in obj_info.objs:
+                        cls.extract_info_obj(obj_infos, obj, idname, obj_info)
+                        yield
+                    obj_infos[idname] = obj_info
+                info.obj_names = [obj.name for obj in obj_info.objs]
+                info.aggrs_obj = obj_info.aggrs_obj
+                if info_all:
+                    info_all.obj_names.extend(info.obj_names)
+                    for name, aggr in info_all.aggrs_obj.items():
+                        aggr.merge(obj_info.aggrs_obj[name])
+                yield
         
         @classmethod
-        def extract_info_obj(cls, infos, obj, idname):
-            info = infos[idname]
+        def extract_info_obj(cls, infos, obj, idname, info=None):
+            if info is None: info = infos[idname]
             info.obj_names.append(obj.name)
             for name, params in cls.aggr_infos_objs.items():
                 value = getattr(obj, name)
@@ -1577,6 +2151,7 @@ def make_category(globalvars, idname_attr="name", **kwargs):
         items = [CategoryItemPG] | prop()
         
         remaining_items = []
+        remaining_key = None
         
         @classmethod
         def is_excluded(cls, idname):
@@ -1620,24 +2195,104 @@ def make_category(globalvars, idname_attr="name", **kwargs):
         selection_info = (0, "")
         default_select_state = None
         
-        def refresh(self, context, needs_refresh=False):
+        # The refresh is done in background_refresh() slices by a resumable
+        # generator; meanwhile, the results of the previous one are displayed
+        refresh_job = None
+        refresh_signature = None
+        refresh_chunk = 64 # objects/items processed between the time checks
+        refresh_progress = (0.0, 0.0, 0) # (start time, busy time, objects/items processed)
+        refresh_stats = None # (wall time, busy time, objects/items processed) of the last one
+        
+        def refresh(self, context, needs_refresh=False, synchronous=False):
             cls = self.__class__
             options = get_options()
             preferences = addon.preferences
             
+            # Explicit refresh requests (after batch operations, option changes,
+            # etc.) rebuild the index; otherwise only the deltas are processed.
+            # The rebuild is the first stage of the refresh job.
+            index = cls.index
+            if needs_refresh or self.needs_refresh: index.invalidate()
+            if index.rebuilding and cls.refresh_job: return
+            rebuild_index = (index.signature is None) or (not index.update(context.scene))
+            needs_refresh |= rebuild_index
+            
             active_obj = context.scene.objects.active
             selection_info = (len(context.selected_objects), (active_obj.name if active_obj else ""))
             needs_refresh |= (selection_info != cls.selection_info)
             
             needs_refresh |= self.needs_refresh
-            needs_refresh |= options.autorefresh and (time.clock() > self.next_refresh_time)
+            needs_refresh |= index.dirty_all or bool(index.dirty_idnames)
+            # Periodic refresh shouldn't restart the one in progress
+            if options.autorefresh and (time.clock() > self.next_refresh_time):
+                needs_refresh |= (not cls.refresh_job)
             if not needs_refresh: return
             self.next_refresh_time = time.clock() + preferences.refresh_interval
             cls.selection_info = selection_info
+            self.needs_refresh = False
+            
+            index_steps = (index.rebuild_steps(context.scene) if rebuild_index else None)
+            cls.refresh_job = self.refresh_steps(RefreshContext(context), index_steps)
+            cls.refresh_signature = index.get_signature(context.scene)
+            cls.refresh_progress = (time.clock(), 0.0, 0)
+            
+            if synchronous:
+                self.refresh_step(None)
+        
+        def refresh_step(self, duration):
+            """Advance the refresh job for the given duration (None: until complete)"""
+            cls = self.__class__
+            job = cls.refresh_job
+            if job is None: return
             
-            processing_time = time.clock()
+            # Objects could have been freed in the meantime (undo, deletion)
+            if cls.index.get_signature(bpy.context.scene) != cls.refresh_signature:
+                cls.refresh_job = None
+                self.tag_refresh()
+                return
             
-            infos = AggregateInfo.collect_info(options.iterate(context, selected=False), is_ID and (options.search_in == 'FILE'))
+            time_start = time.clock()
+            time_stop = (time_start + duration if duration is not None else None)
+            refresh_chunk = cls.refresh_chunk
+            count = 0
+            finished = False
+            try:
+                while True:
+                    for i in range(refresh_chunk):
+                        next(job)
+                        count += 1
+                    if (time_stop is not None) and (time.clock() > time_stop): break
+            except StopIteration:
+                cls.refresh_job = None
+                finished = True
+            
+            refresh_start, busy_time, total_count = cls.refresh_progress
+            busy_time += time.clock() - time_start
+            total_count += count
+            cls.refresh_progress = (refresh_start, busy_time, total_count)
+            if finished:
+                cls.refresh_stats = (time.clock() - refresh_start, busy_time, total_count)
+        
+        def refresh_steps(self, context, index_steps=None):
+            cls = self.__class__
+            options = get_options()
+            preferences = addon.preferences
+            
+            if index_steps: yield from index_steps
+            AggregateInfo.invalidate_obj_infos(cls.index)
+            
+            # Back buffer: the displayed items stay intact until the swap
+            infos = {}
+            items = options.iterate(context, selected=False)
+            count_users = is_ID and (options.search_in == 'FILE')
+            yield from AggregateInfo.collect_info_steps(infos, items, count_users, cls.index)
+            
+            idnames_in_selected = set()
+            for obj in options.iterate_objects(context, search_in='SELECTION'):
+                idnames_in_selected.update(BatchOperations.iter_idnames(obj))
+                yield
+            
+            # Swap the results in at once
             
             curr_idnames = set(infos.keys())
             curr_idnames.discard("") # necessary for comparison with idnames_in_selected
@@ -1652,16 +2307,18 @@ def make_category(globalvars, idname_attr="name", **kwargs):
             cls.prev_idnames = curr_idnames
             
             cls.is_anything_selected = bool(context.selected_objects)
-            cls.idnames_in_selected = set(name for obj in options.iterate_objects(context, search_in='SELECTION')
-                for name in BatchOperations.iter_idnames(obj))
+            cls.idnames_in_selected = idnames_in_selected
             
             if options.synchronize_selection:
                 cls.excluded = curr_idnames.difference(cls.idnames_in_selected)
             
-            cls.remaining_items = [enum_item
-                for enum_item in BatchOperations.enum_all()
-                if enum_item[0] not in curr_idnames]
-            cls.remaining_items.sort(key=lambda item:item[1])
+            remaining_key = (cls.index.signature, curr_idnames)
+            if remaining_key != cls.remaining_key:
+                cls.remaining_key = remaining_key
+                cls.remaining_items = [enum_item
+                    for enum_item in BatchOperations.enum_all()
+                    if enum_item[0] not in curr_idnames]
+                cls.remaining_items.sort(key=lambda item:item[1])
             
             self.items.clear()
             for i, key in enumerate(sorted(infos.keys())):
@@ -1669,11 +2326,7 @@ def make_category(globalvars, idname_attr="name", **kwargs):
                 item.sort_id = i
                 infos[key].fill_item(item, options.aggregate_mode)
             
-            processing_time = time.clock() - processing_time
-            # Disable autorefresh if it takes too much time
-            #if processing_time > 0.05: options.autorefresh = False
-            
-            self.needs_refresh = False
+            tag_redraw()
         
         def draw(self, layout):
             self.was_drawn = True
@@ -1740,6 +2393,7 @@ def make_category(globalvars, idname_attr="name", **kwargs):
     CategoryPG.category_name_plural = category_name_plural
     CategoryPG.category_icon = category_icon
     CategoryPG.BatchOperations = BatchOperations
+    CategoryPG.index = IdnamesIndex(BatchOperations, list(AggregateInfo.aggr_infos_objs))
     
     @addon.Operator(idname="object.batch_{}_extras".format(category_name), options={'INTERNAL'}, description="Extras")
     def Operator_Extras(self, context, event, idnames="", index=0, title=""):
@@ -1810,6 +2464,11 @@ def make_category(globalvars, idname_attr="name", **kwargs):
         layout.prop(options, "prioritize_selection", text="Affect selection")
         for cmd, cmd_kwargs in menu_options_extra:
             getattr(layout, cmd)(**cmd_kwargs)
+        if CategoryPG.refresh_stats:
+            wall_time, busy_time, count = CategoryPG.refresh_stats
+            layout.separator()
+            layout.label("Refresh: {:.3f} s ({:.3f} s busy)".format(wall_time, busy_time), icon='TIME')
+            layout.label("{} items/objects, {:.0f} per second".format(count, count / max(busy_time, 1e-6)))
     
     @addon.Operator(idname="object.batch_{}_refresh".format(category_name), options={'INTERNAL', 'REGISTER'}, description=
     "Click: Force refresh, Ctrl+Click: Toggle auto-refresh")
@@ -1819,9 +2478,14 @@ def make_category(globalvars, idname_attr="name", **kwargs):
         if event.ctrl:
             options.autorefresh = not options.autorefresh
         else:
-            category.refresh(context, True)
+            category.refresh(context, True, synchronous=True)
         return {'FINISHED'}
     
+    @addon.background_job
+    def background_refresh(duration):
+        if CategoryPG.refresh_job is None: return
+        get_category().refresh_step(duration)
+    
     @LeftRightPanel(idname="VIEW3D_PT_batch_{}".format(category_name_plural), context="objectmode", space_type='VIEW_3D', category="Batch", label="Batch {}".format(Category_Name_Plural))
     class Panel_Category:
         def draw_header(self, context):
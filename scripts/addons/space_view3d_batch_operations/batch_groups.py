@@ -117,8 +117,13 @@ class BatchOperations:
     
     @classmethod
     def iter_idnames(cls, obj):
-        for group in bpy.data.groups:
-            if cls.belongs(obj, group): yield group.name
+        # Same as checking belongs() for each group, but users_group
+        # avoids a name lookup in every group of the file
+        consider_dupli = ('CONSIDER_DUPLI' in get_options().group_options)
+        for group in obj.users_group:
+            if consider_dupli or (obj.dupli_group != group): yield group.name
+        group = obj.dupli_group
+        if consider_dupli and group and (obj.name not in group.objects): yield group.name
     
     @classmethod
     def iter_scene_objs_idnames(cls, scene):
@@ -127,6 +132,17 @@ class BatchOperations:
             for obj in cls.group_objects(group):
                 if obj in scene_objects: yield (obj, group.name)
     
+    @classmethod
+    def iter_scene_obj_idnames(cls, obj):
+        # Single-object version of iter_scene_objs_idnames()
+        consider_dupli = ('CONSIDER_DUPLI' in get_options().group_options)
+        for group in obj.users_group:
+            if consider_dupli or (obj.dupli_group != group): yield group.name
+    
+    @classmethod
+    def index_signature(cls):
+        return tuple((group.name, len(group.objects)) for group in bpy.data.groups)
+    
     @classmethod
     def enum_all(cls):
         for group in bpy.data.groups:
@@ -291,23 +307,32 @@ class BatchOperations:
     
     @classmethod
     def merge_identical(cls):
-        unique = set(bpy.data.groups)
         identical = []
         # ignore all properties from bpy_struct
         ignore = {"name", "id_data", "users", "use_fake_user", "tag", "is_updated", "is_updated_data", "is_library_indirect", "library"}
         
+        # Only groups with equal signatures can be identical,
+        # so the full comparison is done only within each bucket
+        buckets = {}
         for item in bpy.data.groups:
-            duplicates = None
-            unique.discard(item)
-            
-            for item2 in unique:
-                if BlRna.compare(item, item2, ignore=ignore):
-                    if duplicates is None: duplicates = {item}
-                    duplicates.add(item2)
-            
-            if duplicates is not None:
-                identical.append(duplicates)
-                unique.difference_update(duplicates)
+            signature = BlRna.signature(item, ignore=ignore)
+            buckets.setdefault(signature, []).append(item)
+        
+        for bucket in buckets.values():
+            if len(bucket) < 2: continue
+            unique = set(bucket)
+            for item in bucket:
+                duplicates = None
+                unique.discard(item)
+                
+                for item2 in unique:
+                    if BlRna.compare(item, item2, ignore=ignore):
+                        if duplicates is None: duplicates = {item}
+                        duplicates.add(item2)
+                
+                if duplicates is not None:
+                    identical.append(duplicates)
+                    unique.difference_update(duplicates)
         
         for duplicates in identical:
             # find best candidate for preservation
@@ -114,6 +114,10 @@ class BatchOperations:
             for ms in obj.material_slots:
                 if ms.material: yield (obj, ms.name)
     
+    @classmethod
+    def index_signature(cls):
+        return tuple(mat.name for mat in bpy.data.materials)
+    
     @classmethod
     def enum_all(cls):
         for mat in bpy.data.materials:
@@ -270,33 +274,54 @@ class BatchOperations:
     
     @classmethod
     def merge_identical(cls):
-        unique = set(bpy.data.materials)
         identical = []
         # ignore all properties from bpy_struct
         ignore = {"name", "id_data", "users", "use_fake_user", "tag", "is_updated", "is_updated_data", "is_library_indirect", "library"}
         
+        NodeTreeComparer.prune()
+        nodetree_keys = {}
+        def get_nodetree_key(nodetree):
+            key = nodetree_keys.get(nodetree.as_pointer())
+            if key is None:
+                key = NodeTreeComparer.nodetree_key(nodetree)
+                nodetree_keys[nodetree.as_pointer()] = key
+            return key
+        
         def compare_node_tree(rna_prop, valueA, valueB):
             if (valueA is None) and (valueB is None): return True
             if (valueA is None) or (valueB is None): return False
             if not BlRna.compare(valueA.animation_data, valueB.animation_data): return False
             # ignore grease pencil
-            ntkA = NodeTreeComparer.nodetree_key(valueA)
-            ntkB = NodeTreeComparer.nodetree_key(valueB)
-            return ntkA == ntkB
+            return get_nodetree_key(valueA) == get_nodetree_key(valueB)
         specials = {"node_tree":compare_node_tree}
         
+        def node_tree_signature(rna_prop, value):
+            if value is None: return None
+            return (BlRna.signature(value.animation_data), get_nodetree_key(value))
+        signature_specials = {"node_tree":node_tree_signature}
+        
+        # Only materials with equal signatures can be identical,
+        # so the full comparison is done only within each bucket
+        buckets = {}
         for item in bpy.data.materials:
-            duplicates = None
-            unique.discard(item)
-            
-            for item2 in unique:
-                if BlRna.compare(item, item2, ignore=ignore, specials=specials):
-                    if duplicates is None: duplicates = {item}
-                    duplicates.add(item2)
-            
-            if duplicates is not None:
-                identical.append(duplicates)
-                unique.difference_update(duplicates)
+            signature = BlRna.signature(item, ignore=ignore, specials=signature_specials)
+            buckets.setdefault(signature, []).append(item)
+        
+        for bucket in buckets.values():
+            if len(bucket) < 2: continue
+            unique = set(bucket)
+            for item in bucket:
+                duplicates = None
+                unique.discard(item)
+                
+                for item2 in unique:
+                    if BlRna.compare(item, item2, ignore=ignore, specials=specials):
+                        if duplicates is None: duplicates = {item}
+                        duplicates.add(item2)
+                
+                if duplicates is not None:
+                    identical.append(duplicates)
+                    unique.difference_update(duplicates)
         
         for duplicates in identical:
             # find best candidate for preservation
@@ -402,6 +427,15 @@ class BatchOperations:
                         bpy.data.materials.remove(mat)
 
 class NodeTreeComparer:
+    # nodetree pointer -> (stamp, key)
+    # (cleared on undo/redo and file load, when pointers may be reused)
+    cache = {}
+    hits = 0
+    misses = 0
+    
+    # node bl_idname -> node-specific rna properties (blend_type, operation, image, color ramp, etc.)
+    node_props = {}
+    
     @classmethod
     def link_key(cls, link):
         return (
@@ -445,12 +479,105 @@ class NodeTreeComparer:
             cls.socket_key(socket)
             for socket in node.outputs
         )
-        return (idname, name, parent,
+        return (idname, name, parent, cls.node_settings(node),
             internal_links, inputs, outputs)
     
     @classmethod
-    def nodetree_key(cls, nodetree):
+    def node_settings(cls, node):
+        """Values of the properties that are not common to all nodes"""
+        rna_props = cls.node_props.get(node.bl_idname)
+        if rna_props is None:
+            common = {rna_prop.identifier for rna_prop in bpy.types.Node.bl_rna.properties}
+            rna_props = [rna_prop for rna_prop in node.bl_rna.properties if rna_prop.identifier not in common]
+            cls.node_props[node.bl_idname] = rna_props
+        values = []
+        for rna_prop in rna_props:
+            value = getattr(node, rna_prop.identifier, None)
+            if isinstance(value, bpy.types.ID):
+                value = value.as_pointer() # images, textures, node groups
+            else:
+                # depth is enough for color ramp elements and curve mapping points
+                value = BlRna.signature_prop(rna_prop, value, depth=3)
+            values.append(value)
+        return tuple(values)
+    
+    @classmethod
+    def build_nodetree_key(cls, nodetree):
         return frozenset(cls.node_key(node) for node in nodetree.nodes)
+    
+    @classmethod
+    def socket_stamp(cls, socket):
+        value = getattr(socket, "default_value", None)
+        if hasattr(value, "__len__") and not isinstance(value, str):
+            value = tuple(value) # bool/int/float vector
+        return value
+    
+    @classmethod
+    def nodetree_stamp(cls, nodetree):
+        # Much cheaper than the key (no nested frozensets or serialization),
+        # but still changes with node names, node settings, links and socket
+        # defaults. Other edits are caught by the is_updated check in
+        # scene_update_post.
+        nodes = nodetree.nodes
+        links = nodetree.links
+        checksum = hash((
+            tuple(node.name for node in nodes),
+            tuple(cls.node_settings(node) for node in nodes),
+            tuple((link.from_node.name, link.from_socket.identifier,
+                link.to_node.name, link.to_socket.identifier) for link in links),
+            tuple(cls.socket_stamp(socket) for node in nodes for socket in node.inputs),
+            tuple(cls.socket_stamp(socket) for node in nodes for socket in node.outputs),
+        ))
+        return (len(nodes), len(links), checksum)
+    
+    @classmethod
+    def nodetree_key(cls, nodetree):
+        pointer = nodetree.as_pointer()
+        stamp = cls.nodetree_stamp(nodetree)
+        cached = cls.cache.get(pointer)
+        if cached and (cached[0] == stamp):
+            cls.hits += 1
+            return cached[1]
+        cls.misses += 1
+        key = cls.build_nodetree_key(nodetree)
+        cls.cache[pointer] = (stamp, key)
+        return key
+    
+    @classmethod
+    def invalidate(cls, nodetree=None):
+        if nodetree is None:
+            cls.cache.clear()
+        else:
+            cls.cache.pop(nodetree.as_pointer(), None)
+    
+    @classmethod
+    def prune(cls, nodetrees=None):
+        """Drop the entries of the node trees that no longer exist"""
+        if nodetrees is None:
+            nodetrees = [material.node_tree for material in bpy.data.materials]
+            nodetrees.extend(bpy.data.node_groups)
+        alive = {nodetree.as_pointer() for nodetree in nodetrees if nodetree}
+        for pointer in set(cls.cache).difference(alive):
+            del cls.cache[pointer]
+
+@addon.load_post
+def load_post():
+    NodeTreeComparer.invalidate()
+
+@addon.undo_post
+def undo_post():
+    NodeTreeComparer.invalidate()
+
+@addon.scene_update_post
+def scene_update_post(scene):
+    if bpy.data.materials.is_updated:
+        for material in bpy.data.materials:
+            if material.is_updated or material.is_updated_data:
+                if material.node_tree: NodeTreeComparer.invalidate(material.node_tree)
+    if bpy.data.node_groups.is_updated:
+        for node_group in bpy.data.node_groups:
+            if node_group.is_updated or node_group.is_updated_data:
+                NodeTreeComparer.invalidate(node_group)
 
 #============================================================================#
 
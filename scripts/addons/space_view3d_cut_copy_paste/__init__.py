@@ -19,7 +19,7 @@ bl_info = {
     "name": "Cut/Copy/Paste objects and elements",
     "description": "Cut/Copy/Paste objects and elements",
     "author": "dairin0d",
-    "version": (0, 6, 6),
+    "version": (0, 6, 7),
     "blender": (2, 7, 0),
     "location": "View3D -> Ctrl+X, Ctrl+C, Ctrl+V, Shift+Delete, Ctrl+Insert, Shift+Insert",
     "warning": "",
@@ -47,12 +47,20 @@ import glob
 import time
 import json
 import bz2
+import zlib
 import base64
 import struct
 import io
+import sys
+import array
 
 from collections import deque
 
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
 try:
     import dairin0d
     dairin0d_location = ""
@@ -108,14 +116,118 @@ def get_clipboards_dir():
     clipboards_path = os.path.normcase(os.path.join(blender_tempdir, "blender_clipboards"))
     return clipboards_path
 
-def compress_b64(b):
-    # Somewhat strangely, compresslevel=1 not just works twice as fast
-    # than compresslevel=9, but also results in lower size %)
-    # (Tested on Suzanne subsurfed 3 times)
-    return base64.b64encode(bz2.compress(b, 1)).decode('ascii')
+class ClipboardCodec:
+    def __init__(self, id, name, compress, decompress, default_level=0):
+        self.id = id # header byte (ASCII char)
+        self.name = name
+        self.compress = compress
+        self.decompress = decompress
+        self.default_level = default_level
+
+clipboard_codecs = {}
+
+def register_clipboard_codec(codec):
+    clipboard_codecs[codec.id] = codec
+    clipboard_codecs[codec.name] = codec
+
+register_clipboard_codec(ClipboardCodec('N', 'NONE', (lambda b, level: b), (lambda b: b)))
+register_clipboard_codec(ClipboardCodec('Z', 'ZLIB', zlib.compress, zlib.decompress, 6))
+# Somewhat strangely, bz2 compresslevel=1 not just works twice as fast
+# than compresslevel=9, but also results in lower size %)
+# (Tested on Suzanne subsurfed 3 times)
+register_clipboard_codec(ClipboardCodec('B', 'BZ2', bz2.compress, bz2.decompress, 1))
+if lzma:
+    register_clipboard_codec(ClipboardCodec('X', 'LZMA', (lambda b, level: lzma.compress(b, preset=level)), lzma.decompress, 0))
+
+# (max data size, codec, level) -- the first matching entry is used.
+# According to benchmark_codecs(), zlib level 1 gives almost the same
+# ratio as levels 6..9 on mesh data at a fraction of the time, while
+# lzma gives ~30% smaller output but is ~5x slower (and bz2 is slower
+# than lzma with a worse ratio).
+clipboard_codec_auto = [
+    (4*1024, 'NONE', 0), # compression is not worth it
+    (1024*1024, 'LZMA', 0),
+    (None, 'ZLIB', 1), # big data: speed matters the most
+]
+
+def select_clipboard_codec(size, codec='AUTO', level=None):
+    if codec == 'AUTO':
+        for max_size, codec, auto_level in clipboard_codec_auto:
+            if (max_size is None) or (size <= max_size): break
+        if codec in clipboard_codecs:
+            if level is None: level = auto_level
+    codec = clipboard_codecs.get(codec)
+    if not codec: codec, level = clipboard_codecs['ZLIB'], None # e.g. Python without lzma
+    if level is None: level = codec.default_level
+    return codec, level
+
+def compress_data(b, codec='AUTO', level=None):
+    codec, level = select_clipboard_codec(len(b), codec, level)
+    return codec.id.encode('ascii') + codec.compress(b, level)
+
+def decompress_data(c):
+    codec = clipboard_codecs.get(c[:1].decode('ascii'))
+    if not codec: raise ValueError("Unknown clipboard codec")
+    return codec.decompress(c[1:])
+
+def compress_b64(b, codec='AUTO', level=None):
+    c = compress_data(b, codec, level)
+    # ':' is not in the base64 alphabet, so old (header-less) data is still recognizable
+    return c[:1].decode('ascii') + ":" + base64.b64encode(c[1:]).decode('ascii')
 
 def decompress_b64(c):
-    return bz2.decompress(base64.b64decode(c.encode('ascii')))
+    if c[1:2] != ":": # (old clipboard data is always bz2)
+        return bz2.decompress(base64.b64decode(c.encode('ascii')))
+    return decompress_data(c[:1].encode('ascii') + base64.b64decode(c[2:].encode('ascii')))
+
+def benchmark_codecs(vert_count=100000, repeats=3, codecs=None):
+    """
+    Print the compressed size and compression/decompression times
+    of a synthetic mesh stream (a noisy grid) for each codec/level
+    """
+    import random
+    
+    geometry = MeshGeometry()
+    side = max(int(vert_count ** 0.5), 2)
+    for y in range(side):
+        for x in range(side):
+            geometry.co.extend((x + random.uniform(-0.1, 0.1), y + random.uniform(-0.1, 0.1), random.random()))
+    for y in range(side-1):
+        for x in range(side-1):
+            i = y*side + x
+            geometry.loop_total.append(4)
+            geometry.loop_verts.extend((i, i+1, i+side+1, i+side))
+            geometry.loop_edges.extend((0, 0, 0, 0)) # not relevant for the benchmark
+            geometry.face_material.append(0)
+            geometry.face_smooth.append(1)
+    
+    stream = io.BytesIO()
+    write_format_chunk(stream)
+    geometry.write(stream)
+    with ChunkWriter(stream, "select_history"):
+        pass
+    b = stream.getvalue()
+    
+    if codecs is None:
+        codecs = [('NONE', 0), ('ZLIB', 1), ('ZLIB', 6), ('ZLIB', 9), ('BZ2', 1), ('BZ2', 9)]
+        if lzma: codecs.extend([('LZMA', 0), ('LZMA', 6)])
+    
+    print("Data size: {} bytes".format(len(b)))
+    results = []
+    for codec_name, level in codecs:
+        compress_time = float("inf")
+        decompress_time = float("inf")
+        for i in range(repeats):
+            t = time.perf_counter()
+            c = compress_data(b, codec_name, level)
+            compress_time = min(compress_time, time.perf_counter() - t)
+            t = time.perf_counter()
+            decompress_data(c)
+            decompress_time = min(decompress_time, time.perf_counter() - t)
+        results.append((codec_name, level, len(c), compress_time, decompress_time))
+        print("{} {}: {:.1%}, compress {:.3f} s, decompress {:.3f} s".format(
+            codec_name, level, len(c) / len(b), compress_time, decompress_time))
+    return results
 
 def def_read_funcs(_stream):
     read = _stream.read
@@ -315,6 +427,227 @@ class ChunkReader:
     def skip(self):
         self.stream.seek(self.end)
 
+# Version 1: each value is packed separately (network byte order)
+# Version 2: a "format" chunk goes first, geometry and simple layers
+# are stored as contiguous typed arrays (little-endian)
+clipboard_format_version = 2
+
+def write_array(stream, arr):
+    stream.write(arr.typecode.encode('ascii'))
+    if sys.byteorder != 'little':
+        arr = array.array(arr.typecode, arr)
+        arr.byteswap()
+    stream.write(arr.tobytes())
+
+def read_array(stream, size):
+    typecode = stream.read(1).decode('ascii')
+    data = stream.read(size - 1)
+    if sys.byteorder != 'little':
+        arr = array.array(typecode)
+        arr.frombytes(data)
+        arr.byteswap()
+        return arr
+    return memoryview(data).cast(typecode) # no copying
+
+def write_arrays_chunk(stream, name, arrays):
+    with ChunkWriter(stream, name):
+        for key, arr in arrays:
+            with ChunkWriter(stream, key):
+                write_array(stream, arr)
+
+def read_arrays_chunk(stream, name):
+    arrays = {}
+    with ChunkReader(stream, name) as chunk:
+        while chunk:
+            with ChunkReader(stream) as subchunk:
+                arrays[subchunk.name] = read_array(stream, subchunk.size)
+    return arrays
+
+def write_format_chunk(stream):
+    with ChunkWriter(stream, "format"):
+        stream.write(struct.pack('!H', clipboard_format_version))
+
+def read_format_chunk(stream):
+    pos = stream.tell()
+    chunk = ChunkReader(stream)
+    if chunk.name != "format":
+        stream.seek(pos) # version 1 streams start right with data
+        return 1
+    version = struct.unpack('!H', stream.read(2))[0]
+    chunk.skip()
+    return version
+
+class MeshGeometry:
+    """Vertices, edges and faces of a mesh in flat arrays"""
+    
+    def __init__(self):
+        self.co = array.array('f')
+        self.edge_verts = array.array('i')
+        self.edge_seam = array.array('b')
+        self.edge_smooth = array.array('b')
+        self.loop_total = array.array('i')
+        self.loop_verts = array.array('i')
+        self.loop_edges = array.array('i')
+        self.face_material = array.array('i')
+        self.face_smooth = array.array('b')
+    
+    vert_count = property(lambda self: len(self.co) // 3)
+    edge_count = property(lambda self: len(self.edge_seam))
+    face_count = property(lambda self: len(self.loop_total))
+    
+    def iter_verts(self):
+        co = self.co
+        for i in range(0, len(co), 3):
+            yield (co[i], co[i+1], co[i+2])
+    
+    def iter_edges(self):
+        edge_verts, edge_seam, edge_smooth = self.edge_verts, self.edge_seam, self.edge_smooth
+        for i in range(len(edge_seam)):
+            yield (edge_verts[i*2], edge_verts[i*2+1], bool(edge_seam[i]), bool(edge_smooth[i]))
+    
+    def iter_faces(self):
+        loop_verts, loop_edges = self.loop_verts, self.loop_edges
+        face_material, face_smooth = self.face_material, self.face_smooth
+        i = 0
+        for fi, n in enumerate(self.loop_total):
+            yield (tuple(zip(loop_verts[i:i+n], loop_edges[i:i+n])), face_material[fi], bool(face_smooth[fi]))
+            i += n
+    
+    @classmethod
+    def from_bmesh(cls, bm):
+        # BMesh -> Mesh -> foreach_get are all bulk operations;
+        # element order and face loop order are preserved
+        mesh = bpy.data.meshes.new("ClipboardTmp")
+        bm.to_mesh(mesh)
+        
+        def get(items, attr, typecode, n):
+            arr = array.array(typecode, [0]) * n
+            items.foreach_get(attr, arr)
+            return arr
+        
+        nv, ne, nl, nf = len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons)
+        
+        self = cls()
+        self.co = get(mesh.vertices, "co", 'f', nv*3)
+        self.edge_verts = get(mesh.edges, "vertices", 'i', ne*2)
+        self.edge_seam = get(mesh.edges, "use_seam", 'b', ne)
+        self.edge_smooth = array.array('b', (not sharp for sharp in get(mesh.edges, "use_edge_sharp", 'b', ne)))
+        self.loop_total = get(mesh.polygons, "loop_total", 'i', nf)
+        self.loop_verts = get(mesh.loops, "vertex_index", 'i', nl)
+        self.loop_edges = get(mesh.loops, "edge_index", 'i', nl)
+        self.face_material = get(mesh.polygons, "material_index", 'i', nf)
+        self.face_smooth = get(mesh.polygons, "use_smooth", 'b', nf)
+        
+        bpy.data.meshes.remove(mesh)
+        return self
+    
+    def write(self, stream):
+        # (version 2)
+        write_arrays_chunk(stream, "verts", [("co", self.co)])
+        write_arrays_chunk(stream, "edges", [("verts", self.edge_verts),
+            ("seam", self.edge_seam), ("smooth", self.edge_smooth)])
+        write_arrays_chunk(stream, "faces", [("loop_total", self.loop_total),
+            ("loop_verts", self.loop_verts), ("loop_edges", self.loop_edges),
+            ("material_index", self.face_material), ("smooth", self.face_smooth)])
+    
+    @classmethod
+    def read(cls, stream, version):
+        self = cls()
+        
+        if version >= 2:
+            arrays = read_arrays_chunk(stream, "verts")
+            self.co = arrays["co"]
+            arrays = read_arrays_chunk(stream, "edges")
+            self.edge_verts, self.edge_seam, self.edge_smooth = arrays["verts"], arrays["seam"], arrays["smooth"]
+            arrays = read_arrays_chunk(stream, "faces")
+            self.loop_total, self.loop_verts, self.loop_edges = arrays["loop_total"], arrays["loop_verts"], arrays["loop_edges"]
+            self.face_material, self.face_smooth = arrays["material_index"], arrays["smooth"]
+            return self
+        
+        read = stream.read
+        unpack = struct.unpack
+        
+        with ChunkReader(stream, "verts") as chunk:
+            while chunk:
+                self.co.extend(unpack('!ddd', read(24)))
+        
+        with ChunkReader(stream, "edges") as chunk:
+            while chunk:
+                vi0, vi1, seam, smooth = unpack('!II??', read(10))
+                self.edge_verts.extend((vi0, vi1))
+                self.edge_seam.append(seam)
+                self.edge_smooth.append(smooth)
+        
+        with ChunkReader(stream, "faces") as chunk:
+            while chunk:
+                n_loops = unpack('!H', read(2))[0]
+                for i in range(n_loops):
+                    vi, ei = unpack('!II', read(8))
+                    self.loop_verts.append(vi)
+                    self.loop_edges.append(ei)
+                self.loop_total.append(n_loops)
+                material_index, smooth = unpack('!H?', read(3))
+                self.face_material.append(material_index)
+                self.face_smooth.append(smooth)
+        
+        return self
+
+class LayerArrayCodec:
+    """Stores a BMesh layer as one typed array (version 2)"""
+    
+    def __init__(self, typecode, width, get, set):
+        self.typecode = typecode
+        self.width = width
+        self.get = get
+        self.set = set
+    
+    def pack(self, elems, layer):
+        get = self.get
+        arr = array.array(self.typecode)
+        for elem in elems:
+            arr.extend(get(elem[layer]))
+        return arr
+    
+    def unpack(self, values, elems, layer):
+        set = self.set
+        n = self.width
+        for i, elem in enumerate(elems):
+            set(elem, layer, tuple(values[i*n:i*n+n]))
+
+def _set_layer_value(elem, layer, values):
+    elem[layer] = values[0]
+
+def _set_layer_vector(elem, layer, values):
+    elem[layer] = values
+
+def _set_layer_paint_mask(elem, layer, values):
+    elem[layer].value = values[0]
+
+def _set_layer_uv(elem, layer, values):
+    item = elem[layer]
+    item.uv = values[:2]
+    item.pin_uv = bool(values[2])
+
+def _set_layer_skin(elem, layer, values):
+    item = elem[layer]
+    item.radius = values[:2]
+    item.use_loose = bool(values[2])
+    item.use_root = bool(values[3])
+
+# Layer types not listed here (deform, string, tex, freestyle)
+# are (de)serialized per element, same as in version 1
+layer_array_codecs = {
+    "float":LayerArrayCodec('f', 1, (lambda v: (v,)), _set_layer_value),
+    "int":LayerArrayCodec('i', 1, (lambda v: (v,)), _set_layer_value),
+    "bevel_weight":LayerArrayCodec('f', 1, (lambda v: (v,)), _set_layer_value),
+    "crease":LayerArrayCodec('f', 1, (lambda v: (v,)), _set_layer_value),
+    "shape":LayerArrayCodec('f', 3, tuple, _set_layer_vector),
+    "color":LayerArrayCodec('f', 3, tuple, _set_layer_vector),
+    "paint_mask":LayerArrayCodec('f', 1, (lambda v: (v.value,)), _set_layer_paint_mask),
+    "uv":LayerArrayCodec('f', 3, (lambda v: (v.uv[0], v.uv[1], v.pin_uv)), _set_layer_uv),
+    "skin":LayerArrayCodec('f', 4, (lambda v: (v.radius[0], v.radius[1], v.use_loose, v.use_root)), _set_layer_skin),
+}
+
 def is_view3d(context):
     return ((context.area.type == 'VIEW_3D') and (context.region.type == 'WINDOW'))
 
@@ -371,6 +704,26 @@ def save_clipboard_file(filepath):
     if not os.path.exists(dir_path): os.makedirs(dir_path)
     bpy.ops.wm.save_as_mainfile(filepath=filepath, check_existing=False, copy=True)
 
+# Big external clipboard data goes to a file (only the path is put
+# into the clipboard), since base64 text inflates the size by 33%
+def save_data_side_file(c):
+    clipboards_path = get_clipboards_dir()
+    if not os.path.exists(clipboards_path): os.makedirs(clipboards_path)
+    
+    filemask = os.path.join(clipboards_path, "clipboard.*.data")
+    for path in glob.glob(filemask):
+        os.remove(path)
+    
+    name = "clipboard.{}.data".format(int(time.time() * 1000))
+    path = os.path.normcase(os.path.join(clipboards_path, name))
+    with open(path, "wb") as f:
+        f.write(c)
+    return path
+
+def load_data_side_file(path):
+    with open(path, "rb") as f:
+        return decompress_data(f.read())
+
 def data_clipboard_path():
     #resource_path = bpy.utils.resource_path('LOCAL') # USER SYSTEM
     resource_path = get_clipboards_dir()
@@ -537,37 +890,15 @@ class OperatorCopy:
         
         bm = bmesh.from_edit_mesh(obj.data).copy()
         
-        i = 0
-        with ChunkWriter(stream, "verts"):
-            for v in bm.verts:
-                if v.select:
-                    write(pack('!ddd', *v.co))
-                    v.index = i
-                    i += 1
-                else:
-                    bm.verts.remove(v)
+        unselected = [v for v in bm.verts if not v.select]
+        if unselected: bmesh.ops.delete(bm, geom=unselected, context=1) # 1 = DEL_VERTS
         
-        i = 0
-        with ChunkWriter(stream, "edges"):
-            for e in bm.edges:
-                for v in e.verts:
-                    write(pack('!I', v.index))
-                write(pack('!?', e.seam))
-                write(pack('!?', e.smooth))
-                e.index = i
-                i += 1
+        bm.verts.index_update()
+        bm.edges.index_update()
+        bm.faces.index_update()
         
-        i = 0
-        with ChunkWriter(stream, "faces"):
-            for f in bm.faces:
-                write(pack('!H', len(f.loops)))
-                for l in f.loops:
-                    write(pack('!I', l.vert.index))
-                    write(pack('!I', l.edge.index))
-                write(pack('!H', f.material_index))
-                write(pack('!?', f.smooth))
-                f.index = i
-                i += 1
+        write_format_chunk(stream)
+        MeshGeometry.from_bmesh(bm).write(stream)
         
         select_types = {bmesh.types.BMVert:b'V',
                         bmesh.types.BMEdge:b'E',
@@ -587,15 +918,19 @@ class OperatorCopy:
                     layers = getattr(bm.loops.layers, k)
                     
                     serializer = serializers["loops." + k]
+                    codec = layer_array_codecs.get(k)
                     
                     with ChunkWriter(stream, k):
                         for layer_name in layers.keys():
                             layer = layers[layer_name]
                             
                             with ChunkWriter(stream, layer_name):
-                                for f in bm.faces:
-                                    for l in f.loops:
-                                        serializer(l[layer])
+                                if codec:
+                                    write_array(stream, codec.pack((l for f in bm.faces for l in f.loops), layer))
+                                else:
+                                    for f in bm.faces:
+                                        for l in f.loops:
+                                            serializer(l[layer])
         
         with ChunkWriter(stream, "layers"):
             for seq_type in ("verts", "edges", "faces"):
@@ -610,14 +945,18 @@ class OperatorCopy:
                         layers = getattr(seq_layers, k)
                         
                         serializer = serializers[seq_type + "." + k]
+                        codec = layer_array_codecs.get(k)
                         
                         with ChunkWriter(stream, k):
                             for layer_name in layers.keys():
                                 layer = layers[layer_name]
                                 
                                 with ChunkWriter(stream, layer_name):
-                                    for elem in seq:
-                                        serializer(elem[layer])
+                                    if codec:
+                                        write_array(stream, codec.pack(seq, layer))
+                                    else:
+                                        for elem in seq:
+                                            serializer(elem[layer])
                         
                         if seq_type == "faces":
                             # bm.loops (BMLoopsSeq) are not iterable %)
@@ -819,7 +1158,10 @@ class OperatorCopy:
             if opts.external:
                 b = stream.getvalue()
                 stream.close()
-                json_data["data"] = compress_b64(b)
+                if len(b) > opts.side_file_threshold * 1024 * 1024:
+                    json_data["data_file"] = save_data_side_file(compress_data(b, opts.codec))
+                else:
+                    json_data["data"] = compress_b64(b, opts.codec)
             else:
                 stream.close()
         else:
@@ -921,6 +1263,8 @@ class OperatorPaste:
                 self.serialized_data = json_data.get("data")
                 if self.serialized_data:
                     self.serialized_data = decompress_b64(self.serialized_data)
+                elif json_data.get("data_file"):
+                    self.serialized_data = load_data_side_file(json_data["data_file"])
             except Exception as exc:
                 # TODO: see what actual exceptions can appear
                 print(exc)
@@ -1088,35 +1432,21 @@ class OperatorPaste:
         read_bool = iofuncs["read_bool"]
         read_ddd = iofuncs["read_ddd"]
         
-        verts = []
-        with ChunkReader(stream, "verts") as chunk:
-            while chunk:
-                verts.append(read_ddd())
+        version = read_format_chunk(stream)
+        geometry = MeshGeometry.read(stream, version)
+        
+        verts = list(geometry.iter_verts())
         
         connections = [[] for v in verts]
         
         edges = []
-        with ChunkReader(stream, "edges") as chunk:
-            while chunk:
-                ei = len(edges)
-                vi0 = read_I()
-                connections[vi0].append(ei)
-                vi1 = read_I()
-                connections[vi1].append(ei)
-                edges.append((vi0, vi1))
-                read_bool() # seam
-                read_bool() # smooth
+        for vi0, vi1, seam, smooth in geometry.iter_edges():
+            ei = len(edges)
+            connections[vi0].append(ei)
+            connections[vi1].append(ei)
+            edges.append((vi0, vi1))
         
-        faces = []
-        with ChunkReader(stream, "faces") as chunk:
-            while chunk:
-                f = []
-                faces.append(f)
-                n_loops = read_H()
-                for i in range(n_loops):
-                    f.append((read_I(), read_I()))
-                read_H() # material_index
-                read_bool() # smooth
+        faces = [f_loops for f_loops, material_index, smooth in geometry.iter_faces()]
         
         active_vertex = -1
         with ChunkReader(stream, "select_history") as chunk:
@@ -1278,34 +1608,34 @@ class OperatorPaste:
         else:
             bm = bmesh.new()
         
+        version = read_format_chunk(stream)
+        geometry = MeshGeometry.read(stream, version)
+        
         verts = []
         edges = []
         faces = []
         
-        with ChunkReader(stream, "verts") as chunk:
-            while chunk:
-                v = bm.verts.new(read_ddd())
-                verts.append(v)
-                v.select = True
-        
-        with ChunkReader(stream, "edges") as chunk:
-            while chunk:
-                vi0 = read_I()
-                vi1 = read_I()
-                e = bm.edges.new((verts[vi0], verts[vi1]))
-                edges.append(e)
-                e.select = True
-                e.seam = read_bool()
-                e.smooth = read_bool()
-        
-        with ChunkReader(stream, "faces") as chunk:
-            while chunk:
-                f = bm.faces.new(verts[(read_I(), read_I())[0]]
-                                 for i in range(read_H()))
-                faces.append(f)
-                f.select = True
-                f.material_index = read_H()
-                f.smooth = read_bool()
+        verts_new = bm.verts.new
+        for co in geometry.iter_verts():
+            v = verts_new(co)
+            verts.append(v)
+            v.select = True
+        
+        edges_new = bm.edges.new
+        for vi0, vi1, seam, smooth in geometry.iter_edges():
+            e = edges_new((verts[vi0], verts[vi1]))
+            edges.append(e)
+            e.select = True
+            e.seam = seam
+            e.smooth = smooth
+        
+        faces_new = bm.faces.new
+        for f_loops, material_index, smooth in geometry.iter_faces():
+            f = faces_new(verts[vi] for vi, ei in f_loops)
+            faces.append(f)
+            f.select = True
+            f.material_index = material_index
+            f.smooth = smooth
         
         active_verts = ()
         
@@ -1348,6 +1678,7 @@ class OperatorPaste:
                             
                             layers = getattr(bm.loops.layers, k)
                             deserializer = deserializers["loops." + k]
+                            codec = (layer_array_codecs.get(k) if version >= 2 else None)
                             
                             while chunk_k:
                                 chunk_layer = ChunkReader(stream)
@@ -1358,6 +1689,10 @@ class OperatorPaste:
                                     chunk_layer.skip()
                                     continue
                                 
+                                if codec:
+                                    values = read_array(stream, chunk_layer.size)
+                                    codec.unpack(values, (l for f in faces for l in f.loops), layer)
+                                
                                 while chunk_layer:
                                     for f in faces:
                                         for l in f.loops:
@@ -1366,6 +1701,7 @@ class OperatorPaste:
                     
                     layers = getattr(seq_layers, k)
                     deserializer = deserializers[seq_type + "." + k]
+                    codec = (layer_array_codecs.get(k) if version >= 2 else None)
                     
                     while chunk_k:
                         chunk_layer = ChunkReader(stream)
@@ -1377,6 +1713,10 @@ class OperatorPaste:
                             chunk_layer.skip()
                             continue
                         
+                        if codec:
+                            values = read_array(stream, chunk_layer.size)
+                            codec.unpack(values, elems[seq_type], layer)
+                        
                         while chunk_layer:
                             for elem in elems[seq_type]:
                                 deserializer(elem, layer)
@@ -1597,6 +1937,15 @@ class ThisAddonPreferences:
     
     force_copy = True | prop("Always save clipbuffer to disk", "Force full copy")
     
+    codec = 'AUTO' | prop("Compression of the external clipboard data", "Compression", items=[
+        ('AUTO', "Auto", "Choose compression depending on the data size"),
+        ('NONE', "None", "No compression"),
+        ('ZLIB', "Zlib", "Zlib (fast)"),
+        ('LZMA', "LZMA", "LZMA (smaller, slower)"),
+        ('BZ2', "Bz2", "Bz2"),
+    ])
+    side_file_threshold = 16.0 | prop("External clipboard data bigger than this (in megabytes) is saved to a file instead of the clipboard text", "Side file threshold", min=0.0)
+    
     def actual_coordsystem(self, context=None):
         if self.coordinate_system == 'CONTEXT':
             is_edit = ('EDIT' in (context or bpy.context).mode)
@@ -1606,6 +1955,8 @@ class ThisAddonPreferences:
     def draw(self, context):
         layout = NestedLayout(self.layout)
         layout.prop(self, "force_copy")
+        layout.prop(self, "codec")
+        layout.prop(self, "side_file_threshold")
 
 def register():
     addon.register()
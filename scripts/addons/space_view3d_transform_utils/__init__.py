@@ -135,6 +135,7 @@ class ThisAddonPreferences:
     use_panel_left = True | prop("Show in T-panel", name="T (left panel)")
     use_panel_right = False | prop("Show in N-panel", name="N (right panel)")
     epsilon = 1e-6 | prop("Number equality threshold", name="Epsilon", min=0.0, max=1.0, step=1, precision=8)
+    median_error = 0.0 | prop("Rank error of approximate median (0 = exact median, slow for big selections)", name="Median error", min=0.0, max=0.1, step=0.1, precision=4)
     
     gridcolors = batch_transform.GridColorsPG | prop()
     gridstep_small = 5 | prop(min=1, max=100)
@@ -157,6 +158,7 @@ class ThisAddonPreferences:
             layout.prop(self, "use_panel_right")
             with layout.row():#(alignment='EXPAND'):
                 layout.prop(self, "epsilon", text="Tolerance ")
+                layout.prop(self, "median_error", text="Median error ")
         
         with layout.row()(alignment='LEFT'):
             layout.prop(self, "gridstep_small", text="Grid step (small)")
@@ -346,6 +346,7 @@ class TransformAggregator:
     
     def OBJECT_init(self):
         epsilon = addon.preferences.epsilon
+        quantile_error = addon.preferences.median_error
         lock_queries = {"count", "same", "mean"}
         rotation_mode_queries = {"count", "same", "modes"}
         
@@ -354,23 +355,23 @@ class TransformAggregator:
         self.scale = Vector((1,1,1))
         self.dimensions = Vector()
         
-        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_location_lock = VectorAggregator(3, 'BOOL', lock_queries)
         
-        self.aggr_rotation = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_rotation = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_rotation_lock = VectorAggregator(4, 'BOOL', lock_queries)
         self.aggr_rotation_lock_4d = Aggregator('BOOL', lock_queries)
         self.aggr_rotation_mode = Aggregator('STRING', rotation_mode_queries)
         
-        self.aggr_scale = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_scale = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_scale_lock = VectorAggregator(3, 'BOOL', lock_queries)
         
-        self.aggr_dimensions = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_dimensions = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
     
     def OBJECT_process_active(self, context, obj):
         if not obj: return
@@ -515,6 +516,7 @@ class TransformAggregator:
     
     def EDIT_METABALL_init(self):
         epsilon = addon.preferences.epsilon
+        quantile_error = addon.preferences.median_error
         lock_queries = {"count", "same", "mean"}
         rotation_mode_queries = {"count", "same", "modes"}
         
@@ -525,26 +527,26 @@ class TransformAggregator:
         self.radius = (2.0,)
         self.stiffness = (2.0,)
         
-        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_location_lock = VectorAggregator(3, 'BOOL', lock_queries)
         
-        self.aggr_rotation = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_rotation = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_rotation_lock = VectorAggregator(4, 'BOOL', lock_queries)
         self.aggr_rotation_lock_4d = Aggregator('BOOL', lock_queries)
         self.aggr_rotation_mode = Aggregator('STRING', rotation_mode_queries)
         
-        self.aggr_scale = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_scale = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_scale_lock = VectorAggregator(3, 'BOOL', lock_queries)
         
-        self.aggr_dimensions = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_dimensions = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_radius = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_stiffness = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_radius = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_stiffness = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_is_negative = Aggregator('BOOL', lock_queries)
         self.aggr_is_ellipsoid = Aggregator('BOOL', lock_queries)
     
@@ -640,6 +642,7 @@ class TransformAggregator:
     
     def EDIT_ARMATURE_init(self):
         epsilon = addon.preferences.epsilon
+        quantile_error = addon.preferences.median_error
         lock_queries = {"count", "same", "mean"}
         
         self.head = Vector()
@@ -647,20 +650,20 @@ class TransformAggregator:
         self.roll = (0.0,)
         self.envelope = Vector.Fill(4)
         
-        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_head = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_head = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_head_lock = VectorAggregator(3, 'BOOL', lock_queries)
         
-        self.aggr_tail = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_tail = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_tail_lock = VectorAggregator(3, 'BOOL', lock_queries)
         
-        self.aggr_roll = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_roll = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_envelope = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_envelope = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
     
     def EDIT_ARMATURE_process_active(self, context, obj):
         if not obj: return
@@ -770,22 +773,23 @@ class TransformAggregator:
     
     def EDIT_MESH_init(self):
         epsilon = addon.preferences.epsilon
+        quantile_error = addon.preferences.median_error
         lock_queries = {"count", "same", "mean"}
         
         self.location = Vector()
         self.bevel = Vector.Fill(2)
         self.subsurf = (0.0,)
         
-        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         self.aggr_normal_verts = [None, None, None]
         self.aggr_normal_effective_count = 0
         
-        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_bevel = VectorAggregator(2, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_bevel = VectorAggregator(2, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_subsurf = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_subsurf = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
         self.bm = None
     
@@ -922,19 +926,20 @@ class TransformAggregator:
     
     def EDIT_LATTICE_init(self):
         epsilon = addon.preferences.epsilon
+        quantile_error = addon.preferences.median_error
         lock_queries = {"count", "same", "mean"}
         
         self.location = Vector()
         self.weight = (0.0,)
         
-        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_location = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_weight = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_weight = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
     
     def EDIT_LATTICE_process_active(self, context, obj):
         if not obj: return
@@ -1037,6 +1042,7 @@ class TransformAggregator:
     
     def EDIT_CURVE_init(self):
         epsilon = addon.preferences.epsilon
+        quantile_error = addon.preferences.median_error
         lock_queries = {"count", "same", "mean"}
         
         self.location = Vector.Fill(4)
@@ -1044,16 +1050,16 @@ class TransformAggregator:
         self.radius = (0.0,)
         self.tilt = (0.0,)
         
-        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_pivots = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_x = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_y = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_normal_z = VectorAggregator(3, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_location = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_location = VectorAggregator(4, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
         
-        self.aggr_weight = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_radius = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
-        self.aggr_tilt = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon)
+        self.aggr_weight = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_radius = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
+        self.aggr_tilt = VectorAggregator(1, 'NUMBER', self.queries, epsilon=epsilon, quantile_error=quantile_error)
     
     def EDIT_CURVE_process_active(self, context, obj):
         if not obj: return
@@ -40,8 +40,8 @@ except ImportError:
 exec("""
 from {0}dairin0d.utils_math import lerp, matrix_LRS, matrix_compose, matrix_decompose, matrix_inverted_safe, orthogonal_XYZ, orthogonal, orthogonal_in_XY, matrix_flatten, matrix_unflatten, line_line_t, line_plane_t, line_sphere_t, clip_primitive, dist_to_segment, transform_point_normal, transform_plane
 from {0}dairin0d.utils_python import setattr_cmp, setitem_cmp, AttributeHolder, attrs_to_dict, dict_to_attrs, bools_to_int, binary_search
-from {0}dairin0d.utils_view3d import SmartView3D, RaycastResult, Pick_Base
-from {0}dairin0d.utils_blender import Selection, MeshCache, MeshBaker, BlUtil
+from {0}dairin0d.utils_view3d import SmartView3D, RaycastResult, Pick_Base, PointOctree
+from {0}dairin0d.utils_blender import Selection, MeshCache, MeshBaker, MeshBakeCache, BlUtil
 from {0}dairin0d.utils_userinput import KeyMapUtils
 from {0}dairin0d.utils_gl import cgl
 from {0}dairin0d.utils_ui import NestedLayout, tag_redraw, rv3d_from_region, messagebox
@@ -60,6 +60,16 @@ from .coordsystems import *
 
 addon = AddonManager()
 
+# Snapping re-bakes the scene on each invocation; most objects usually stay the same
+snap_bake_cache = MeshBakeCache()
+
+# The workplane grid only changes along with the workplane or the view,
+# so it's recorded once and then redrawn from the GL-side copy
+workplane_grid = AttributeHolder(key=None, batch=cgl.retained_batch('LINES'))
+
+# Same for the highlighted snap polygon, which stays the same while the mouse is over it
+snap_highlight = AttributeHolder(verts=None, batch=cgl.retained_batch('TRIANGLES'))
+
 #============================================================================#
 
 def workplane_matrix(context, scaled):
@@ -762,7 +772,7 @@ class WorkplanePG:
         stipple = (prefs.workplane_stipple, 21845) # 21845 = 101010101010101
         
         if self.limit == 0:
-            def drawline(p0, p1, is10=False):
+            def drawline(batch, p0, p1, is10=False):
                 p0 = m * p0
                 p1 = m * p1
                 tAtB = line_sphere_t((p0, p1), (view_pos, visible_radius), clip0=0.0)
@@ -772,55 +782,61 @@ class WorkplanePG:
                 pA = p0 + pd * tA
                 pB = p0 + pd * tB
                 _c_LS = (c_LS10 if is10 else c_LS)
-                with cgl.batch('LINE_STRIP') as batch:
-                    p0 = pA
-                    cgl.Color = (_c_LS[0], _c_LS[1], _c_LS[2], _c_LS[3] * (1.0 - (p0-view_pos).magnitude/visible_radius))
+                p0 = pA
+                n = 2 # int((pA-pB).magnitude / stepsize)+1
+                for i in range(1, n+1):
+                    p1 = pA.lerp(pB, (i/n))
+                    batch.color(_c_LS[0], _c_LS[1], _c_LS[2], _c_LS[3] * (1.0 - (p0-view_pos).magnitude/visible_radius))
                     batch.vertex(*p0)
-                    n = 2 # int((pA-pB).magnitude / stepsize)+1
-                    for i in range(n+1):
-                        p1 = pA.lerp(pB, (i/n))
-                        cgl.Color = (_c_LS[0], _c_LS[1], _c_LS[2], _c_LS[3] * (1.0 - (p1-view_pos).magnitude/visible_radius))
-                        batch.vertex(*p1)
-                        p0 = p1
+                    batch.color(_c_LS[0], _c_LS[1], _c_LS[2], _c_LS[3] * (1.0 - (p1-view_pos).magnitude/visible_radius))
+                    batch.vertex(*p1)
+                    p0 = p1
         else:
-            def drawline(p0, p1, is10=False):
+            def drawline(batch, p0, p1, is10=False):
                 p0 = m * p0
                 p1 = m * p1
                 _c_LS = (c_LS10 if is10 else c_LS)
-                with cgl.batch('LINE_STRIP') as batch:
-                    cgl.Color = (_c_LS[0], _c_LS[1], _c_LS[2], _c_LS[3])
-                    batch.vertex(*p0)
-                    batch.vertex(*p1)
+                batch.color(_c_LS[0], _c_LS[1], _c_LS[2], _c_LS[3])
+                batch.vertex(*p0)
+                batch.vertex(*p1)
         
         if self.snap_to_polar or self.snap_to_cartesian:
+            grid_key = (tuple(tuple(row) for row in m), tuple(view_pos), visible_radius, scale, self.limit,
+                self.snap_to_polar, self.polar_subdivs, self.snap_to_cartesian, tuple(self.view_ixy),
+                tuple(c_LS), tuple(c_LS10))
+            if workplane_grid.key != grid_key:
+                workplane_grid.key = grid_key
+                with workplane_grid.batch as batch:
+                    if self.snap_to_polar:
+                        n = self.polar_subdivs
+                        for i in range(n):
+                            w = (i/n) * math.pi * 2
+                            pd = Vector((math.sin(w), math.cos(w)))
+                            if self.limit != 0:
+                                pd *= ((self.limit * scale) / max(abs(pd.x), abs(pd.y)))
+                            p0 = Vector((0.0, 0.0, z_offset))
+                            p1 = Vector((pd.x, pd.y, z_offset))
+                            drawline(batch, p0, p1)
+                    
+                    if self.snap_to_cartesian:
+                        center = Vector(self.view_ixy).to_3d() * scale
+                        if self.limit == 0:
+                            n = int(visible_radius / scale) + 1
+                            cb = visible_radius
+                        else:
+                            n = self.limit - 1
+                            cb = self.limit * scale
+                        for i in range(-n, n+1):
+                            ca = i * scale
+                            p0 = center + Vector((ca, -cb, z_offset))
+                            p1 = center + Vector((ca, cb, z_offset))
+                            drawline(batch, p0, p1, (((self.view_ixy[0]+i) % 10) == 0))
+                            p0 = center + Vector((-cb, ca, z_offset))
+                            p1 = center + Vector((cb, ca, z_offset))
+                            drawline(batch, p0, p1, (((self.view_ixy[1]+i) % 10) == 0))
+            
             with cgl(DepthRange=(0, 1-(1e-7)), LineWidth=1, LineStipple=stipple, DepthMask=0, DEPTH_TEST=True, BLEND=True, LINE_STIPPLE=True, ShadeModel='SMOOTH'):
-                if self.snap_to_polar:
-                    n = self.polar_subdivs
-                    for i in range(n):
-                        w = (i/n) * math.pi * 2
-                        pd = Vector((math.sin(w), math.cos(w)))
-                        if self.limit != 0:
-                            pd *= ((self.limit * scale) / max(abs(pd.x), abs(pd.y)))
-                        p0 = Vector((0.0, 0.0, z_offset))
-                        p1 = Vector((pd.x, pd.y, z_offset))
-                        drawline(p0, p1)
-                
-                if self.snap_to_cartesian:
-                    center = Vector(self.view_ixy).to_3d() * scale
-                    if self.limit == 0:
-                        n = int(visible_radius / scale) + 1
-                        cb = visible_radius
-                    else:
-                        n = self.limit - 1
-                        cb = self.limit * scale
-                    for i in range(-n, n+1):
-                        ca = i * scale
-                        p0 = center + Vector((ca, -cb, z_offset))
-                        p1 = center + Vector((ca, cb, z_offset))
-                        drawline(p0, p1, (((self.view_ixy[0]+i) % 10) == 0))
-                        p0 = center + Vector((-cb, ca, z_offset))
-                        p1 = center + Vector((cb, ca, z_offset))
-                        drawline(p0, p1, (((self.view_ixy[1]+i) % 10) == 0))
+                workplane_grid.batch.draw()
         
         with cgl(DepthRange=(0, 1-(1e-7)), DepthMask=0, DEPTH_TEST=True, BLEND=True, ShadeModel='SMOOTH'):
             with cgl.batch('TRIANGLE_FAN') as batch:
@@ -2261,7 +2277,7 @@ class Operator_Transform_Snap:
         self.snap_bbox = False
         
         self.mesh_bakers = {}
-        self.kd_last_rv3d = None
+        self.kd_last_bakers = None
         self.kd_origins = None
         self.kd_bboxes = None
         
@@ -2566,14 +2582,12 @@ class Operator_Transform_Snap:
     def update_kd(self, mesh_baker, kd):
         mesh_baker.update(0.005)
         if (kd is None) and mesh_baker.finished:
-            verts = mesh_baker.bm.verts
-            if hasattr(verts, "ensure_lookup_table"): verts.ensure_lookup_table()
-            kd = mathutils.kdtree.KDTree(len(verts))
-            for i, v in enumerate(verts):
-                xy = self.sv.project(v.co)
-                if not xy: continue
-                kd.insert((xy[0], xy[1], 0.0), i)
-            kd.balance()
+            # Index is in world space, so it stays valid when the view changes
+            if mesh_baker.arrays is not None:
+                co = mesh_baker.arrays.co
+            else:
+                co = [c for i in range(mesh_baker.vert_count) for c in mesh_baker.vert_co(i)]
+            kd = PointOctree(co)
         return kd
     
     def kd_raycast(self, mesh_baker, kd, mouse):
@@ -2587,18 +2601,17 @@ class Operator_Transform_Snap:
         view_dir = self.sv.forward
         best_dist = float("inf")
         best_index = None
-        verts = mesh_baker.bm.verts
-        for (co, index, dist) in kd.find_range(mouse, vert_edge_max_dist):
-            v = verts[index]
-            dist = view_dir.dot(v.co)
+        region = self.sv.region
+        persmat = self.sv.region_data.perspective_matrix
+        for (index, xy, dist) in kd.find_projected(persmat, region.width, region.height, mouse, vert_edge_max_dist):
+            dist = view_dir.dot(mesh_baker.vert_co(index))
             if dist < best_dist:
                 best_dist = dist
                 best_index = index
         
         if best_index is not None:
-            v = verts[best_index]
-            location = Vector(v.co)
-            normal = Vector(v.normal)
+            location = mesh_baker.vert_co(best_index)
+            normal = mesh_baker.vert_normal(best_index)
             
             obj, bone, bbox = mesh_baker.vert_to_obj(best_index)
             obj2world = obj.matrix_world
@@ -2646,6 +2659,8 @@ class Operator_Transform_Snap:
                     dupli=self.snap_dupli,
                     solid_only=self.snap_solid_only,
                     auto_clear=True,
+                    backend='ARRAYS',
+                    cache=snap_bake_cache,
                 ),
                 "origins":MeshBaker(scene,
                     include=include_objs,
@@ -2657,6 +2672,8 @@ class Operator_Transform_Snap:
                     dupli=self.snap_dupli,
                     solid_only=self.snap_solid_only,
                     auto_clear=True,
+                    backend='ARRAYS',
+                    cache=snap_bake_cache,
                 ),
                 "bboxes":MeshBaker(scene,
                     include=include_objs,
@@ -2668,6 +2685,8 @@ class Operator_Transform_Snap:
                     dupli=self.snap_dupli,
                     solid_only=self.snap_solid_only,
                     auto_clear=True,
+                    backend='ARRAYS',
+                    cache=snap_bake_cache,
                 ),
             }
             self.mesh_bakers[lv3d] = mesh_bakers
@@ -2677,8 +2696,9 @@ class Operator_Transform_Snap:
             mesh_bakers["origins"].update(0.005)
             mesh_bakers["bboxes"].update(0.005)
             
-            if self.kd_last_rv3d != self.sv.region_data:
-                self.kd_last_rv3d = self.sv.region_data
+            # The indices don't depend on the view, only on the baked geometry
+            if self.kd_last_bakers is not mesh_bakers:
+                self.kd_last_bakers = mesh_bakers
                 self.kd_origins = None
                 self.kd_bboxes = None
             
@@ -2853,14 +2873,18 @@ class Operator_Transform_Snap:
             cgl.Matrix_ModelView = cgl.Matrix_ModelView_3D
             cgl.Matrix_Projection = cgl.Matrix_Projection_3D
             
-            with cgl(DepthMask=0, DEPTH_TEST=False, BLEND=True):
-                cgl.Color = (0.0, 1.0, 0.0, alpha*0.75)
-                with cgl.batch('TRIANGLES') as batch:
+            if snap_highlight.verts != self.snap_draw_verts:
+                snap_highlight.verts = self.snap_draw_verts
+                with snap_highlight.batch as batch:
                     for i0, i1, i2 in self.snap_draw_tris:
                         batch.vertex(*self.snap_draw_verts[i0])
                         batch.vertex(*self.snap_draw_verts[i1])
                         batch.vertex(*self.snap_draw_verts[i2])
             
+            with cgl(DepthMask=0, DEPTH_TEST=False, BLEND=True):
+                cgl.Color = (0.0, 1.0, 0.0, alpha*0.75)
+                snap_highlight.batch.draw()
+            
             cgl.Matrix_ModelView = cgl.Matrix_ModelView_2D
             cgl.Matrix_Projection = cgl.Matrix_Projection_2D
         elif len(self.snap_draw_verts) == 2:
@@ -562,6 +562,40 @@ class BlRna:
                 return False
         return True
 
+    @staticmethod
+    def signature_prop(rna_prop, value, depth=1):
+        if rna_prop.type == 'POINTER':
+            if value is None: return None
+            if depth <= 0: return True
+            return BlRna.signature(value, depth=depth-1)
+        elif rna_prop.type == 'COLLECTION':
+            if depth <= 0: return len(value)
+            return tuple(BlRna.signature(item, depth=depth-1) for item in value)
+        else: # primitive types or enum
+            if hasattr(rna_prop, "array_length"):
+                if rna_prop.array_length != 0:
+                    if isinstance(value, Matrix):
+                        return tuple(tuple(row) for row in value)
+                    return tuple(value)
+            if isinstance(value, set): return frozenset(value)
+            return value
+
+    @staticmethod
+    def signature(obj, ignore=(), specials={}, depth=1):
+        """Hashable key of object's rna properties (objects equal by compare() have equal keys)"""
+        # pointers/collections deeper than depth are reduced to None-ness/length;
+        # specials map property names to key functions (rna_prop, value)
+        if obj is None: return None
+        items = []
+        for name, rna_prop in BlRna.properties(obj):
+            if name in ignore: continue
+            value = getattr(obj, name)
+            if name in specials:
+                items.append(specials[name](rna_prop, value))
+            else:
+                items.append(BlRna.signature_prop(rna_prop, value, depth))
+        return tuple(items)
+
 #============================================================================#
 
 class BpyProp:
@@ -20,6 +20,16 @@ import bpy
 
 import math
 import bisect
+import array
+import operator
+import functools
+import itertools
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from .utils_python import sequence_startswith, sequence_endswith
 from .utils_text import indent, longest_common_substring
@@ -30,6 +40,137 @@ from .utils_text import indent, longest_common_substring
 TODO: "active" query (for consistency)
 """
 
+class QuantileSketch:
+    """
+    Bounded-memory approximation of a distribution of numbers
+    (a merging t-digest with uniform scale function). Values are
+    kept exactly while there are few of them; after that, quantiles
+    are estimated with rank error of about error * count.
+    """
+    
+    def __init__(self, error=0.01):
+        self.error = error
+        self.buffer_size = max(int(4.0 / error), 16)
+        self.min = None
+        self.max = None
+        self._total = 0 # total weight of centroids
+        self._means = []
+        self._weights = []
+        self._buffer = []
+    
+    count = property(lambda self: self._total + len(self._buffer))
+    
+    def copy(self):
+        sketch = QuantileSketch(self.error)
+        sketch.min = self.min
+        sketch.max = self.max
+        sketch._total = self._total
+        sketch._means = list(self._means)
+        sketch._weights = list(self._weights)
+        sketch._buffer = list(self._buffer)
+        return sketch
+    
+    def add(self, value):
+        self._buffer.append(value)
+        if len(self._buffer) > self.buffer_size: self._compress()
+    
+    def add_many(self, values):
+        if (numpy is not None) and isinstance(values, numpy.ndarray):
+            n = len(values)
+            if (n <= self.buffer_size) or (self.error * n < 2):
+                self._buffer.extend(values.tolist())
+            else:
+                # Equal-sized blocks of sorted values satisfy the size limit
+                arr = numpy.sort(values)
+                k = int(self.error * n)
+                m = n - (n % k)
+                means = arr[:m].reshape(-1, k).mean(axis=1).tolist()
+                weights = [k] * len(means)
+                if m < n:
+                    means.append(arr[m:].mean().item())
+                    weights.append(n - m)
+                self._update_min_max(arr[0].item(), arr[-1].item())
+                self._compress(means, weights)
+                return
+        else:
+            self._buffer.extend(values)
+        if len(self._buffer) > self.buffer_size: self._compress()
+    
+    def merge(self, other):
+        self._update_min_max(other.min, other.max)
+        # Buffered values are not yet reflected in other's min/max
+        if other._buffer: self._update_min_max(min(other._buffer), max(other._buffer))
+        if self._means or other._means or (self.count + other.count > self.buffer_size):
+            self._compress(other._means + other._buffer, other._weights + [1] * len(other._buffer))
+        else:
+            self._buffer.extend(other._buffer)
+    
+    def _update_min_max(self, v_min, v_max):
+        if v_min is None: return
+        self.min = (v_min if self.min is None else min(self.min, v_min))
+        self.max = (v_max if self.max is None else max(self.max, v_max))
+    
+    def _compress(self, means=(), weights=()):
+        buffer = self._buffer
+        if buffer:
+            buffer.sort()
+            self._update_min_max(buffer[0], buffer[-1])
+        
+        means = self._means + buffer + list(means)
+        weights = self._weights + [1] * len(buffer) + list(weights)
+        total = sum(weights)
+        limit = max(self.error * total, 1)
+        
+        new_means, new_weights = [], []
+        mean, weight = None, 0
+        for i in sorted(range(len(means)), key=means.__getitem__):
+            m, w = means[i], weights[i]
+            if weight and (weight + w <= limit):
+                weight += w
+                mean += (m - mean) * (w / weight)
+            else:
+                if weight:
+                    new_means.append(mean)
+                    new_weights.append(weight)
+                mean, weight = m, w
+        if weight:
+            new_means.append(mean)
+            new_weights.append(weight)
+        
+        self._total = total
+        self._means = new_means
+        self._weights = new_weights
+        self._buffer = []
+    
+    def quantile(self, q):
+        if self._means:
+            if self._buffer: self._compress()
+            means, weights = self._means, self._weights
+            v_min, v_max = self.min, self.max
+        else:
+            means = self._buffer
+            if not means: return None
+            means.sort()
+            weights = None
+            v_min, v_max = means[0], means[-1]
+        
+        # Each centroid is assumed to be centered at the middle of its rank range
+        # (for single values this is the same as interpolating sorted[q*(n-1)])
+        target = 0.5 + min(max(q, 0.0), 1.0) * (self.count - 1)
+        rank0, value0 = 0.0, v_min
+        start = 0.0
+        for i, mean in enumerate(means):
+            weight = (weights[i] if weights else 1)
+            rank = start + weight * 0.5
+            if target < rank: break
+            rank0, value0 = rank, mean
+            start += weight
+        else:
+            rank, mean = self.count, v_max
+        
+        if rank <= rank0: return value0
+        return value0 + (mean - value0) * ((target - rank0) / (rank - rank0))
+
 class Aggregator:
     _count = 0
     _same = True
@@ -47,6 +188,7 @@ class Aggregator:
     _Qk = None
     
     _sorted = None
+    _sketch = None
     
     _freq_map = None
     _freq_max = None
@@ -109,12 +251,21 @@ class Aggregator:
     sorted = property(lambda self: self._sorted)
     @property
     def median(self):
+        if self._sketch is not None: return self._sketch.quantile(0.5)
         if not self._sorted: return None
         n = len(self._sorted)
         if (n % 2) == 1: return self._sorted[n // 2]
         i = n // 2
         return (self._sorted[i] + self._sorted[i - 1]) * 0.5
     
+    def quantile(self, q):
+        if self._sketch is not None: return self._sketch.quantile(q)
+        if not self._sorted: return None
+        x = (len(self._sorted) - 1) * min(max(q, 0.0), 1.0)
+        i = int(x)
+        if i == x: return self._sorted[i]
+        return self._sorted[i] + (self._sorted[i + 1] - self._sorted[i]) * (x - i)
+    
     freq_map = property(lambda self: self._freq_map)
     freq_max = property(lambda self: self._freq_max)
     modes = property(lambda self: self._modes)
@@ -158,7 +309,12 @@ class Aggregator:
     
     _compiled = {}
     
-    def __init__(self, type, queries=None, convert=None, epsilon=1e-6):
+    def __init__(self, type, queries=None, convert=None, epsilon=1e-6, quantile_error=None):
+        """
+        If quantile_error (relative rank error) is specified, median and quantiles
+        of numbers are estimated by a bounded-memory QuantileSketch instead of
+        keeping all values sorted.
+        """
         self._type = type
         
         self._startswith = sequence_startswith
@@ -177,8 +333,14 @@ class Aggregator:
             queries = queries.split(" ")
         
         if (type != 'NUMBER') or ((epsilon is not None) and (epsilon <= 0)): epsilon = None
+        if (type != 'NUMBER') or (not quantile_error) or (quantile_error <= 0): quantile_error = None
+        
+        self._base_type = type
+        self._convert = convert
+        self._epsilon = epsilon
+        self._quantile_error = quantile_error
         
-        compiled_key0 = (type, frozenset(queries), convert, epsilon)
+        compiled_key0 = (type, frozenset(queries), convert, epsilon, quantile_error)
         compiled = Aggregator._compiled.get(compiled_key0)
         
         if not compiled:
@@ -193,23 +355,24 @@ class Aggregator:
             if ('variance' in queries) or ('stddev' in queries): queries.update(('Qk', 'count'))
             if 'Qk' in queries: queries.add('Ak')
             if 'Ak' in queries: queries.add('count')
-            if 'median' in queries: queries.add('sorted')
+            if 'median' in queries: queries.add('sketch' if quantile_error else 'sorted')
             if 'mode' in queries: queries.add('modes')
             if 'modes' in queries: queries.add('freq_max')
             if 'freq_max' in queries: queries.add('freq_map')
             if queries.intersection(('subseq', 'subseq_starts', 'subseq_ends')):
                 queries.update(('subseq', 'subseq_starts', 'subseq_ends'))
             
-            compiled_key = (type, frozenset(queries), convert, epsilon)
+            compiled_key = (type, frozenset(queries), convert, epsilon, quantile_error)
             compiled = Aggregator._compiled.get(compiled_key)
             
             if not compiled:
-                compiled = self._compile(type, queries, convert, epsilon)
+                compiled = self._compile(type, queries, convert, epsilon, quantile_error)
                 Aggregator._compiled[compiled_key] = compiled
             
             Aggregator._compiled[compiled_key0] = compiled
         
         self.queries = compiled_key0[1] # the original queries, without dependencies
+        self._queries = compiled[3] # the queries with all dependencies
         
         # Assign bound methods
         self.reset = compiled[0].__get__(self, self.__class__)
@@ -218,12 +381,12 @@ class Aggregator:
         
         self.reset()
     
-    def _compile(self, type, queries, convert, epsilon):
+    def _compile(self, type, queries, convert, epsilon, quantile_error):
         reset_lines = []
         init_lines = []
         add_lines = []
         
-        localvars = dict(log=math.log, insort_left=bisect.insort_left,
+        localvars = dict(log=math.log, insort_left=bisect.insort_left, QuantileSketch=QuantileSketch,
             startswith=self._startswith, endswith=self._endswith, convert=convert)
         
         if 'count' in queries:
@@ -283,16 +446,24 @@ class Aggregator:
             reset_lines.append("self._sorted = None")
             init_lines.append("self._sorted = [value]")
             add_lines.append("insort_left(self._sorted, value)")
+        if 'sketch' in queries:
+            reset_lines.append("self._sketch = None")
+            init_lines.append("self._sketch = QuantileSketch(%s)" % quantile_error)
+            init_lines.append("self._sketch.add(value)")
+            add_lines.append("self._sketch.add(value)")
         
         if type != 'ENUM':
             if 'freq_map' in queries:
                 reset_lines.append("self._freq_map = None")
                 init_lines.append("self._freq_map = {value:1}")
-                add_lines.append("freq = self._freq_map.get(value, 0) + 1")
+                if 'modes' in queries: # keep freq_map in the order of last occurrences
+                    add_lines.append("freq = self._freq_map.pop(value, 0) + 1")
+                else:
+                    add_lines.append("freq = self._freq_map.get(value, 0) + 1")
                 add_lines.append("self._freq_map[value] = freq")
             if 'freq_max' in queries:
                 reset_lines.append("self._freq_max = None")
-                init_lines.append("self._freq_max = 0")
+                init_lines.append("self._freq_max = 1")
                 add_lines.append("if freq > self._freq_max:")
                 add_lines.append("    self._freq_max = freq")
             if 'modes' in queries:
@@ -306,11 +477,14 @@ class Aggregator:
                 reset_lines.append("self._freq_map = None")
                 init_lines.append("self._freq_map = {item:1 for item in value}")
                 add_lines.append("for item in value:")
-                add_lines.append("    freq = self._freq_map.get(item, 0) + 1")
+                if 'modes' in queries: # keep freq_map in the order of last occurrences
+                    add_lines.append("    freq = self._freq_map.pop(item, 0) + 1")
+                else:
+                    add_lines.append("    freq = self._freq_map.get(item, 0) + 1")
                 add_lines.append("    self._freq_map[item] = freq")
             if 'freq_max' in queries:
                 reset_lines.append("self._freq_max = None")
-                init_lines.append("self._freq_max = 0")
+                init_lines.append("self._freq_max = (1 if self._freq_map else 0)")
                 add_lines.append("    if freq > self._freq_max:")
                 add_lines.append("        self._freq_max = freq")
             if 'modes' in queries:
@@ -359,7 +533,7 @@ class Aggregator:
         exec(init_code, localvars, localvars)
         _init = localvars["_init"]
         
-        if convert is not None: init_lines.insert(0, "value = convert(value)")
+        if convert is not None: add_lines.insert(0, "value = convert(value)")
         add_lines = [indent(line, "    ") for line in add_lines]
         add_lines.insert(0, "def _add(self, value):")
         add_code = "\n".join(add_lines)
@@ -367,7 +541,7 @@ class Aggregator:
         exec(add_code, localvars, localvars)
         _add = localvars["_add"]
         
-        return reset, _init, _add
+        return reset, _init, _add, frozenset(queries)
     
     def _subseq_update(self, value):
         if self._subseq_starts:
@@ -394,11 +568,272 @@ class Aggregator:
             #        self._subseq_starts = self._startswith(value, self._subseq)
             #    if self._endswith(prev_subseq, self._subseq):
             #        self._subseq_ends = self._endswith(value, self._subseq)
+    
+    def add_many(self, values):
+        """
+        Add a whole batch of values at once. Numeric buffers (numpy arrays,
+        array.array, memoryview, e.g. filled by foreach_get()) are summarized
+        in vectorized passes; any other iterable is processed with builtins.
+        The summaries are the same as if each value was passed to add().
+        """
+        arr = self._as_ndarray(values)
+        if arr is not None:
+            if len(arr) == 0: return
+            chunk = self._summarize_ndarray(arr)
+        else:
+            convert = self._convert
+            values = (list(values) if convert is None else [convert(value) for value in values])
+            if not values: return
+            if ('subseq' in self._queries) and (self.add != self._init):
+                for value in values: # inherently sequential
+                    self._subseq_update(value)
+            chunk = self._summarize_list(values)
+        
+        self._absorb(chunk)
+    
+    def merge(self, other):
+        """
+        Combine the summaries of other aggregator into this one, as if
+        the values added to other were added to this aggregator too.
+        This allows to aggregate chunks of data independently.
+        """
+        if ((other._type != self._type) or (other._queries != self._queries) or
+                (other._convert != self._convert) or (other._epsilon != self._epsilon) or
+                (other._quantile_error != self._quantile_error)):
+            raise TypeError("Cannot merge aggregators with different types or queries")
+        
+        if other.add == other._init: return # other is empty
+        
+        if ('subseq' in self._queries) and (self.add != self._init):
+            self._subseq_merge(other)
+        
+        self._absorb(other)
+    
+    def _subseq_merge(self, other):
+        # other._subseq is a common substring of all other's values, so its
+        # common substring with self._subseq is common to all values as well
+        self._subseq_update(other._subseq)
+        if not other._subseq_starts: self._subseq_starts = False
+        if not other._subseq_ends: self._subseq_ends = False
+    
+    def _spawn(self):
+        return Aggregator(self._type, self.queries, self._convert, self._epsilon, self._quantile_error)
+    
+    def _as_ndarray(self, values):
+        if (numpy is None) or (self._base_type != 'NUMBER'): return None
+        if not isinstance(values, (numpy.ndarray, array.array, memoryview)): return None
+        
+        arr = numpy.asarray(values)
+        if arr.dtype.kind not in "biuf": return None
+        arr = arr.ravel()
+        
+        convert = self._convert
+        if convert in (int, float):
+            arr = arr.astype(convert)
+        elif convert is not None:
+            return None # arbitrary conversions can't be vectorized
+        elif arr.dtype.kind == "b":
+            arr = arr.astype(int)
+        
+        return arr
+    
+    def _summarize_list(self, values):
+        queries = self._queries
+        epsilon = self._epsilon
+        chunk = self._spawn()
+        n = len(values)
+        first = values[0]
+        
+        if 'count' in queries: chunk._count = n
+        if 'min' in queries: chunk._min = min(values)
+        if 'max' in queries: chunk._max = max(values)
+        if 'same' in queries:
+            if epsilon:
+                chunk._same = (abs(chunk._max - chunk._min) <= epsilon)
+            else:
+                chunk._same = (values.count(first) == n)
+        if 'prev' in queries: chunk._prev = values[-1]
+        
+        if 'sum' in queries: chunk._sum = sum(values)
+        if 'sum_log' in queries: chunk._sum_log = sum((math.log(v) for v in values if v > 0.0), 0.0)
+        if 'sum_rec' in queries: chunk._sum_rec = sum((1.0 / v for v in values if v != 0.0), 0.0)
+        if 'product' in queries: chunk._product = functools.reduce(operator.mul, values)
+        
+        if 'Ak' in queries:
+            chunk._Ak = (sum(values) / n if n > 1 else first)
+        if 'Qk' in queries:
+            mean = chunk._Ak
+            chunk._Qk = sum(((v - mean) * (v - mean) for v in values), 0.0)
+        
+        if 'sorted' in queries: chunk._sorted = sorted(values)
+        if 'sketch' in queries:
+            chunk._sketch = QuantileSketch(self._quantile_error)
+            chunk._sketch.add_many(values)
+        
+        if 'freq_map' in queries:
+            items = (values if self._base_type != 'ENUM' else list(itertools.chain.from_iterable(values)))
+            counts = collections.Counter(items)
+            if 'modes' in queries:
+                # Same order as in add(): by last occurrence
+                last_occurrences = {item: i for i, item in enumerate(items)}
+                chunk._freq_map = {item: counts[item] for item in sorted(last_occurrences, key=last_occurrences.__getitem__)}
+            else:
+                chunk._freq_map = dict(counts)
+        
+        if 'union' in queries: chunk._union = set().union(*values)
+        if 'intersection' in queries: chunk._intersection = set(first).intersection(*values)
+        if 'difference' in queries:
+            difference = set(first)
+            for value in itertools.islice(values, 1, None):
+                difference.symmetric_difference_update(value)
+            chunk._difference = difference
+        
+        if 'subseq' in queries:
+            chunk._subseq = first
+            chunk._subseq_starts = True
+            chunk._subseq_ends = True
+            for value in itertools.islice(values, 1, None):
+                chunk._subseq_update(value)
+        
+        chunk.add = chunk._add
+        return chunk
+    
+    def _summarize_ndarray(self, arr):
+        queries = self._queries
+        epsilon = self._epsilon
+        chunk = self._spawn()
+        n = len(arr)
+        
+        if 'count' in queries: chunk._count = n
+        if 'min' in queries: chunk._min = arr.min().item()
+        if 'max' in queries: chunk._max = arr.max().item()
+        if 'same' in queries:
+            if epsilon:
+                chunk._same = (abs(chunk._max - chunk._min) <= epsilon)
+            else:
+                chunk._same = bool((arr == arr[0]).all())
+        if 'prev' in queries: chunk._prev = arr[-1].item()
+        
+        if 'sum' in queries: chunk._sum = arr.sum().item()
+        if 'sum_log' in queries: chunk._sum_log = float(numpy.log(arr[arr > 0]).sum())
+        if 'sum_rec' in queries: chunk._sum_rec = float((1.0 / arr[arr != 0]).sum())
+        if 'product' in queries:
+            if arr.dtype.kind == "f":
+                chunk._product = arr.prod().item()
+            else: # numpy ints would overflow
+                chunk._product = functools.reduce(operator.mul, arr.tolist())
+        
+        if 'Ak' in queries:
+            chunk._Ak = (arr.mean().item() if n > 1 else arr[0].item())
+        if 'Qk' in queries:
+            deviations = arr - chunk._Ak
+            chunk._Qk = float(numpy.dot(deviations, deviations))
+        
+        if 'sorted' in queries: chunk._sorted = numpy.sort(arr).tolist()
+        if 'sketch' in queries:
+            chunk._sketch = QuantileSketch(self._quantile_error)
+            chunk._sketch.add_many(arr)
+        
+        if 'freq_map' in queries:
+            # First indices of unique values in the reversed array
+            # are the last occurrences in the original array
+            uniques, indices, counts = numpy.unique(arr[::-1], return_index=True, return_counts=True)
+            if 'modes' in queries:
+                # Same order as in add(): by last occurrence
+                last_order = numpy.argsort(-indices, kind='stable')
+                uniques, counts = uniques[last_order], counts[last_order]
+            chunk._freq_map = dict(zip(uniques.tolist(), counts.tolist()))
+        
+        chunk.add = chunk._add
+        return chunk
+    
+    def _absorb(self, chunk):
+        # Combines the summaries of chunk into the summaries of self
+        # (subseq is expected to be already combined by the caller).
+        # With 'modes', freq_maps are ordered by last occurrence: a value
+        # reaches its total frequency at its last occurrence, so that's
+        # also the order in which tied values would be added to modes.
+        queries = self._queries
+        epsilon = self._epsilon
+        
+        if self.add == self._init:
+            for name in ('count', 'min', 'max', 'same', 'prev',
+                    'sum', 'sum_log', 'sum_rec', 'product', 'Ak', 'Qk',
+                    'subseq', 'subseq_starts', 'subseq_ends'):
+                if name in queries: setattr(self, "_"+name, getattr(chunk, "_"+name))
+            
+            if 'sorted' in queries: self._sorted = list(chunk._sorted)
+            if 'sketch' in queries: self._sketch = chunk._sketch.copy()
+            
+            if 'freq_map' in queries: self._freq_map = {}
+            if 'freq_max' in queries: self._freq_max = 0
+            if 'modes' in queries: self._modes = []
+            
+            if 'union' in queries: self._union = set(chunk._union)
+            if 'intersection' in queries: self._intersection = set(chunk._intersection)
+            if 'difference' in queries: self._difference = set(chunk._difference)
+        else:
+            if 'min' in queries: self._min = min(self._min, chunk._min)
+            if 'max' in queries: self._max = max(self._max, chunk._max)
+            if 'same' in queries:
+                if epsilon:
+                    if self._same: self._same = (abs(self._max - self._min) <= epsilon)
+                else:
+                    if self._same: self._same = (chunk._same and (chunk._prev == self._prev))
+            if 'prev' in queries: self._prev = chunk._prev
+            
+            if 'sum' in queries: self._sum += chunk._sum
+            if 'sum_log' in queries: self._sum_log += chunk._sum_log
+            if 'sum_rec' in queries: self._sum_rec += chunk._sum_rec
+            if 'product' in queries: self._product *= chunk._product
+            
+            if 'Ak' in queries:
+                # Chan et al. pairwise update of mean and sum of squared deviations
+                count_a, count_b = self._count, chunk._count
+                count = count_a + count_b
+                delta = chunk._Ak - self._Ak
+                if 'Qk' in queries:
+                    self._Qk += chunk._Qk + delta * delta * (count_a * count_b / count)
+                self._Ak += delta * (count_b / count)
+            if 'count' in queries: self._count += chunk._count
+            
+            if 'sorted' in queries:
+                self._sorted.extend(chunk._sorted)
+                self._sorted.sort() # timsort merges the two sorted runs in linear time
+            if 'sketch' in queries: self._sketch.merge(chunk._sketch)
+            
+            if 'union' in queries: self._union.update(chunk._union)
+            if 'intersection' in queries: self._intersection.intersection_update(chunk._intersection)
+            if 'difference' in queries: self._difference.symmetric_difference_update(chunk._difference)
+        
+        if 'freq_map' in queries:
+            freq_map = self._freq_map
+            if 'modes' in queries:
+                for value, freq in chunk._freq_map.items():
+                    freq_map[value] = freq_map.pop(value, 0) + freq
+            else:
+                for value, freq in chunk._freq_map.items():
+                    freq_map[value] = freq_map.get(value, 0) + freq
+            
+            if ('freq_max' in queries) and chunk._freq_map:
+                freq_max = max(freq_map[value] for value in chunk._freq_map)
+                if freq_max >= self._freq_max:
+                    # chunk's values (all of which occur after self's) reach
+                    # their total frequency in the order of chunk's freq_map
+                    candidates = [value for value in chunk._freq_map if freq_map[value] == freq_max]
+                    
+                    if freq_max > self._freq_max:
+                        self._freq_max = freq_max
+                        if 'modes' in queries: self._modes = candidates
+                    elif 'modes' in queries:
+                        self._modes.extend(candidates)
+        
+        self.add = self._add
 
 class VectorAggregator:
-    def __init__(self, size, type, queries=None, covert=None, epsilon=1e-6):
+    def __init__(self, size, type, queries=None, covert=None, epsilon=1e-6, quantile_error=None):
         self._type = type
-        self.axes = tuple(Aggregator(type, queries, covert, epsilon) for i in range(size))
+        self.axes = tuple(Aggregator(type, queries, covert, epsilon, quantile_error) for i in range(size))
     
     def reset(self):
         for axis in self.axes:
@@ -414,6 +849,43 @@ class VectorAggregator:
         else:
             self.axes[i].add(value)
     
+    def add_many(self, values, i=None):
+        """
+        Add a batch of vectors: either a sequence of vectors, or a flat
+        buffer of interleaved components (as filled by foreach_get()).
+        If i is specified, values are a batch of the i-th components.
+        """
+        if i is not None:
+            self.axes[i].add_many(values)
+            return
+        
+        size = len(self.axes)
+        
+        if (numpy is not None) and isinstance(values, (numpy.ndarray, array.array, memoryview)):
+            arr = numpy.asarray(values)
+            if arr.dtype.kind in "biuf":
+                arr = arr.reshape(-1, size)
+                for axis_index, axis in enumerate(self.axes):
+                    axis.add_many(arr[:, axis_index])
+                return
+        
+        if not hasattr(values, "__getitem__"): values = list(values)
+        if not len(values): return
+        
+        if (self.axes[0]._base_type == 'NUMBER') and not hasattr(values[0], "__len__"):
+            columns = (values[axis_index::size] for axis_index in range(size)) # flat buffer
+        else:
+            columns = zip(*values)
+        
+        for axis, column in zip(self.axes, columns):
+            axis.add_many(column)
+    
+    def merge(self, other):
+        if len(other.axes) != len(self.axes):
+            raise TypeError("Cannot merge vector aggregators of different sizes")
+        for axis, other_axis in zip(self.axes, other.axes):
+            axis.merge(other_axis)
+    
     type = property(lambda self: self._type)
     
     count = property(lambda self: (self.axes[0].count if self.axes else 0)) # same for all
@@ -438,6 +910,9 @@ class VectorAggregator:
     sorted = property(lambda self: tuple(axis.sorted for axis in self.axes))
     median = property(lambda self: tuple(axis.median for axis in self.axes))
     
+    def quantile(self, q):
+        return tuple(axis.quantile(q) for axis in self.axes)
+    
     freq_map = property(lambda self: tuple(axis.freq_map for axis in self.axes))
     freq_max = property(lambda self: tuple(axis.freq_max for axis in self.axes))
     modes = property(lambda self: tuple(axis.modes for axis in self.axes))
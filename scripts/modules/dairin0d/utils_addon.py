@@ -103,6 +103,7 @@ class AddonManager:
         self._scene_update_post = []
         self._load_pre = []
         self._load_post = []
+        self._undo_post = []
         self._background_job = []
         self._selection_job = []
         
@@ -417,6 +418,11 @@ class AddonManager:
         self._load_post.append(callback)
         return callback
     
+    def undo_post(self, callback):
+        """Called after undo and redo"""
+        self._undo_post.append(callback)
+        return callback
+    
     def background_job(self, callback):
         self._background_job.append(callback)
         return callback
@@ -2292,6 +2298,12 @@ class AddonsRegistry:
             def load_post(*args, **kwargs):
                 addons_registry.load_post()
             bpy.app.handlers.load_post.append(load_post)
+            
+            @bpy.app.handlers.persistent
+            def undo_post(*args, **kwargs):
+                addons_registry.undo_post()
+            bpy.app.handlers.undo_post.append(undo_post)
+            bpy.app.handlers.redo_post.append(undo_post)
         
         self.module_infos[module_info["key"]] = module_info
         
@@ -2429,6 +2441,17 @@ class AddonsRegistry:
                         print("Error in {} load_post {}:".format(addon.module_name, callback.__name__))
                         traceback.print_exc()
     
+    def undo_post(self):
+        if self.event_lock: return # prevent infinite recursion
+        with self.event_lock:
+            for addon in self.addons.values():
+                for callback in addon._undo_post:
+                    try:
+                        callback()
+                    except Exception as exc:
+                        print("Error in {} undo_post {}:".format(addon.module_name, callback.__name__))
+                        traceback.print_exc()
+    
     post_view_handler = None
     @staticmethod
     def post_view_callback():
@@ -20,11 +20,19 @@ import bpy
 import bmesh
 
 import time
+import array
+import itertools
+import collections
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 import mathutils
 from mathutils import Color, Vector, Euler, Quaternion, Matrix
 
-from .bpy_inspect import BlEnums
+from .bpy_inspect import BlEnums, BlRna
 
 from .utils_math import lerp, matrix_LRS, matrix_compose, matrix_decompose, matrix_inverted_safe, orthogonal_XYZ, orthogonal, transform_point_normal
 from .utils_python import setattr_cmp, setitem_cmp, AttributeHolder, attrs_to_dict, dict_to_attrs, bools_to_int, binary_search
@@ -302,10 +310,376 @@ class MeshCache:
         
         return tmp_obj
 
+# =============================== MESH ARRAYS ============================== #
+#============================================================================#
+class MeshArrays:
+    """
+    Mesh geometry stored in flat typed arrays (in the same layout
+    as used by foreach_get/foreach_set), for building big meshes
+    without creating a Python object per element.
+    """
+    
+    def __init__(self):
+        self.co = array.array('f')
+        self.normal = array.array('f')
+        self.edge_verts = array.array('i')
+        self.edge_seam = array.array('b')
+        self.edge_sharp = array.array('b')
+        self.loop_verts = array.array('i')
+        self.loop_edges = array.array('i')
+        self.face_loop_start = array.array('i')
+        self.face_loop_total = array.array('i')
+        self.face_material = array.array('i')
+        self.face_smooth = array.array('b')
+    
+    vert_count = property(lambda self: len(self.co) // 3)
+    edge_count = property(lambda self: len(self.edge_seam))
+    loop_count = property(lambda self: len(self.loop_verts))
+    face_count = property(lambda self: len(self.face_smooth))
+    
+    @property
+    def nbytes(self):
+        return sum(len(buf) * buf.itemsize for buf in self._buffers())
+    
+    def _buffers(self):
+        return (self.co, self.normal, self.edge_verts, self.edge_seam, self.edge_sharp,
+            self.loop_verts, self.loop_edges, self.face_loop_start, self.face_loop_total,
+            self.face_material, self.face_smooth)
+    
+    def vert_co(self, i):
+        return Vector(self.co[i*3:i*3+3])
+    
+    def vert_normal(self, i):
+        return Vector(self.normal[i*3:i*3+3])
+    
+    @staticmethod
+    def _get(items, attr, typecode, n):
+        buf = array.array(typecode, [0]) * n
+        items.foreach_get(attr, buf)
+        return buf
+    
+    @staticmethod
+    def _offset(buf, offset):
+        return (buf if offset == 0 else array.array(buf.typecode, [i + offset for i in buf]))
+    
+    def extend_from_mesh(self, mesh):
+        """Append the geometry of a Mesh datablock (using bulk foreach_get)"""
+        nv, ne, nl, nf = len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons)
+        v0, e0, l0 = self.vert_count, self.edge_count, self.loop_count
+        
+        self.co.extend(self._get(mesh.vertices, "co", 'f', nv*3))
+        self.normal.extend(self._get(mesh.vertices, "normal", 'f', nv*3))
+        
+        self.edge_verts.extend(self._offset(self._get(mesh.edges, "vertices", 'i', ne*2), v0))
+        self.edge_seam.extend(self._get(mesh.edges, "use_seam", 'b', ne))
+        self.edge_sharp.extend(self._get(mesh.edges, "use_edge_sharp", 'b', ne))
+        
+        self.loop_verts.extend(self._offset(self._get(mesh.loops, "vertex_index", 'i', nl), v0))
+        self.loop_edges.extend(self._offset(self._get(mesh.loops, "edge_index", 'i', nl), e0))
+        
+        self.face_loop_start.extend(self._offset(self._get(mesh.polygons, "loop_start", 'i', nf), l0))
+        self.face_loop_total.extend(self._get(mesh.polygons, "loop_total", 'i', nf))
+        self.face_material.extend(self._get(mesh.polygons, "material_index", 'i', nf))
+        self.face_smooth.extend(self._get(mesh.polygons, "use_smooth", 'b', nf))
+    
+    @staticmethod
+    def _cofactor(matrix):
+        # Same as transform_point_normal() with as_plane=True: normals are
+        # transformed by the cofactor matrix (det * inverse transpose),
+        # which also stays valid for degenerate matrices
+        a0, a1, a2 = (Vector(c[:3]) for c in matrix.col[:3])
+        return Matrix((a1.cross(a2), a2.cross(a0), a0.cross(a1))).transposed()
+    
+    def extend(self, other, matrix=None, normal_basis=None):
+        """
+        Append another MeshArrays (optionally transformed by a 4x4 matrix;
+        normals are transformed by normal_basis, if specified, or by matrix)
+        """
+        v0, e0, l0 = self.vert_count, self.edge_count, self.loop_count
+        
+        if matrix is None:
+            self.co.extend(other.co)
+            self.normal.extend(other.normal)
+        else:
+            n3 = self._cofactor(matrix if normal_basis is None else normal_basis)
+            self.co.extend(self._transform(other.co, matrix.to_3x3(), matrix.translation, False))
+            self.normal.extend(self._transform(other.normal, n3, None, True))
+        
+        self.edge_verts.extend(self._offset(other.edge_verts, v0))
+        self.edge_seam.extend(other.edge_seam)
+        self.edge_sharp.extend(other.edge_sharp)
+        
+        self.loop_verts.extend(self._offset(other.loop_verts, v0))
+        self.loop_edges.extend(self._offset(other.loop_edges, e0))
+        
+        self.face_loop_start.extend(self._offset(other.face_loop_start, l0))
+        self.face_loop_total.extend(other.face_loop_total)
+        self.face_material.extend(other.face_material)
+        self.face_smooth.extend(other.face_smooth)
+    
+    def extend_instances(self, template, matrices, normal_bases=None, material_indices=None):
+        """
+        Append a transformed copy of the template MeshArrays for each matrix
+        (with NumPy, all instances are transformed in one batch)
+        """
+        count = len(matrices)
+        if count == 0: return
+        if normal_bases is None: normal_bases = matrices
+        
+        if not numpy:
+            for i in range(count):
+                nf0 = self.face_count
+                self.extend(template, matrices[i], normal_bases[i])
+                if material_indices is not None:
+                    self.face_material[nf0:] = array.array('i', [material_indices[i]]) * template.face_count
+            return
+        
+        v0, e0, l0 = self.vert_count, self.edge_count, self.loop_count
+        nv, ne, nl, nf = template.vert_count, template.edge_count, template.loop_count, template.face_count
+        
+        M = numpy.array([[tuple(row) for row in m] for m in matrices], dtype=numpy.float64)
+        B = numpy.array([[tuple(row) for row in m] for m in normal_bases], dtype=numpy.float64)
+        a0, a1, a2 = B[:, :3, 0], B[:, :3, 1], B[:, :3, 2]
+        C = numpy.stack((numpy.cross(a1, a2), numpy.cross(a2, a0), numpy.cross(a0, a1)), axis=2)
+        
+        co = numpy.frombuffer(template.co, dtype=numpy.float32).reshape(-1, 3)
+        co = numpy.einsum('nij,vj->nvi', M[:, :3, :3], co) + M[:, None, :3, 3]
+        normal = numpy.frombuffer(template.normal, dtype=numpy.float32).reshape(-1, 3)
+        normal = numpy.einsum('nij,vj->nvi', C, normal)
+        lengths = numpy.sqrt((normal * normal).sum(axis=2))
+        lengths[lengths == 0.0] = 1.0
+        normal /= lengths[:, :, None]
+        
+        def tiled(buf, typecode, step=0, offset=0):
+            dtype = numpy.dtype(typecode)
+            src = numpy.frombuffer(buf, dtype=dtype) if len(buf) else numpy.zeros(0, dtype)
+            dst = src[None, :] + (numpy.arange(count) * step + offset)[:, None]
+            return array.array(typecode, dst.astype(dtype).tobytes())
+        
+        self.co.extend(array.array('f', co.astype(numpy.float32).tobytes()))
+        self.normal.extend(array.array('f', normal.astype(numpy.float32).tobytes()))
+        
+        self.edge_verts.extend(tiled(template.edge_verts, 'i', nv, v0))
+        self.edge_seam.extend(template.edge_seam * count)
+        self.edge_sharp.extend(template.edge_sharp * count)
+        
+        self.loop_verts.extend(tiled(template.loop_verts, 'i', nv, v0))
+        self.loop_edges.extend(tiled(template.loop_edges, 'i', ne, e0))
+        
+        self.face_loop_start.extend(tiled(template.face_loop_start, 'i', nl, l0))
+        self.face_loop_total.extend(template.face_loop_total * count)
+        if material_indices is None:
+            self.face_material.extend(template.face_material * count)
+        else:
+            self.face_material.extend(array.array('i', (i for i in material_indices for j in range(nf))))
+        self.face_smooth.extend(template.face_smooth * count)
+    
+    @staticmethod
+    def _transform(buf, m3, t, normalize):
+        if numpy:
+            src = numpy.frombuffer(buf, dtype=numpy.float32).reshape(-1, 3)
+            dst = src.dot(numpy.array(m3, dtype=numpy.float64).T)
+            if t is not None: dst += tuple(t)
+            if normalize:
+                lengths = numpy.sqrt((dst * dst).sum(axis=1))
+                lengths[lengths == 0.0] = 1.0
+                dst /= lengths[:, None]
+            return array.array('f', dst.astype(numpy.float32).tobytes())
+        
+        (m00, m01, m02), (m10, m11, m12), (m20, m21, m22) = m3
+        tx, ty, tz = (t if t is not None else (0.0, 0.0, 0.0))
+        dst = array.array('f', buf)
+        for i in range(0, len(dst), 3):
+            x, y, z = buf[i], buf[i+1], buf[i+2]
+            x, y, z = (m00*x + m01*y + m02*z + tx, m10*x + m11*y + m12*z + ty, m20*x + m21*y + m22*z + tz)
+            if normalize:
+                length = (x*x + y*y + z*z) ** 0.5
+                if length > 0.0: x, y, z = x/length, y/length, z/length
+            dst[i], dst[i+1], dst[i+2] = x, y, z
+        return dst
+    
+    def extend_from_bmesh(self, bm, tmp_mesh):
+        """Append the geometry of a BMesh (tmp_mesh is used as an intermediate storage)"""
+        bm.to_mesh(tmp_mesh)
+        self.extend_from_mesh(tmp_mesh)
+    
+    def to_mesh(self, mesh):
+        """Write the geometry into an empty Mesh datablock"""
+        mesh.vertices.add(self.vert_count)
+        mesh.vertices.foreach_set("co", self.co)
+        
+        mesh.edges.add(self.edge_count)
+        mesh.edges.foreach_set("vertices", self.edge_verts)
+        mesh.edges.foreach_set("use_seam", self.edge_seam)
+        mesh.edges.foreach_set("use_edge_sharp", self.edge_sharp)
+        
+        mesh.loops.add(self.loop_count)
+        mesh.loops.foreach_set("vertex_index", self.loop_verts)
+        mesh.loops.foreach_set("edge_index", self.loop_edges)
+        
+        mesh.polygons.add(self.face_count)
+        mesh.polygons.foreach_set("loop_start", self.face_loop_start)
+        mesh.polygons.foreach_set("loop_total", self.face_loop_total)
+        mesh.polygons.foreach_set("material_index", self.face_material)
+        mesh.polygons.foreach_set("use_smooth", self.face_smooth)
+        
+        mesh.update()
+        
+        # Normals of loose vertices are not calculated by Blender
+        mesh.vertices.foreach_set("normal", self.normal)
+
+def _make_bbox_template(bbox_mode):
+    # 8 corners (index = x + 2*y + 4*z), then the centers of box/faces/edges
+    points = [(x, y, z) for z in (-1, 1) for y in (-1, 1) for x in (-1, 1)]
+    points.extend([(0,0,0), (+1,0,0), (-1,0,0), (0,+1,0), (0,-1,0), (0,0,+1), (0,0,-1),
+        (-1,-1,0), (-1,+1,0), (+1,-1,0), (+1,+1,0), (-1,0,-1), (-1,0,+1), (+1,0,-1), (+1,0,+1),
+        (0,-1,-1), (0,-1,+1), (0,+1,-1), (0,+1,+1)])
+    
+    template = MeshArrays()
+    for p in points:
+        n = Vector(p).normalized()
+        if n.length_squared < 0.5: n = Vector((0,0,1))
+        template.co.extend(p)
+        template.normal.extend(n)
+    
+    if bbox_mode in ('EDGES', 'FACES'):
+        edges = [(0,1), (0,2), (0,4), (7,6), (7,5), (7,3), (1,5), (2,6), (4,5), (4,6), (1,3), (2,3)]
+        for edge in edges:
+            template.edge_verts.extend(edge)
+        template.edge_seam.extend([0] * len(edges))
+        template.edge_sharp.extend([0] * len(edges))
+        
+        if bbox_mode == 'FACES':
+            edge_map = {frozenset(edge): i for i, edge in enumerate(edges)}
+            faces = [(0,2,3,1), (4,5,7,6), (0,1,5,4), (2,6,7,3), (0,4,6,2), (1,3,7,5)]
+            for face in faces:
+                template.face_loop_start.append(len(template.loop_verts))
+                template.face_loop_total.append(len(face))
+                template.face_material.append(0)
+                template.face_smooth.append(0)
+                for i, v in enumerate(face):
+                    template.loop_verts.append(v)
+                    template.loop_edges.append(edge_map[frozenset((v, face[(i+1) % len(face)]))])
+    
+    return template
+
+# ============================= MESH BAKE CACHE ============================ #
+#============================================================================#
+class MeshBakeCache:
+    """
+    LRU storage of per-object MeshBaker results (MeshArrays in object's
+    local space), limited by the total size of the arrays in bytes.
+    """
+    
+    def __init__(self, budget=64*1024*1024):
+        self.budget = budget
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, key, value, size):
+        self.discard(key)
+        if size > self.budget: return
+        self._entries[key] = (value, size)
+        self.size += size
+        while self.size > self.budget:
+            old_key, (old_value, old_size) = self._entries.popitem(last=False)
+            self.size -= old_size
+    
+    def discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None: self.size -= entry[1]
+    
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+    
+    @classmethod
+    def rna_signature(cls, struct, visited):
+        """RNA properties of the struct; referenced objects are represented by their state"""
+        items = []
+        for name, rna_prop in BlRna.properties(struct):
+            value = getattr(struct, name)
+            if isinstance(value, bpy.types.Object):
+                items.append(cls.object_signature(value, visited))
+            elif isinstance(value, bpy.types.Texture):
+                items.append((value.as_pointer(), BlRna.signature(value, depth=0)))
+            elif isinstance(value, bpy.types.ID):
+                items.append(value.as_pointer()) # e.g. images: pixels are too expensive to hash
+            else:
+                items.append(BlRna.signature_prop(rna_prop, value, 0))
+        return tuple(items)
+    
+    @classmethod
+    def object_signature(cls, obj, visited):
+        """Transform, pose, data and modifiers of an object that another object depends on"""
+        if obj in visited: return obj.as_pointer() # dependency cycle, or already included
+        visited.add(obj)
+        pose = (tuple(tuple(map(tuple, pose_bone.matrix)) for pose_bone in obj.pose.bones) if obj.pose else None)
+        return (obj.as_pointer(), obj.type, tuple(map(tuple, obj.matrix_world)), pose,
+            cls.data_signature(obj.data, visited), cls.modifiers_signature(obj, visited))
+    
+    @classmethod
+    def modifiers_signature(cls, obj, visited=None):
+        if visited is None: visited = {obj}
+        return tuple(cls.rna_signature(md, visited) for md in obj.modifiers)
+    
+    @staticmethod
+    def _foreach_hash(items, attr, size):
+        values = array.array('f', [0.0]) * (len(items) * size)
+        items.foreach_get(attr, values)
+        return hash(values.tobytes())
+    
+    @classmethod
+    def data_signature(cls, data, visited=None):
+        if data is None: return None
+        if visited is None: visited = set()
+        
+        # Object-mode edits don't change the pointer, so hash the coordinates too
+        # (foreach_get is much cheaper than the actual baking)
+        if isinstance(data, bpy.types.Mesh):
+            return (len(data.edges), len(data.polygons), cls._foreach_hash(data.vertices, "co", 3))
+        
+        # Settings (bevel, extrude, text body, etc.) and referenced objects (bevel/taper)
+        signature = [cls.rna_signature(data, visited)]
+        
+        if isinstance(data, bpy.types.Curve):
+            for spline in data.splines:
+                points = spline.bezier_points
+                if len(points) != 0:
+                    signature.append((BlRna.signature(spline, depth=0), cls._foreach_hash(points, "co", 3),
+                        cls._foreach_hash(points, "handle_left", 3), cls._foreach_hash(points, "handle_right", 3),
+                        cls._foreach_hash(points, "radius", 1), cls._foreach_hash(points, "tilt", 1)))
+                else:
+                    points = spline.points
+                    signature.append((BlRna.signature(spline, depth=0), cls._foreach_hash(points, "co", 4),
+                        cls._foreach_hash(points, "radius", 1), cls._foreach_hash(points, "tilt", 1)))
+        elif isinstance(data, bpy.types.MetaBall):
+            signature.extend(BlRna.signature(element, depth=0) for element in data.elements)
+        elif isinstance(data, bpy.types.Lattice):
+            signature.append(cls._foreach_hash(data.points, "co_deform", 3))
+        elif isinstance(data, bpy.types.Armature):
+            signature.extend(tuple(map(tuple, bone.matrix_local)) for bone in data.bones)
+        
+        return tuple(signature)
+
 # =============================== MESH BAKER =============================== #
 #============================================================================#
 class MeshBaker:
-    def __init__(self, scene, include=None, exclude=None, obj_types=None, edit=False, selection=True, geometry='DEFAULT', origins='DEFAULT', bbox='NONE', dupli=True, solid_only=False, matrix=None, auto_clear=False, collect_materials=False, remove_doubles=None):
+    def __init__(self, scene, include=None, exclude=None, obj_types=None, edit=False, selection=True, geometry='DEFAULT', origins='DEFAULT', bbox='NONE', dupli=True, solid_only=False, matrix=None, auto_clear=False, collect_materials=False, remove_doubles=None, backend='BMESH', cache=None):
         self.scene = scene
         self.mode = BlEnums.mode_from_object(scene.objects.active)
         self.edit = edit # whether to add object geometry in editmode
@@ -320,7 +694,16 @@ class MeshBaker:
         self.auto_clear = auto_clear
         self.collect_materials = collect_materials
         self.remove_doubles = remove_doubles
-        self.bm = bmesh.new()
+        # 'BMESH': elements are copied into a BMesh one by one
+        # 'ARRAYS': geometry is accumulated in MeshArrays
+        self.backend = backend
+        self.bm = (bmesh.new() if backend == 'BMESH' else None)
+        self.arrays = (MeshArrays() if backend == 'ARRAYS' else None)
+        # MeshBakeCache shared between bakes (only used by the 'ARRAYS' backend)
+        self.cache = (cache if backend == 'ARRAYS' else None)
+        self._tmp_mesh = None
+        self._bbox_template = None
+        self._bbox_instances = []
         self._mesh = None
         self._obj = None
         self._vert_to_obj = []
@@ -328,6 +711,7 @@ class MeshBaker:
         self._face_to_obj = []
         self._materials_dict = {}
         self._materials_list = []
+        self.pick_grid = None # used by SmartView3D.snap_cast()
         
         self.obj_types = obj_types
         self.objects = set(include or (obj for obj in scene.objects if obj.is_visible(scene)))
@@ -344,7 +728,10 @@ class MeshBaker:
         if self._mesh: return self._mesh
         if self.counter < len(self.objects): return None
         self._mesh = bpy.data.meshes.new("BakedMesh")
-        self.bm.to_mesh(self._mesh)
+        if self.arrays is not None:
+            self.arrays.to_mesh(self._mesh)
+        else:
+            self.bm.to_mesh(self._mesh)
         #self._mesh.update(calc_tessface=True) # calc_tessface() # is this necessary?
         if self._materials_list:
             materials = self._mesh.materials
@@ -370,6 +757,24 @@ class MeshBaker:
             self.forget_results()
         return obj
     
+    @property
+    def vert_count(self):
+        if self.arrays is not None: return self.arrays.vert_count
+        return (len(self.bm.verts) if self.bm else 0)
+    
+    def vert_co(self, i):
+        if self.arrays is not None: return self.arrays.vert_co(i)
+        return Vector(self.bm.verts[i].co)
+    
+    def vert_normal(self, i):
+        if self.arrays is not None: return self.arrays.vert_normal(i)
+        return Vector(self.bm.verts[i].normal)
+    
+    def _elem_counts(self):
+        if self.arrays is not None:
+            return self.arrays.vert_count, self.arrays.edge_count, self.arrays.face_count
+        return len(self.bm.verts), len(self.bm.edges), len(self.bm.faces)
+    
     @staticmethod
     def _index_cmp(item, i):
         if i < item[0]: return 1
@@ -427,7 +832,10 @@ class MeshBaker:
             bpy.data.meshes.remove(self._mesh)
         self._mesh = None
         
+        self._delete_tmp_mesh()
         self._delete_bm()
+        self.arrays = None
+        self.pick_grid = None
     
     def update(self, dt=None):
         use_dt = (dt is not None)
@@ -441,12 +849,37 @@ class MeshBaker:
             if use_dt and (time.clock() > time_stop): return
     
     def _on_finish(self):
+        if self.arrays is not None:
+            if isinstance(self.remove_doubles, (float, int)): # this will invalidate indices
+                self._delete_tmp_mesh() # to_mesh() expects an empty mesh
+                tmp_mesh = self._get_tmp_mesh()
+                self.arrays.to_mesh(tmp_mesh)
+                bm = bmesh.new()
+                bm.from_mesh(tmp_mesh)
+                bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=self.remove_doubles)
+                self.arrays = MeshArrays()
+                self.arrays.extend_from_bmesh(bm, tmp_mesh)
+                bm.free()
+            self._delete_tmp_mesh()
+            return
+        
         if isinstance(self.remove_doubles, (float, int)): # this will invalidate indices
             bmesh.ops.remove_doubles(self.bm, verts=self.bm.verts, dist=self.remove_doubles)
         else:
             self.bm.verts.index_update()
             self.bm.edges.index_update()
             self.bm.faces.index_update()
+        if hasattr(self.bm.verts, "ensure_lookup_table"): self.bm.verts.ensure_lookup_table()
+    
+    def _get_tmp_mesh(self):
+        if not (self._tmp_mesh and self._tmp_mesh.name):
+            self._tmp_mesh = bpy.data.meshes.new("BakedMeshTmp")
+        return self._tmp_mesh
+    
+    def _delete_tmp_mesh(self):
+        if self._tmp_mesh and self._tmp_mesh.name:
+            bpy.data.meshes.remove(self._tmp_mesh)
+        self._tmp_mesh = None
     
     def _delete_bm(self):
         if self.bm and self.bm.is_valid:
@@ -457,6 +890,11 @@ class MeshBaker:
         if self.auto_clear: self.cleanup()
     
     def _merge(self, bm_copy):
+        if self.arrays is not None:
+            # No Python objects per element; BMesh -> Mesh -> arrays are all bulk operations
+            self.arrays.extend_from_bmesh(bm_copy, self._get_tmp_mesh())
+            return
+        
         # As of 2.75, the "dest" argument does not work yet
         #geom = bm_copy.verts[:] + bm_copy.edges[:] + bm_copy.faces[:]
         #bmesh.ops.duplicate(bm_copy, geom=geom, dest=self.bm, use_select_history=False)
@@ -498,7 +936,8 @@ class MeshBaker:
         return bm_copy
     
     def _add_sub_obj(self, obj, matrix_world, vert_offsets, edge_offsets):
-        if isinstance(obj, bpy.types.DupliObject):
+        is_dupli = isinstance(obj, bpy.types.DupliObject)
+        if is_dupli:
             if obj.hide: return
             main_obj = obj.id_data
             matrix_world = obj.matrix
@@ -637,7 +1076,13 @@ class MeshBaker:
             if add_origin: self._add_origin(bm_copy, matrix)
             
             add_bbox = bbox_mode and (bbox_mode != 'NONE')
-            if add_bbox: self._add_bbox(bm_copy, bbox_mode, bbox, matrix)
+            if add_bbox:
+                if self.arrays is not None:
+                    # Deferred: bboxes of the object and all its duplis are added in one batch
+                    material_id = (material_id_map.get(0, default_material_id) if material_id_map else 0)
+                    self._bbox_instances.append((matrix, bbox, material_id))
+                else:
+                    self._add_bbox(bm_copy, bbox_mode, bbox, matrix)
             
             if len(verts) > 0:
                 if material_id_map:
@@ -657,6 +1102,8 @@ class MeshBaker:
                     self._add_sub_obj(dupli, matrix_world, vert_offsets, edge_offsets)
                 obj.dupli_list_clear()
         
+        if not is_dupli: self._flush_bboxes()
+        
         return bbox
     
     def _add_origin(self, bm_copy, matrix):
@@ -666,6 +1113,27 @@ class MeshBaker:
         n = transform_point_normal(matrix, v.co, n)[1] # normals of loose vertices are not transformed by bmesh.transform
         v.normal = n
     
+    def _flush_bboxes(self):
+        instances = self._bbox_instances
+        if not instances: return
+        self._bbox_instances = []
+        
+        if self._bbox_template is None:
+            self._bbox_template = _make_bbox_template(self.bbox_mode)
+        
+        matrices = []
+        for matrix, bbox, material_id in instances:
+            bbox_center = (bbox[1] + bbox[0]) * 0.5
+            bbox_extents = (bbox[1] - bbox[0]) * 0.5
+            bbox_matrix = matrix_compose(bbox_extents.x, bbox_extents.y, bbox_extents.z, bbox_center)
+            matrices.append(matrix * bbox_matrix)
+        
+        # Normals of bbox vertices don't depend on the bbox extents
+        normal_bases = [instance[0] for instance in instances]
+        material_indices = [instance[2] for instance in instances]
+        
+        self.arrays.extend_instances(self._bbox_template, matrices, normal_bases, material_indices)
+    
     def _add_bbox(self, bm_copy, bbox_mode, bbox, matrix):
         verts = bm_copy.verts
         edges = bm_copy.edges
@@ -728,20 +1196,71 @@ class MeshBaker:
         add_bbox_vert(0,+1,-1)#verts.new(bbox_center+bbox_y-bbox_z)
         add_bbox_vert(0,+1,+1)#verts.new(bbox_center+bbox_y+bbox_z)
     
+    def _cache_key(self, obj):
+        if self.cache is None: return None
+        # Edit/sculpt/etc. modes have their own (selection-dependent) geometry,
+        # armature and material contributions depend on the state of this baker
+        if obj.mode != 'OBJECT': return None
+        if obj.type == 'ARMATURE': return None
+        if self.collect_materials: return None
+        
+        matrix_world = obj.matrix_world
+        if abs(matrix_world.to_3x3().determinant()) < 1e-12: return None
+        
+        data = obj.data
+        scene = self.scene
+        
+        # Animation/shape keys/particles may change the geometry on each frame
+        animated = bool(obj.animation_data or obj.particle_systems or
+            getattr(data, "shape_keys", None) or getattr(data, "animation_data", None))
+        
+        # Dupli placement is not relative to the parent for all dupli types
+        dupli_type = (obj.dupli_type if self.dupli_mode else 'NONE')
+        dupli_group = (obj.dupli_group if dupli_type == 'GROUP' else None)
+        dupli_key = (dupli_type, (dupli_group.as_pointer() if dupli_group else 0))
+        if dupli_type != 'NONE': dupli_key += (tuple(map(tuple, matrix_world)),)
+        
+        # Results of boolean, mirror, array, hook, shrinkwrap, etc. depend on
+        # the owner's transform relative to the referenced objects
+        owner_matrix = (tuple(map(tuple, matrix_world)) if obj.modifiers else None)
+        
+        return (obj.as_pointer(), (data.as_pointer() if data else 0), obj.type,
+            MeshBakeCache.modifiers_signature(obj), MeshBakeCache.data_signature(data),
+            dupli_key, owner_matrix, (scene.frame_current if animated or obj.modifiers else None),
+            self.selection, self.geometry_mode, self.origins_mode, self.bbox_mode,
+            self.dupli_mode, self.solid_only, (frozenset(self.obj_types) if self.obj_types else None))
+    
+    def _add_cached(self, obj, cache_key):
+        entry = self.cache.get(cache_key)
+        if entry is None:
+            # Bake into separate arrays, in the object's local space
+            arrays, matrix_inv = self.arrays, self.matrix_inv
+            self.arrays, self.matrix_inv = MeshArrays(), matrix_inverted_safe(obj.matrix_world)
+            try:
+                bbox = self._add_sub_obj(obj, obj.matrix_world, [], [])
+            finally:
+                local_arrays, self.arrays, self.matrix_inv = self.arrays, arrays, matrix_inv
+            entry = (local_arrays, bbox)
+            self.cache.put(cache_key, entry, local_arrays.nbytes)
+        
+        local_arrays, bbox = entry
+        self.arrays.extend(local_arrays, self.matrix_inv * obj.matrix_world)
+        return bbox
+    
     def _add_obj(self, obj):
         if not (obj and obj.name): return
         
-        nv0 = len(self.bm.verts)
-        ne0 = len(self.bm.edges)
-        nf0 = len(self.bm.faces)
+        nv0, ne0, nf0 = self._elem_counts()
         
         vert_offsets = []
         edge_offsets = []
-        bbox = self._add_sub_obj(obj, obj.matrix_world, vert_offsets, edge_offsets)
+        cache_key = self._cache_key(obj)
+        if cache_key is None:
+            bbox = self._add_sub_obj(obj, obj.matrix_world, vert_offsets, edge_offsets)
+        else:
+            bbox = self._add_cached(obj, cache_key)
         
-        nv1 = len(self.bm.verts)
-        ne1 = len(self.bm.edges)
-        nf1 = len(self.bm.faces)
+        nv1, ne1, nf1 = self._elem_counts()
         
         if nv1 == nv0: return
         
@@ -768,13 +1287,16 @@ class MeshBaker:
 # =============================== SELECTION ================================ #
 #============================================================================#
 class Selection:
-    def __init__(self, context=None, mode=None, elem_types=None, container=set, brute_force_update=False, pose_bones=True, copy_bmesh=False):
+    def __init__(self, context=None, mode=None, elem_types=None, container=set, brute_force_update=False, pose_bones=True, copy_bmesh=False, selected_only=False):
         self.context = context
         self.mode = mode
         self.elem_types = elem_types
         self.brute_force_update = brute_force_update
         self.pose_bones = pose_bones
         self.copy_bmesh = copy_bmesh
+        # If True, walk() skips unselected mesh elements (and reports only
+        # the number of selected ones as total), using the bulk select masks
+        self.selected_only = selected_only
         # In some cases, user might want a hashable type (e.g. frozenset or tuple)
         self.container = container
         # We MUST keep reference to bmesh, or it will be garbage-collected
@@ -870,6 +1392,54 @@ class Selection:
         
         return False
     
+    _mesh_elem_colls = {'VERT':"vertices", 'EDGE':"edges", 'FACE':"polygons"}
+    _bmesh_elem_colls = {'VERT':"verts", 'EDGE':"edges", 'FACE':"faces"}
+    
+    def select_mask(self, elem_type='VERT'):
+        """
+        Returns the select states of all mesh elements of the given type
+        ('VERT', 'EDGE' or 'FACE') as array.array('b'), or None if the
+        current mode is not mesh edit mode. Outside of actual edit mode
+        this is done by a single foreach_get() call.
+        """
+        context, active_obj, actual_mode, mode = self.get_context()
+        if mode != 'EDIT_MESH': return None
+        
+        mesh = active_obj.data
+        if actual_mode == 'EDIT_MESH':
+            bm = self.bmesh
+            if not (bm and bm.is_valid): bm = bmesh.from_edit_mesh(mesh)
+            return self._select_mask(getattr(bm, self._bmesh_elem_colls[elem_type]))
+        return self._select_mask(getattr(mesh, self._mesh_elem_colls[elem_type]))
+    
+    def selected_indices(self, elem_type='VERT'):
+        """
+        Returns the indices of selected mesh elements of the given type
+        as array.array('i'), or None if the current mode is not mesh edit mode
+        """
+        mask = self.select_mask(elem_type)
+        if mask is None: return None
+        return self._mask_to_indices(mask)
+    
+    @staticmethod
+    def _select_mask(items):
+        if isinstance(items, bpy.types.bpy_prop_collection):
+            mask = array.array('b', bytes(len(items)))
+            items.foreach_get("select", mask)
+            return mask
+        return array.array('b', [item.select for item in items]) # BMesh sequences have no bulk access
+    
+    @staticmethod
+    def _mask_to_indices(mask):
+        return array.array('i', itertools.compress(range(len(mask)), mask))
+    
+    @staticmethod
+    def _selected_items(items):
+        if isinstance(items, bpy.types.bpy_prop_collection):
+            indices = Selection._mask_to_indices(Selection._select_mask(items))
+            return [items[i] for i in indices]
+        return [item for item in items if item.select]
+    
     def walk(self):
         """Iterates over selection, returning (history, active, count) first, then (element, selected_attributes) until exhausted"""
         context, active_obj, actual_mode, mode = self.get_context()
@@ -918,6 +1488,9 @@ class Selection:
                 if (not elem_types) or ('VERT' in elem_types):
                     colls.append(bm.verts)
                 
+                if self.selected_only:
+                    colls = [self._selected_items(items) for items in colls]
+                
                 total = sum(len(items) for items in colls)
                 if bm.select_history:
                     yield (list(bm.select_history), item, total)
@@ -941,6 +1514,9 @@ class Selection:
                 if (not elem_types) or ('VERT' in elem_types):
                     colls.append(mesh.vertices)
                 
+                if self.selected_only:
+                    colls = [self._selected_items(items) for items in colls]
+                
                 total = sum(len(items) for items in colls)
                 item = None
                 if mesh.polygons.active >= 0:
@@ -1466,6 +2042,7 @@ def IndividuallyActiveSelected(objects, context=None, make_visble=False):
 class ResumableSelection:
     def __init__(self, *args, **kwargs):
         kwargs["copy_bmesh"] = True # seems like this is REQUIRED to avoid crashes
+        kwargs.setdefault("selected_only", True) # only selected elements are reported anyway
         self.selection = Selection(*args, **kwargs)
         self.selection_walker = None
         self.selection_initialized = False
@@ -1586,9 +2163,11 @@ class ChangeMonitor:
         self.mode = None
         self.active_obj = None
         self.selection_walker = None
-        self.selection_recorded = False
-        self.selection_recorder = []
-        self.selection_record_id = 0
+        self.selection_info = None
+        self.selection_count = 0
+        self.selection_hash = 0
+        self.selection_fingerprint = None
+        self.selection_totals = None
         self.scene_hash = 0
         self.undo_hash = 0
         self.operators_len = 0
@@ -1714,7 +2293,7 @@ class ChangeMonitor:
             # ATTENTION: inside mesh editmode, undo/redo DOES NOT affect
             # the rest of the blender objects, so pointers/hashes don't change.
             if (mode == 'EDIT_MESH') and (self.selection.bmesh is not None):
-                object_updated |= (not self.selection.bmesh.is_valid)
+                self.object_updated |= (not self.selection.bmesh.is_valid)
         
         operators_len = len(wm.operators)
         if (operators_len != self.operators_len):
@@ -1733,9 +2312,11 @@ class ChangeMonitor:
     def reset_selection(self):
         self.selection.bmesh = None
         self.selection_walker = None
-        self.selection_recorded = False
-        self.selection_recorder = []
-        self.selection_record_id = 0
+        self.selection_info = None
+        self.selection_count = 0
+        self.selection_hash = 0
+        self.selection_fingerprint = None
+        self.selection_totals = None
     
     def analyze_selection(self):
         reset_selection = self.mode_changed
@@ -1753,68 +2334,64 @@ class ChangeMonitor:
             # about a potential change of selection.
             self.selection_changed = True
         
+        # Instead of recording the whole selection, only a fingerprint
+        # (count and hash of selected elements) of the last full pass is kept
+        if self.selection.normalized_mode == 'EDIT_MESH':
+            # Walking a big mesh takes many updates, but most changes
+            # of selection can be detected from the selection counts
+            selection_totals = self.mesh_selection_totals()
+            if self.selection_totals != selection_totals:
+                if self.selection_totals is not None:
+                    #print("Selection totals changed")
+                    self.selection_changed = True
+                self.reset_selection()
+                self.selection_totals = selection_totals
+        
         if self.selection_walker is None:
             self.selection.bmesh = None
             self.selection_walker = self.selection.walk()
+            self.selection_info = None
+            self.selection_count = 0
+            self.selection_hash = 0
         
-        clock = time.clock()
+        clock = time.clock
+        time_stop = clock() + self.max_evaluation_time
         hash = self.hash
         
-        if self.selection_recorded:
-            time_stop = clock() + self.max_evaluation_time
-            
-            if self.selection_record_id == 0:
-                item = next(self.selection_walker, None)
-                history, active, total = item
-                item = tuple(hash(h) for h in history), hash(active), total
-                self.selection_record_id = 1
-                if self.selection_recorder[0] != item:
-                    #print("Active/history/total changed")
-                    self.selection_changed = True
-                    self.reset_selection()
-                    return
-            
-            recorded_count = len(self.selection_recorder)
-            for item in self.selection_walker:
-                if item[1]:
-                    item = hash(item[0]), item[1]
-                    i = self.selection_record_id
-                    if (i >= recorded_count) or (self.selection_recorder[i] != item):
-                        #print("More than necessary or selection changed")
-                        self.selection_changed = True
-                        self.reset_selection()
-                        return
-                    self.selection_record_id = i + 1
-                if clock() > time_stop: break
-            else: # the iterator is exhausted
-                if self.selection_record_id < recorded_count:
-                    #print("Less than necessary")
-                    self.selection_changed = True
-                    self.reset_selection()
-                    return
-                self.selection.bmesh = None
-                self.selection_walker = None
-                self.selection_record_id = 0
-        else:
-            time_stop = clock() + self.max_evaluation_time
-            
-            if self.selection_record_id == 0:
-                item = next(self.selection_walker, None)
-                history, active, total = item
-                item = tuple(hash(h) for h in history), hash(active), total
-                self.selection_record_id = 1
-                self.selection_recorder.append(item) # first item is special
-            
-            for item in self.selection_walker:
-                if item[1]:
-                    item = hash(item[0]), item[1]
-                    self.selection_recorder.append(item)
-                if clock() > time_stop: break
-            else: # the iterator is exhausted
-                self.selection.bmesh = None
-                self.selection_walker = None
-                self.selection_recorded = True
-                self.selection_record_id = 0
+        if self.selection_info is None:
+            item = next(self.selection_walker, None)
+            self.selection_info = (self.selection_info_key(*item) if item else ())
+        
+        selection_count = self.selection_count
+        selection_hash = self.selection_hash
+        for item in self.selection_walker:
+            if item[1]:
+                selection_count += 1
+                selection_hash = (selection_hash, hash(item[0]), item[1]).__hash__()
+            if clock() > time_stop: break
+        else: # the iterator is exhausted
+            self.selection.bmesh = None
+            self.selection_walker = None
+            self.compare_fingerprint((self.selection_info, selection_count, selection_hash))
+            return
+        
+        self.selection_count = selection_count
+        self.selection_hash = selection_hash
+    
+    def selection_info_key(self, history, active, total):
+        hash = self.hash
+        return (tuple(hash(h) for h in history), hash(active), total)
+    
+    def mesh_selection_totals(self):
+        context, active_obj, actual_mode, mode = self.selection.get_context()
+        mesh = active_obj.data
+        return (mesh.total_vert_sel, mesh.total_edge_sel, mesh.total_face_sel)
+    
+    def compare_fingerprint(self, fingerprint):
+        if (self.selection_fingerprint is not None) and (self.selection_fingerprint != fingerprint):
+            #print("Selection changed")
+            self.selection_changed = True
+        self.selection_fingerprint = fingerprint
 
 # ============================= BLENDER UTILS ============================== #
 #============================================================================#
@@ -21,6 +21,7 @@ import mathutils
 from mathutils import Color, Vector, Matrix, Quaternion, Euler
 
 import math
+import array
 
 from .utils_math import clamp_angle
 
@@ -77,7 +78,7 @@ class StateRestorator:
 def make_RenderBatch():
     # implementations:
     # None (same as mode, or compatible), LINES, TRIANGLES
-    # also: VBO? DISPLAY_LIST?
+    # retained (see RetainedBatch): DISPLAY_LIST, ARRAYS, IMMEDIATE
     _gl_modes = {
         'POINTS':bgl.GL_POINTS,
         'LINES':bgl.GL_LINES,
@@ -94,6 +95,19 @@ def make_RenderBatch():
     _begin = bgl.glBegin
     _end = bgl.glEnd
     _vertex = bgl.glVertex4d
+    _color = bgl.glColor4f
+    
+    # Not all bgl versions expose vertex arrays or display lists
+    def _bgl_funcs(*names):
+        funcs = tuple(getattr(bgl, name, None) for name in names)
+        return (funcs if all(funcs) else None)
+    _arrays_api = _bgl_funcs("glEnableClientState", "glDisableClientState",
+        "glVertexPointer", "glColorPointer", "glDrawArrays")
+    _lists_api = _bgl_funcs("glGenLists", "glNewList", "glEndList", "glCallList", "glDeleteLists")
+    # Display lists keep the data on the GL side; client-side arrays
+    # are still sent on each draw, but with a single call
+    _retained_implementations = [name for name, api in (('DISPLAY_LIST', _lists_api),
+        ('ARRAYS', _arrays_api), ('IMMEDIATE', True)) if api]
     
     class RenderBatch:
         def __init__(self, mode, implementation=None):
@@ -172,9 +186,121 @@ def make_RenderBatch():
                     angle21 = angle10 + clamp_angle(angle21 - angle10)
                     yield from cls.arc(v1, radius, resolution, angle10, angle21)
     
-    return RenderBatch
+    class RetainedBatch(RenderBatch):
+        """
+        Vertices added within the 'with' block are only recorded into flat arrays;
+        draw() submits them to GL once and then redraws them with a single call
+        until the batch is recorded again or invalidated
+        """
+        implementations = tuple(_retained_implementations)
+        
+        def __init__(self, mode, implementation=None):
+            RenderBatch.__init__(self, mode)
+            
+            if implementation not in ('DISPLAY_LIST', 'ARRAYS', 'IMMEDIATE', None):
+                raise ValueError("Unknown implementation: {}".format(implementation))
+            if implementation not in _retained_implementations:
+                implementation = _retained_implementations[0]
+            self.implementation = implementation
+            
+            self.positions = array.array('f') # x, y, z, w
+            self.colors = array.array('f') # r, g, b, a (empty if no colors were given)
+            self.is_valid = False # whether GL-side data matches the arrays
+            self._current_color = None
+            self._list_id = 0
+            self._buffers = None
+        
+        def __len__(self):
+            return len(self.positions) // 4
+        
+        def begin(self):
+            self.clear()
+        
+        def end(self):
+            self.invalidate()
+        
+        def clear(self):
+            del self.positions[:]
+            del self.colors[:]
+            self._current_color = None
+            self.invalidate()
+        
+        def invalidate(self):
+            self.is_valid = False
+        
+        def vertex(self, x, y, z=0.0, w=1.0):
+            self.positions.extend((x, y, z, w))
+            if self._current_color: self.colors.extend(self._current_color)
+        
+        def color(self, r, g, b, a=1.0):
+            color = (r, g, b, a)
+            # Vertices recorded before the first color get the same color
+            if not self._current_color: self.colors.extend(color * len(self))
+            self._current_color = color
+        
+        def _emit(self):
+            positions = self.positions
+            colors = self.colors
+            _begin(self.mode)
+            if colors:
+                for i in range(0, len(positions), 4):
+                    _color(colors[i], colors[i+1], colors[i+2], colors[i+3])
+                    _vertex(positions[i], positions[i+1], positions[i+2], positions[i+3])
+            else:
+                for i in range(0, len(positions), 4):
+                    _vertex(positions[i], positions[i+1], positions[i+2], positions[i+3])
+            _end()
+        
+        def _upload(self):
+            self._buffers = None
+            if not self.positions: return
+            
+            if self.implementation == 'ARRAYS':
+                def make_buffer(values):
+                    if not values: return None
+                    return bgl.Buffer(bgl.GL_FLOAT, [len(values)], values.tolist())
+                self._buffers = (make_buffer(self.positions), make_buffer(self.colors))
+            elif self.implementation == 'DISPLAY_LIST':
+                gen_lists, new_list, end_list, call_list, delete_lists = _lists_api
+                if not self._list_id: self._list_id = gen_lists(1)
+                new_list(self._list_id, bgl.GL_COMPILE)
+                self._emit()
+                end_list()
+        
+        def draw(self):
+            """Must be called while a GL context is active (e.g. in a draw callback)"""
+            if not self.is_valid:
+                self._upload()
+                self.is_valid = True
+            
+            if not self.positions: return
+            
+            if self.implementation == 'ARRAYS':
+                enable, disable, vertex_pointer, color_pointer, draw_arrays = _arrays_api
+                positions, colors = self._buffers
+                enable(bgl.GL_VERTEX_ARRAY)
+                vertex_pointer(4, bgl.GL_FLOAT, 0, positions)
+                if colors:
+                    enable(bgl.GL_COLOR_ARRAY)
+                    color_pointer(4, bgl.GL_FLOAT, 0, colors)
+                draw_arrays(self.mode, 0, len(self))
+                if colors: disable(bgl.GL_COLOR_ARRAY)
+                disable(bgl.GL_VERTEX_ARRAY)
+            elif self.implementation == 'DISPLAY_LIST':
+                _lists_api[3](self._list_id)
+            else:
+                self._emit()
+        
+        def free(self):
+            """Releases GL-side data (must be called while a GL context is active)"""
+            if self._list_id: _lists_api[4](self._list_id, 1)
+            self._list_id = 0
+            self._buffers = None
+            self.is_valid = False
+    
+    return RenderBatch, RetainedBatch
 
-RenderBatch = make_RenderBatch()
+RenderBatch, RetainedBatch = make_RenderBatch()
 del make_RenderBatch
 
 class CGL:
@@ -189,6 +315,9 @@ class CGL:
     def batch(self, mode):
         return RenderBatch(mode)
     
+    def retained_batch(self, mode, implementation=None):
+        return RetainedBatch(mode, implementation)
+    
     @staticmethod
     def read_zbuffer(xy, wh=(1, 1), centered=False, src=None):
         if isinstance(wh, (int, float)):
@@ -210,18 +339,29 @@ class CGL:
             bgl.glReadPixels(x, y, w, h, bgl.GL_DEPTH_COMPONENT, bgl.GL_FLOAT, zbuf)
         else:
             src, w0, h0 = src
-            template = [0.0] * buf_size
-            for dy in range(h):
-                y0 = min(max(y + dy, 0), h0-1)
-                for dx in range(w):
-                    x0 = min(max(x + dx, 0), w0-1)
-                    i0 = x0 + y0 * w0
-                    i1 = dx + dy * w
-                    template[i1] = src[i0]
-            zbuf = bgl.Buffer(bgl.GL_FLOAT, [buf_size], template)
+            zbuf = bgl.Buffer(bgl.GL_FLOAT, [buf_size], CGL.crop_zbuffer(src, w0, h0, x, y, w, h))
         
         return zbuf
     
+    @staticmethod
+    def crop_zbuffer(src, w0, h0, x, y, w, h):
+        """
+        Copy a w*h rectangle at (x, y) from a row-major w0*h0 buffer
+        into a flat list (out-of-bounds pixels repeat the nearest edge pixel)
+        """
+        # Rows are copied with slicing, only the clamped margins are per-pixel
+        x_start, x_end = min(max(x, 0), w0), min(max(x + w, 0), w0)
+        pad_left = min(max(x_start - x, 0), w)
+        pad_right = w - pad_left - max(x_end - x_start, 0)
+        
+        result = []
+        for dy in range(h):
+            row_start = min(max(y + dy, 0), h0-1) * w0
+            if pad_left: result.extend([src[row_start + min(max(x, 0), w0-1)]] * pad_left)
+            if x_end > x_start: result.extend(src[row_start + x_start:row_start + x_end])
+            if pad_right: result.extend([src[row_start + min(max(x + w - 1, 0), w0-1)]] * pad_right)
+        return result
+    
     @staticmethod
     def polygon_stipple_from_list(L, zeros=False, tile=True):
         if isinstance(L, str):
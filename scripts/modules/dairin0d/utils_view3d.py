@@ -32,6 +32,8 @@ from bpy_extras.view3d_utils import (
 
 import math
 import time
+import array
+import itertools
 
 from .bpy_inspect import BlEnums
 from .utils_math import matrix_LRS, matrix_compose, angle_signed, snap_pixel_vector, lerp, nautical_euler_from_axes, nautical_euler_to_quaternion, orthogonal_in_XY, transform_point_normal, transform_plane, matrix_inverted_safe, line_line_t, line_plane_t, line_sphere_t, clip_primitive, dist_to_segment
@@ -696,13 +698,13 @@ class SmartView3D:
         return a, b
     
     def read_zbuffer(self, xy, wh=(1, 1), centered=False, cached=True, coords='REGION'):
-        cached_zbuf = ZBufferRecorder.buffers.get(self.region)
-        if (not cached) or (cached_zbuf is None):
+        cached_zbuf = (ZBufferRecorder.get(self.region) if cached else None)
+        if cached_zbuf is None:
             xy = self.convert_ui_coord(xy, coords, 'WINDOW', False)
             return cgl.read_zbuffer(xy, wh, centered)
         else:
             xy = self.convert_ui_coord(xy, coords, 'REGION', False)
-            return cgl.read_zbuffer(xy, wh, centered, (cached_zbuf, self.region.width, self.region.height))
+            return cgl.read_zbuffer(xy, wh, centered, cached_zbuf)
     
     def zbuf_to_depth(self, zbuf):
         near, far, origin = self.zbuf_range
@@ -908,8 +910,30 @@ class SmartView3D:
                     d = max(abs(x), abs(y))
                     yield (x, y, d)
     
+    __search_windows = {}
+    def __search_window(self, pattern, radius):
+        """
+        Returns (indices, offsets) of the search pattern within
+        the (2*radius+1)^2 window, in the pattern's order
+        """
+        key = (pattern if isinstance(pattern, str) else tuple(tuple(p) for p in pattern), radius)
+        window = self.__search_windows.get(key)
+        if window is None:
+            w = radius * 2 + 1
+            indices = array.array('i')
+            offsets = []
+            for dxy in self.__search_pattern(pattern):
+                if dxy[2] > radius: break
+                wnd_x = min(max(dxy[0]+radius, 0), w-1)
+                wnd_y = min(max(dxy[1]+radius, 0), w-1)
+                indices.append(wnd_x + wnd_y * w)
+                offsets.append((dxy[0], dxy[1]))
+            window = (indices, offsets)
+            self.__search_windows[key] = window
+        return window
+    
     # success, object, matrix, location, normal
-    def ray_cast(self, xy, radius=0, pattern='RADIAL', coords='REGION'):
+    def ray_cast(self, xy, radius=0, pattern='RADIAL', batched=True, coords='REGION'):
         scene = self.scene
         radius = int(radius)
         search = (radius > 0)
@@ -921,6 +945,19 @@ class SmartView3D:
             ray = self.ray(xy, coords=coords)
             rc = BlUtil.Scene.line_cast(scene, ray[0], ray[1])
             return interpret(rc)
+        elif batched:
+            # Scene can only be cast one ray at a time, but the rays themselves
+            # are affine in screen coordinates (near/far are planes parallel
+            # to the screen), so only 3 of them actually need unprojecting
+            x, y = xy
+            a0, b0 = self.ray((x, y), coords=coords)
+            ax, bx = self.ray((x+1, y), coords=coords)
+            ay, by = self.ray((x, y+1), coords=coords)
+            ax, bx, ay, by = ax - a0, bx - b0, ay - a0, by - b0
+            for dx, dy in self.__search_window(pattern, radius)[1]:
+                rc = BlUtil.Scene.line_cast(scene, a0 + ax*dx + ay*dy, b0 + bx*dx + by*dy)
+                if rc[0]: return interpret(rc)
+            return RaycastResult()
         else:
             x, y = xy
             for dxy in self.__search_pattern(pattern):
@@ -930,8 +967,21 @@ class SmartView3D:
                 if rc[0]: return interpret(rc)
             return RaycastResult()
     
+    def __depth_search(self, zbuf, pattern, radius, search_z):
+        """Returns the index (in pattern order) of the first/nearest valid z in the window, or None"""
+        # Depth (and thus the distance along the view direction) grows with z,
+        # so the nearest point is the one with the smallest z
+        z = zbuf[:]
+        best_k, best_z = None, 1.0
+        for k, i in enumerate(self.__search_window(pattern, radius)[0]):
+            zk = z[i]
+            if (zk < best_z) and (zk >= 0.0):
+                best_k, best_z = k, zk
+                if not search_z: break
+        return best_k
+    
     # success, object, matrix, location, normal
-    def depth_cast(self, xy, radius=0, pattern='RADIAL', search_z=False, cached=True, coords='REGION'):
+    def depth_cast(self, xy, radius=0, pattern='RADIAL', search_z=False, cached=True, batched=True, coords='REGION'):
         xy = self.convert_ui_coord(xy, coords, 'REGION', False)
         
         radius = int(radius)
@@ -952,7 +1002,12 @@ class SmartView3D:
         
         cx, cy = 0, 0
         center = None
-        if search:
+        if search and batched:
+            k = self.__depth_search(zbuf, pattern, radius, search_z)
+            if k is not None:
+                cx, cy = self.__search_window(pattern, radius)[1][k]
+                center = get_pos(cx, cy)
+        elif search:
             view_dir = self.forward
             best_dist = float("inf")
             for dxy in self.__search_pattern(pattern):
@@ -1005,9 +1060,10 @@ class SmartView3D:
         mesh_baker = kwargs.get("mesh_baker", None)
         loose = kwargs.get("loose", True)
         midpoints = kwargs.get("midpoints", False)
+        pick_loose = kwargs.get("pick_loose", 'GRID') # 'GRID' (ScreenPickGrid) or 'SELECT' (view3d.select in editmode)
         
-        # in local view only OBJECT mode is allowed, and "snap to loose" requires editmode
-        loose = loose and (self.space_data.local_view is None)
+        # in local view only OBJECT mode is allowed, and "snap to loose" via selection requires editmode
+        if pick_loose == 'SELECT': loose = loose and (self.space_data.local_view is None)
         
         snap_depth = ('DEPTH' in snaps)
         if snap_depth: snaps.discard('DEPTH')
@@ -1112,7 +1168,45 @@ class SmartView3D:
                     
                     result.elem_points_normals = points_normals
             
-            if snaps and loose: # VERT or EDGE
+            if snaps and loose and (pick_loose == 'GRID'): # VERT or EDGE
+                region = self.region
+                persmat = self.region_data.perspective_matrix
+                mesh = baked_obj.data
+                
+                # The grid is rebuilt only when the view changes
+                grid = mesh_baker.pick_grid
+                if not (grid and grid.matches(mesh, m, persmat, region.width, region.height)):
+                    grid = ScreenPickGrid(mesh, m, persmat, region.width, region.height, vert_edge_max_dist, grid)
+                    mesh_baker.pick_grid = grid
+                
+                region_xy = self.convert_ui_coord(xy, coords, 'REGION')
+                
+                accept = None
+                if result_f:
+                    # elements behind the face under the mouse are occluded
+                    def accept(points_normals):
+                        return any((mathutils.geometry.distance_point_to_plane(
+                            p, result_f.location, result_f.normal) > -1e-6) for p, n in points_normals)
+                
+                if 'EDGE' in snaps:
+                    index, dist = grid.nearest_edge(region_xy, vert_edge_max_dist, accept)
+                    result = RaycastResult(index is not None)
+                    if result:
+                        result.elem_index = index
+                        result.elem_points_normals = grid.edge_points_normals(index)
+                    result.type = 'EDGE'
+                    result.dist = float("nan")
+                    result_e = result
+                if 'VERT' in snaps:
+                    index, dist = grid.nearest_vert(region_xy, vert_edge_max_dist, accept)
+                    result = RaycastResult(index is not None)
+                    if result:
+                        result.elem_index = index
+                        result.elem_points_normals = grid.vert_points_normals(index)
+                    result.type = 'VERT'
+                    result.dist = float("nan")
+                    result_v = result
+            elif snaps and loose: # VERT or EDGE
                 edit_preferences = bpy.context.user_preferences.edit
                 global_undo = edit_preferences.use_global_undo
                 
@@ -1331,6 +1425,301 @@ class RaycastResult:
         elem_type = (type(self.elem) if self.elem else None)
         return "({}, {}, {}, {})".format(repr(obj_name), elem_type, self.location, self.normal)
 
+#============================================================================#
+class PointOctree:
+    """
+    World-space octree of points (given as a flat x,y,z sequence), for
+    finding the points that project within some pixel radius of a region
+    coordinate. Unlike a KDTree of projected points, it does not depend on
+    the view, so it doesn't need rebuilding when the view changes.
+    Nodes are subdivided lazily, when a query reaches them.
+    """
+    leaf_size = 32
+    max_depth = 16 # protects from endless subdivision of coincident points
+    
+    def __init__(self, co):
+        self.co = co
+        self.root = self._make_node(array.array('i', range(len(co) // 3)), 0)
+    
+    def _make_node(self, indices, depth):
+        co = self.co
+        if indices:
+            xs = [co[i*3] for i in indices]
+            ys = [co[i*3+1] for i in indices]
+            zs = [co[i*3+2] for i in indices]
+            corners = ((min(xs), min(ys), min(zs)), (max(xs), max(ys), max(zs)))
+        else:
+            corners = ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+        # [corners, indices, children, depth]
+        return [corners, indices, None, depth]
+    
+    def _split(self, node):
+        (x0, y0, z0), (x1, y1, z1) = node[0]
+        cx, cy, cz = (x0 + x1) * 0.5, (y0 + y1) * 0.5, (z0 + z1) * 0.5
+        co = self.co
+        octants = [array.array('i') for i in range(8)]
+        for i in node[1]:
+            i3 = i*3
+            octant = (co[i3] > cx) | ((co[i3+1] > cy) << 1) | ((co[i3+2] > cz) << 2)
+            octants[octant].append(i)
+        depth = node[3] + 1
+        node[2] = [self._make_node(indices, depth) for indices in octants if indices]
+        node[1] = None
+    
+    def find_projected(self, persmat, width, height, xy, radius):
+        """
+        Yields (index, region_xy, pixel_distance) of the points within
+        radius of xy (same projection as location_3d_to_region_2d())
+        """
+        (m00, m01, m02, m03), (m10, m11, m12, m13), _, (m30, m31, m32, m33) = (tuple(row) for row in persmat)
+        half_w, half_h = width * 0.5, height * 0.5
+        mx, my = xy[0], xy[1]
+        radius_sq = radius * radius
+        co = self.co
+        leaf_size, max_depth = self.leaf_size, self.max_depth
+        
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            
+            # Reject nodes which are entirely behind the viewer or
+            # whose projected bounding box is too far from xy
+            # (when the box crosses the w=0 plane, it can't be rejected)
+            (x0, y0, z0), (x1, y1, z1) = node[0]
+            n_behind = 0
+            px_min, py_min, px_max, py_max = float("inf"), float("inf"), -float("inf"), -float("inf")
+            for x, y, z in ((x0, y0, z0), (x1, y0, z0), (x0, y1, z0), (x1, y1, z0),
+                            (x0, y0, z1), (x1, y0, z1), (x0, y1, z1), (x1, y1, z1)):
+                w = m30*x + m31*y + m32*z + m33
+                if w <= 0.0:
+                    n_behind += 1
+                    continue
+                px = half_w + half_w * (m00*x + m01*y + m02*z + m03) / w
+                py = half_h + half_h * (m10*x + m11*y + m12*z + m13) / w
+                px_min, px_max = min(px_min, px), max(px_max, px)
+                py_min, py_max = min(py_min, py), max(py_max, py)
+            if n_behind == 8: continue
+            if n_behind == 0:
+                if (mx < px_min - radius) or (mx > px_max + radius): continue
+                if (my < py_min - radius) or (my > py_max + radius): continue
+            
+            indices = node[1]
+            if (indices is not None) and (len(indices) > leaf_size) and (node[3] < max_depth):
+                self._split(node)
+                indices = None
+            
+            if indices is None:
+                stack.extend(node[2])
+                continue
+            
+            for i in indices:
+                i3 = i*3
+                x, y, z = co[i3], co[i3+1], co[i3+2]
+                w = m30*x + m31*y + m32*z + m33
+                if w <= 0.0: continue
+                px = half_w + half_w * (m00*x + m01*y + m02*z + m03) / w
+                py = half_h + half_h * (m10*x + m11*y + m12*z + m13) / w
+                dist_sq = (px - mx)**2 + (py - my)**2
+                if dist_sq <= radius_sq: yield (i, (px, py), math.sqrt(dist_sq))
+
+class ScreenPickGrid:
+    """
+    Vertices and edges of a mesh, projected to a region and bucketed
+    into a screen-space grid, for picking the nearest element under
+    the mouse without the edit-mode round-trip of view3d.select.
+    Valid only for the view it was built for (see matches()).
+    """
+    cell_size = 16
+    max_edge_cells = 64 # longer edges are kept in a list checked by every query
+    w_min = 1e-6 # edges crossing the w=0 plane are clipped here
+    
+    def __init__(self, mesh, matrix, persmat, width, height, margin=0.0, prev=None):
+        if prev and (prev.mesh == mesh):
+            self.mesh_data = prev.mesh_data
+        else:
+            self.mesh_data = self._read_mesh(mesh)
+        self.mesh = mesh
+        self.matrix = Matrix(matrix)
+        self.view_key = self._view_key(matrix, persmat, width, height)
+        self.verts_xy = {}
+        self.edges_xy = {}
+        self.vert_cells = {}
+        self.edge_cells = {}
+        self.long_edges = []
+        self._project(persmat * self.matrix, width, height, margin)
+    
+    @staticmethod
+    def _view_key(matrix, persmat, width, height):
+        return (tuple(tuple(row) for row in matrix), tuple(tuple(row) for row in persmat), width, height)
+    
+    def matches(self, mesh, matrix, persmat, width, height):
+        return (self.mesh == mesh) and (self.view_key == self._view_key(matrix, persmat, width, height))
+    
+    @staticmethod
+    def _get(items, attr, typecode, n):
+        buf = array.array(typecode, [0]) * n
+        items.foreach_get(attr, buf)
+        return buf
+    
+    def _read_mesh(self, mesh):
+        nv, ne, nl, nf = len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons)
+        return dict(
+            co = self._get(mesh.vertices, "co", 'f', nv*3),
+            normal = self._get(mesh.vertices, "normal", 'f', nv*3),
+            edge_verts = self._get(mesh.edges, "vertices", 'i', ne*2),
+            loop_verts = self._get(mesh.loops, "vertex_index", 'i', nl),
+            loop_edges = self._get(mesh.loops, "edge_index", 'i', nl),
+            face_loop_start = self._get(mesh.polygons, "loop_start", 'i', nf),
+            face_loop_total = self._get(mesh.polygons, "loop_total", 'i', nf),
+            face_normal = self._get(mesh.polygons, "normal", 'f', nf*3),
+        )
+    
+    def _project(self, m, width, height, margin):
+        (m00, m01, m02, m03), (m10, m11, m12, m13), _, (m30, m31, m32, m33) = (tuple(row) for row in m)
+        half_w, half_h = width * 0.5, height * 0.5
+        x_min, y_min, x_max, y_max = -margin, -margin, width + margin, height + margin
+        cell_size = self.cell_size
+        co = self.mesh_data["co"]
+        
+        clip = []
+        for i in range(len(co) // 3):
+            x, y, z = co[i*3], co[i*3+1], co[i*3+2]
+            clip.append((m00*x + m01*y + m02*z + m03, m10*x + m11*y + m12*z + m13, m30*x + m31*y + m32*z + m33))
+        
+        verts_xy = self.verts_xy
+        vert_cells = self.vert_cells
+        for i, (cx, cy, w) in enumerate(clip):
+            if w <= 0.0: continue
+            px, py = half_w + half_w * cx / w, half_h + half_h * cy / w
+            if (px < x_min) or (px > x_max) or (py < y_min) or (py > y_max): continue
+            verts_xy[i] = (px, py)
+            vert_cells.setdefault((int(px // cell_size), int(py // cell_size)), []).append(i)
+        
+        w_min = self.w_min
+        edges_xy = self.edges_xy
+        edge_cells = self.edge_cells
+        long_edges = self.long_edges
+        max_edge_cells = self.max_edge_cells
+        edge_verts = self.mesh_data["edge_verts"]
+        for i in range(len(edge_verts) // 2):
+            (cx0, cy0, w0), (cx1, cy1, w1) = clip[edge_verts[i*2]], clip[edge_verts[i*2+1]]
+            if (w0 <= w_min) and (w1 <= w_min): continue
+            if w0 <= w_min:
+                t = (w1 - w_min) / (w1 - w0)
+                cx0, cy0, w0 = cx1 + (cx0 - cx1) * t, cy1 + (cy0 - cy1) * t, w_min
+            elif w1 <= w_min:
+                t = (w0 - w_min) / (w0 - w1)
+                cx1, cy1, w1 = cx0 + (cx1 - cx0) * t, cy0 + (cy1 - cy0) * t, w_min
+            px0, py0 = half_w + half_w * cx0 / w0, half_h + half_h * cy0 / w0
+            px1, py1 = half_w + half_w * cx1 / w1, half_h + half_h * cy1 / w1
+            ex_min, ex_max = max(min(px0, px1), x_min), min(max(px0, px1), x_max)
+            ey_min, ey_max = max(min(py0, py1), y_min), min(max(py0, py1), y_max)
+            if (ex_min > ex_max) or (ey_min > ey_max): continue
+            edges_xy[i] = (px0, py0, px1, py1)
+            gx0, gx1 = int(ex_min // cell_size), int(ex_max // cell_size)
+            gy0, gy1 = int(ey_min // cell_size), int(ey_max // cell_size)
+            if (gx1 - gx0 + 1) * (gy1 - gy0 + 1) > max_edge_cells:
+                long_edges.append(i)
+                continue
+            for gy in range(gy0, gy1 + 1):
+                for gx in range(gx0, gx1 + 1):
+                    edge_cells.setdefault((gx, gy), []).append(i)
+    
+    def _cells(self, cells, xy, radius):
+        cell_size = self.cell_size
+        gx0, gx1 = int((xy[0] - radius) // cell_size), int((xy[0] + radius) // cell_size)
+        gy0, gy1 = int((xy[1] - radius) // cell_size), int((xy[1] + radius) // cell_size)
+        for gy in range(gy0, gy1 + 1):
+            for gx in range(gx0, gx1 + 1):
+                cell = cells.get((gx, gy))
+                if cell: yield cell
+    
+    def nearest_vert(self, xy, radius, accept=None):
+        """Returns (index, pixel distance) of the nearest vertex within radius, or (None, inf)"""
+        x, y = xy[0], xy[1]
+        best_index, best_dist = None, float("inf")
+        verts_xy = self.verts_xy
+        # each vertex is in exactly one cell
+        for i in itertools.chain.from_iterable(self._cells(self.vert_cells, xy, radius)):
+            px, py = verts_xy[i]
+            dist = math.sqrt((px - x)**2 + (py - y)**2)
+            if (dist <= radius) and ((dist < best_dist) or ((dist == best_dist) and (i < best_index))):
+                if accept and (not accept(self.vert_points_normals(i))): continue
+                best_index, best_dist = i, dist
+        return best_index, best_dist
+    
+    def nearest_edge(self, xy, radius, accept=None):
+        """Returns (index, pixel distance) of the nearest edge within radius, or (None, inf)"""
+        x, y = xy[0], xy[1]
+        best_index, best_dist = None, float("inf")
+        edges_xy = self.edges_xy
+        # edges can span several cells
+        candidates = set(self.long_edges)
+        for cell in self._cells(self.edge_cells, xy, radius):
+            candidates.update(cell)
+        for i in candidates:
+            px0, py0, px1, py1 = edges_xy[i]
+            dx, dy = px1 - px0, py1 - py0
+            l2 = dx*dx + dy*dy
+            t = (0.0 if l2 == 0.0 else min(max(((x - px0)*dx + (y - py0)*dy) / l2, 0.0), 1.0))
+            dist = math.sqrt((px0 + dx*t - x)**2 + (py0 + dy*t - y)**2)
+            if (dist <= radius) and ((dist < best_dist) or ((dist == best_dist) and (i < best_index))):
+                if accept and (not accept(self.edge_points_normals(i))): continue
+                best_index, best_dist = i, dist
+        return best_index, best_dist
+    
+    def _adjacency(self):
+        # Computed only when some element is actually picked
+        adjacency = self.mesh_data.get("adjacency")
+        if adjacency is not None: return adjacency
+        data = self.mesh_data
+        vert_faces = set(data["loop_verts"])
+        vert_edges = {}
+        edge_verts = data["edge_verts"]
+        for i in range(len(edge_verts) // 2):
+            vert_edges.setdefault(edge_verts[i*2], []).append(i)
+            vert_edges.setdefault(edge_verts[i*2+1], []).append(i)
+        edge_normals = {}
+        loop_edges, face_normal = data["loop_edges"], data["face_normal"]
+        for f, (loop_start, loop_total) in enumerate(zip(data["face_loop_start"], data["face_loop_total"])):
+            normal = Vector(face_normal[f*3:f*3+3])
+            for li in range(loop_start, loop_start + loop_total):
+                ei = loop_edges[li]
+                edge_normals[ei] = edge_normals.get(ei, Vector()) + normal
+        adjacency = (vert_faces, vert_edges, edge_normals)
+        data["adjacency"] = adjacency
+        return adjacency
+    
+    def _vert_co(self, i):
+        return Vector(self.mesh_data["co"][i*3:i*3+3])
+    
+    def vert_points_normals(self, i):
+        """Same as RaycastResult.elem_points_normals for a BMVert of the mesh"""
+        vert_faces, vert_edges, edge_normals = self._adjacency()
+        co = self._vert_co(i)
+        edges = vert_edges.get(i, ())
+        if (i in vert_faces) or (not edges):
+            vertex_normal = Vector(self.mesh_data["normal"][i*3:i*3+3])
+        else:
+            edge_verts = self.mesh_data["edge_verts"]
+            vertex_normal = Vector()
+            for ei in edges:
+                vi = edge_verts[ei*2] + edge_verts[ei*2+1] - i # the other vertex
+                vertex_normal += (co - self._vert_co(vi)).normalized()
+            vertex_normal.normalize()
+        if vertex_normal.magnitude < 0.5: vertex_normal = Vector((0, 0, 1))
+        return [transform_point_normal(self.matrix, co, vertex_normal, False)]
+    
+    def edge_points_normals(self, i):
+        """Same as RaycastResult.elem_points_normals for a BMEdge of the mesh"""
+        vert_faces, vert_edges, edge_normals = self._adjacency()
+        edge_verts = self.mesh_data["edge_verts"]
+        v0, v1 = self._vert_co(edge_verts[i*2]), self._vert_co(edge_verts[i*2+1])
+        edge_normal = edge_normals.get(i, Vector()).normalized()
+        if edge_normal.magnitude < 0.5:
+            edge_normal = orthogonal_in_XY(v1 - v0).normalized()
+        return [transform_point_normal(self.matrix, v, edge_normal, False) for v in (v0, v1)]
+
 #============================================================================#
 class Pick_Base:
     def invoke(self, context, event):
@@ -1369,9 +1758,15 @@ class Pick_Base:
 # Blender has a tendency to clear the contents of Z-buffer during its default operation,
 # so user operators usually don't have ability to use depth buffer at their invocation.
 # This hack attempts to alleviate this problem, at the cost of likely stalling GL pipeline.
+# Addons that opted in (AddonManager.use_zbuffer) need the Z-buffer at the very
+# moment of invocation, so while there are such users, every redraw is recorded.
+# Otherwise, a region's Z-buffer is recorded only while something keeps
+# requesting it (via get()), and idle regions are redrawn without reading anything.
 class ZBufferRecorder:
-    buffers = {}
+    buffers = {} # region -> (zbuf, width, height)
     queue = []
+    requests = {} # region -> time of the last request
+    keep_alive = 1.0 # seconds
     
     @staticmethod
     def draw_pixel_callback(users):
@@ -1379,10 +1774,15 @@ class ZBufferRecorder:
         area = context.area
         region = context.region
         
-        if users > 0:
+        requests = ZBufferRecorder.requests
+        request_time = requests.get(region)
+        requested = (request_time is not None) and (time.clock() - request_time < ZBufferRecorder.keep_alive)
+        record = (users > 0) or requested
+        if not requested: requests.pop(region, None)
+        if record:
             xy = (region.x, region.y)
             wh = (region.width, region.height)
-            zbuf = cgl.read_zbuffer(xy, wh)
+            zbuf = (cgl.read_zbuffer(xy, wh), region.width, region.height)
         
         buffers = ZBufferRecorder.buffers
         queue = ZBufferRecorder.queue
@@ -1396,11 +1796,22 @@ class ZBufferRecorder:
             queue = queue[index+1:]
             ZBufferRecorder.queue = queue
         
-        if users > 0:
+        if record:
             buffers[region] = zbuf
             queue.append(region)
     
+    @classmethod
+    def get(cls, region):
+        """Returns (zbuf, width, height) recorded at the last redraw, or None"""
+        # The depth buffer is usually cleared by the time an operator runs,
+        # so a missing buffer can only be obtained on the next redraw
+        cls.requests[region] = time.clock()
+        zbuf = cls.buffers.get(region)
+        if zbuf is None: region.tag_redraw()
+        return zbuf
+    
     @classmethod
     def copy(cls, other):
         cls.buffers = other.buffers
         cls.queue = other.queue
+        cls.requests = other.requests
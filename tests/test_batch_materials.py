@@ -0,0 +1,159 @@
+#  ***** BEGIN GPL LICENSE BLOCK *****
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+#  ***** END GPL LICENSE BLOCK *****
+
+# Tests of NodeTreeComparer with stand-in node objects.
+# Run inside Blender (the addon module needs bpy), e.g.:
+# blender --background --factory-startup --python tests/test_batch_materials.py
+
+import os
+import sys
+import unittest
+
+# The addon and its shared modules, in case Blender is not set up to use this scripts directory
+scripts_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+for subdir in ("addons", "modules"):
+    path = os.path.join(scripts_dir, subdir)
+    if path not in sys.path: sys.path.append(path)
+
+try:
+    import bpy
+except ImportError:
+    bpy = None
+
+if bpy:
+    from space_view3d_batch_operations import batch_materials
+    NodeTreeComparer = batch_materials.NodeTreeComparer
+
+class StandInProp:
+    def __init__(self, identifier, type='FLOAT'):
+        self.identifier = identifier
+        self.type = type
+
+class StandInProps(list):
+    def items(self):
+        return [(prop.identifier, prop) for prop in self]
+
+class StandInRna:
+    def __init__(self, *props):
+        self.properties = StandInProps([StandInProp("rna_type", 'POINTER')] + list(props))
+
+class StandInStruct:
+    """Stand-in for a nested (non-ID) struct, e.g. a color ramp"""
+    def __init__(self, **values):
+        self.__dict__.update(values)
+        self.bl_rna = StandInRna(*[StandInProp(key) for key in values])
+        self.rna_type = None
+
+class StandInSocket:
+    def __init__(self, identifier, default_value=0.0):
+        self.bl_idname = "NodeSocketFloat"
+        self.identifier = identifier
+        self.name = identifier
+        self.type = 'VALUE'
+        self.enabled = True
+        self.default_value = default_value
+        self.links = ()
+
+class StandInNode:
+    def __init__(self, bl_idname, name, inputs=(), outputs=(), **settings):
+        self.bl_idname = bl_idname
+        self.name = name
+        self.location = (0.0, 0.0)
+        self.parent = None
+        self.internal_links = ()
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        props = [StandInProp("name", 'STRING'), StandInProp("location")]
+        for key, value in settings.items():
+            setattr(self, key, value)
+            props.append(StandInProp(key, ('POINTER' if isinstance(value, StandInStruct) else 'ENUM')))
+        self.bl_rna = StandInRna(*props)
+        self.rna_type = None
+
+class StandInLink:
+    def __init__(self, from_node, from_socket, to_node, to_socket):
+        self.from_node = from_node
+        self.from_socket = from_socket
+        self.to_node = to_node
+        self.to_socket = to_socket
+
+class StandInNodeTree:
+    def __init__(self, nodes, links=()):
+        self.nodes = list(nodes)
+        self.links = list(links)
+    
+    def as_pointer(self):
+        return id(self)
+
+def make_tree(blend_type='MIX', fac=0.5, ramp_position=0.25):
+    mix = StandInNode("ShaderNodeMixRGB", "Mix", [StandInSocket("Fac", fac)], [StandInSocket("Color")],
+        blend_type=blend_type)
+    ramp = StandInNode("ShaderNodeValToRGB", "ColorRamp", [StandInSocket("Fac")], [StandInSocket("Color")],
+        color_ramp=StandInStruct(interpolation='LINEAR', position=ramp_position))
+    link = StandInLink(ramp, ramp.outputs[0], mix, mix.inputs[0])
+    ramp.outputs[0].links = (link,)
+    return StandInNodeTree([mix, ramp], [link])
+
+@unittest.skipIf(bpy is None, "requires Blender")
+class NodeTreeComparerTest(unittest.TestCase):
+    def setUp(self):
+        NodeTreeComparer.invalidate()
+    
+    def test_identical_trees_have_equal_keys(self):
+        self.assertEqual(NodeTreeComparer.nodetree_key(make_tree()), NodeTreeComparer.nodetree_key(make_tree()))
+    
+    def test_node_settings_change_the_key(self):
+        key = NodeTreeComparer.nodetree_key(make_tree())
+        self.assertNotEqual(key, NodeTreeComparer.nodetree_key(make_tree(blend_type='MULTIPLY')))
+        self.assertNotEqual(key, NodeTreeComparer.nodetree_key(make_tree(ramp_position=0.75)))
+    
+    def test_cached_key_is_reused(self):
+        tree = make_tree()
+        key = NodeTreeComparer.nodetree_key(tree)
+        hits = NodeTreeComparer.hits
+        self.assertIs(NodeTreeComparer.nodetree_key(tree), key)
+        self.assertEqual(NodeTreeComparer.hits, hits + 1)
+    
+    def test_edited_tree_is_not_stale(self):
+        tree = make_tree()
+        key = NodeTreeComparer.nodetree_key(tree)
+        tree.nodes[0].blend_type = 'MULTIPLY'
+        self.assertNotEqual(NodeTreeComparer.nodetree_key(tree), key)
+        tree.nodes[0].inputs[0].default_value = 1.0
+        self.assertEqual(NodeTreeComparer.nodetree_key(tree),
+            NodeTreeComparer.nodetree_key(make_tree(blend_type='MULTIPLY', fac=1.0)))
+    
+    def test_undo_and_load_clear_the_cache(self):
+        NodeTreeComparer.nodetree_key(make_tree())
+        batch_materials.undo_post()
+        self.assertFalse(NodeTreeComparer.cache)
+        NodeTreeComparer.nodetree_key(make_tree())
+        batch_materials.load_post()
+        self.assertFalse(NodeTreeComparer.cache)
+    
+    def test_prune_drops_removed_trees(self):
+        alive, removed = make_tree(), make_tree()
+        NodeTreeComparer.nodetree_key(alive)
+        NodeTreeComparer.nodetree_key(removed)
+        NodeTreeComparer.prune([alive, None])
+        self.assertEqual(set(NodeTreeComparer.cache), {alive.as_pointer()})
+
+if __name__ == "__main__":
+    # Blender's own arguments are not meant for unittest
+    argv = [sys.argv[0]] + (sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else [])
+    result = unittest.main(argv=argv, exit=False).result
+    if bpy and bpy.app.background: sys.exit(not result.wasSuccessful())